@@ -0,0 +1,127 @@
+import random
+from dataclasses import dataclass, field
+
+# =====================================
+# --- Moteur de combat (sans Discord) ---
+# =====================================
+# Toutes les règles du combat PvP : tour par tour, esquive selon la vitesse,
+# critiques, bouclier DEF. L'état est un objet, step(move_index) joue un tour.
+# Le RNG est injectable (graine) : un combat se rejoue à l'identique à partir
+# de sa graine et de la liste des coups (BattleState.moves).
+
+CRIT_CHANCE = 0.10
+CRIT_MULTIPLIER = 1.5
+SHIELD_TURNS = 2
+SHIELD_DEF_MULTIPLIER = 1.5
+DODGE_PER_SPEED = 0.005
+HIT_MIN, HIT_MAX = 0.05, 0.98
+
+
+def compute_damage(move, atk_stats, def_stats, crit=False):
+    base = move["power"] + atk_stats["atk"] // 2 - def_stats["def"] // 4
+    dmg = max(1, base)
+    if crit:
+        dmg = int(dmg * CRIT_MULTIPLIER)
+    return dmg
+
+
+@dataclass
+class Fighter:
+    domon: object
+    stats: dict
+    hp: int
+    max_hp: int
+    shield: int = 0  # tours de bouclier DEF restants
+
+
+@dataclass
+class TurnResult:
+    attacker: int             # 0 ou 1
+    kind: str                 # "skip" | "shield" | "hit" | "miss"
+    move: object = None
+    damage: int = 0
+    crit: bool = False
+    winner: int | None = None
+
+
+@dataclass
+class BattleState:
+    fighters: list
+    seed: int
+    rng: random.Random = field(repr=False, default=None)
+    turn: int = 0             # index de l'attaquant
+    turns: int = 0
+    winner: int | None = None
+    moves: list = field(default_factory=list)  # coups joués (None = tour passé)
+
+    @classmethod
+    def new(cls, domon1, domon2, seed=None, rng=None):
+        if seed is None:
+            seed = random.randrange(2 ** 63)
+        fighters = [
+            Fighter(d, dict(d["stats"]), d["stats"]["hp"], d["stats"]["hp"])
+            for d in (domon1, domon2)
+        ]
+        return cls(fighters, seed, rng or random.Random(seed))
+
+    @property
+    def finished(self):
+        return self.winner is not None
+
+    @property
+    def attacker(self):
+        return self.fighters[self.turn]
+
+    @property
+    def defender(self):
+        return self.fighters[1 - self.turn]
+
+    def _end_turn(self):
+        for f in self.fighters:
+            if f.shield > 0:
+                f.shield -= 1
+        self.turn = 1 - self.turn
+
+    def step(self, move_index):
+        # move_index None : l'attaquant n'a pas joué à temps, tour passé
+        if self.finished:
+            raise ValueError("combat terminé")
+        a_idx = self.turn
+        att, dfd = self.attacker, self.defender
+        self.turns += 1
+        self.moves.append(move_index)
+        if move_index is None:
+            self._end_turn()
+            return TurnResult(a_idx, "skip")
+
+        move = att.domon["moves"][move_index]
+        a_stats = att.stats
+        d_stats = dfd.stats
+        if dfd.shield > 0:
+            d_stats = dict(d_stats, **{"def": int(d_stats["def"] * SHIELD_DEF_MULTIPLIER)})
+        rng = self.rng
+        dodge_bonus = max(0.0, (d_stats["spd"] - a_stats["spd"]) * DODGE_PER_SPEED)
+        hit_threshold = (move["accuracy"] / 100.0) * (1.0 - dodge_bonus)
+        hit = rng.random() < max(HIT_MIN, min(HIT_MAX, hit_threshold))
+
+        if move["power"] == 0:
+            att.shield = SHIELD_TURNS
+            result = TurnResult(a_idx, "shield", move)
+        elif hit:
+            crit = rng.random() < CRIT_CHANCE
+            dmg = compute_damage(move, a_stats, d_stats, crit=crit)
+            dfd.hp -= dmg
+            result = TurnResult(a_idx, "hit", move, dmg, crit)
+            if dfd.hp <= 0:
+                self.winner = result.winner = a_idx
+        else:
+            result = TurnResult(a_idx, "miss", move)
+        self._end_turn()
+        return result
+
+
+def replay(domon1, domon2, seed, moves):
+    state = BattleState.new(domon1, domon2, seed)
+    for move_index in moves:
+        state.step(move_index)
+    return state
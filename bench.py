@@ -0,0 +1,362 @@
+import sys
+import json
+import time
+import argparse
+from threading import Thread
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# ==================================
+# --- Benchmarks hors Discord    ---
+# ==================================
+# python bench.py <suite> [options]  — n'importe jamais main.py (pas de boot du bot).
+
+
+# --------- Serveur Dropbox local (stand-in) ----------
+class FakeDropbox(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, reject_token_every=0):
+        super().__init__(("127.0.0.1", 0), FakeDropboxHandler)
+        self.connections = 0
+        self.requests = {}
+        self.files = {}
+        self.token_serial = 0
+        self.revoked = set()
+        self.reject_token_every = reject_token_every
+        self.download_status = 200  # ≠ 200 : panne simulée des téléchargements (429, 503…)
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+    def metadata(self, path):
+        from dropbox_sync import dropbox_content_hash
+        data = self.files[path]
+        return {"path_display": path, "size": len(data), "rev": f"{len(self.files)}{len(data):x}",
+                "content_hash": dropbox_content_hash(data)}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class FakeDropboxHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=b"", content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        srv = self.server
+        srv.requests[self.path] = srv.requests.get(self.path, 0) + 1
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.path == "/oauth2/token":
+            srv.token_serial += 1
+            token = f"tok-{srv.token_serial}"
+            return self._reply(200, json.dumps({"access_token": token, "expires_in": 14400}).encode())
+        token = (self.headers.get("Authorization") or "").replace("Bearer ", "")
+        if not token.startswith("tok-") or token in srv.revoked:
+            return self._reply(401, b'{"error": "invalid_access_token"}')
+        n = srv.requests.get("/2/files/upload", 0)
+        if srv.reject_token_every and self.path == "/2/files/upload" and n % srv.reject_token_every == 0:
+            # expiration simulée du token courant
+            srv.revoked.add(token)
+            return self._reply(401, b'{"error": "expired_access_token"}')
+        arg = json.loads(self.headers.get("Dropbox-API-Arg") or "{}")
+        if self.path == "/2/files/upload":
+            srv.files[arg.get("path")] = body
+            return self._reply(200, json.dumps(srv.metadata(arg.get("path"))).encode())
+        if self.path == "/2/files/get_metadata":
+            path = json.loads(body or b"{}").get("path")
+            if path not in srv.files:
+                return self._reply(409, b'{"error_summary": "path/not_found/"}')
+            return self._reply(200, json.dumps(srv.metadata(path)).encode())
+        if self.path == "/2/files/download":
+            if srv.download_status != 200:
+                return self._reply(srv.download_status, b'{"error_summary": "too_many_requests/"}')
+            data = srv.files.get(arg.get("path"))
+            if data is None:
+                return self._reply(409, b'{"error_summary": "path/not_found/"}')
+            return self._reply(200, data, "application/octet-stream")
+        self._reply(404)
+
+
+def bench_dropbox(args):
+    import requests
+    from dropbox_sync import DropboxClient
+
+    payload = b"x" * args.size
+    results = {}
+
+    # Ancien schéma : token OAuth + upload via requests.post nus, à chaque save
+    srv = FakeDropbox().start()
+    t0 = time.perf_counter()
+    for _ in range(args.saves):
+        tok = requests.post(f"{srv.url}/oauth2/token", data={"grant_type": "refresh_token"}, timeout=15).json()["access_token"]
+        requests.post(
+            f"{srv.url}/2/files/upload",
+            headers={"Authorization": f"Bearer {tok}", "Dropbox-API-Arg": json.dumps({"path": "/players.json"})},
+            data=payload, timeout=20,
+        )
+    results["legacy"] = (srv.connections, sum(srv.requests.values()), time.perf_counter() - t0)
+    srv.shutdown()
+
+    # DropboxClient : token en cache + session keep-alive (+ 401 simulés)
+    srv = FakeDropbox(reject_token_every=args.reject_every).start()
+    client = DropboxClient("key", "secret", "refresh", api_url=srv.url, content_url=srv.url)
+    t0 = time.perf_counter()
+    for _ in range(args.saves):
+        client.upload("/players.json", payload)
+    results["client"] = (srv.connections, sum(srv.requests.values()), time.perf_counter() - t0)
+    srv.shutdown()
+
+    # AsyncDropboxClient : uploads concurrents bornés sur une seule boucle asyncio
+    try:
+        import asyncio
+        from dropbox_sync import AsyncDropboxClient
+    except ImportError:
+        AsyncDropboxClient = None
+    if AsyncDropboxClient is not None:
+        srv = FakeDropbox(reject_token_every=args.reject_every).start()
+        aclient = AsyncDropboxClient(DropboxClient("key", "secret", "refresh", api_url=srv.url, content_url=srv.url),
+                                     max_concurrency=args.concurrency)
+
+        async def run_async():
+            try:
+                await asyncio.gather(*(aclient.upload("/players.json", payload) for _ in range(args.saves)))
+            finally:
+                await aclient.close()
+
+        t0 = time.perf_counter()
+        asyncio.run(run_async())
+        results["async"] = (srv.connections, sum(srv.requests.values()), time.perf_counter() - t0)
+        srv.shutdown()
+
+    # Synchro par content_hash : saves identiques puis redémarrage avec fichier inchangé
+    import os
+    import tempfile
+    srv = FakeDropbox().start()
+    with tempfile.TemporaryDirectory() as tmp:
+        local = os.path.join(tmp, "players.json")
+        state = os.path.join(tmp, ".dropbox_sync.json")
+        with open(local, "wb") as f:
+            f.write(payload)
+        synced = DropboxClient("key", "secret", "refresh", api_url=srv.url, content_url=srv.url, state_path=state)
+        statuses = [synced.sync_upload(local, "/players.json")[0] for _ in range(args.saves)]
+        restarted = DropboxClient("key", "secret", "refresh", api_url=srv.url, content_url=srv.url, state_path=state)
+        boot, _ = restarted.sync_download(local, "/players.json")
+    srv.shutdown()
+    print(f"sync: {statuses.count('uploaded')} upload(s), {statuses.count('skipped')} skip(s) sur {args.saves} saves identiques; "
+          f"boot={boot}, octets reçus au boot={restarted.stats['bytes_received']}, "
+          f"octets évités={synced.stats['bytes_skipped'] + restarted.stats['bytes_skipped']}")
+
+    for name, (conns, reqs, elapsed) in results.items():
+        print(f"{name:>7}: {conns / args.saves:.2f} connexion(s)/save, {reqs / args.saves:.2f} requête(s)/save, "
+              f"{elapsed * 1000 / args.saves:.2f} ms/save")
+    print("client stats:", client.metrics())
+
+
+# --------- Données synthétiques ----------
+ITEMS = ["Domoball", "Scan Tool", "PerfectDomoball", "Small Repair Kit", "CryptoStamp", "Architectrap", "SpectraSeal", "BIMNet"]
+
+def synthetic_players(n, seed=42):
+    import random
+    rng = random.Random(seed)
+    players = {}
+    for i in range(n):
+        uid = str(100000000000000000 + rng.randrange(10 ** 17))
+        coll = {}
+        for _ in range(rng.randint(0, 40)):
+            num = str(rng.randint(1, 151))
+            coll[num] = coll.get(num, 0) + 1
+        players[uid] = {
+            "inventory": {item: rng.randint(1, 20) for item in rng.sample(ITEMS, rng.randint(1, 5))},
+            "collection": coll,
+            "xp": rng.randint(0, 500),
+            "captures": {},
+            "daily": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "evolutions": {},
+            "flags": {"double_xp_next_capture": rng.random() < 0.1, "spectraseal_reroll": rng.random() < 0.1},
+        }
+    return players
+
+
+def bench_codecs(args):
+    from storage import SNAPSHOT_CODECS, encode_player, encode_snapshot, decode_snapshot
+
+    players = synthetic_players(args.players)
+    fragments = {uid: encode_player(p) for uid, p in players.items()}
+    meta = {"seq": 1}
+    legacy = json.dumps(players, ensure_ascii=False, indent=2).encode("utf-8")
+    print(f"{args.players} joueurs synthétiques — ancien format (indent=2): {len(legacy) / 1024:.0f} KB")
+    print(f"{'codec':>8} {'taille KB':>10} {'ratio':>6} {'encode ms':>10} {'decode ms':>10}")
+    for codec in SNAPSHOT_CODECS:
+        t0 = time.perf_counter()
+        for _ in range(args.rounds):
+            raw = encode_snapshot(fragments, meta, codec)
+        enc = (time.perf_counter() - t0) * 1000 / args.rounds
+        t0 = time.perf_counter()
+        for _ in range(args.rounds):
+            back = decode_snapshot(raw)
+        dec = (time.perf_counter() - t0) * 1000 / args.rounds
+        back.pop("__meta__", None)
+        assert back == players, codec
+        print(f"{codec:>8} {len(raw) / 1024:>10.0f} {len(legacy) / len(raw):>6.1f} {enc:>10.1f} {dec:>10.1f}")
+
+
+def bench_registry(args):
+    import random
+    from catalog import load_catalog, normalize_str, DomonRegistry
+
+    catalog = load_catalog(args.catalog)
+    domons = catalog.domons
+    t0 = time.perf_counter()
+    registry = DomonRegistry(catalog)
+    build_ms = (time.perf_counter() - t0) * 1000
+    rng = random.Random(7)
+    queries = [rng.choice(domons) for _ in range(args.lookups)]
+    names = [d["name"].upper() for d in queries]
+    nums = [str(d["num"]) for d in queries]
+
+    # Ancien schéma : next(...) linéaire, normalize_str réappliqué à chaque entrée
+    def linear_num(n):
+        return next((d for d in domons if str(d["num"]) == n), None)
+
+    def linear_name(name):
+        key = normalize_str(name)
+        return next((d for d in domons if normalize_str(d["name"]) == key), None)
+
+    def linear_evolution(d):
+        return next((e for e in domons if e["name"] == d.get("evolution")), None)
+
+    cases = [
+        ("num", lambda: [linear_num(n) for n in nums], lambda: [registry.get(n) for n in nums]),
+        ("name", lambda: [linear_name(n) for n in names], lambda: [registry.find(n) for n in names]),
+        ("evolution", lambda: [linear_evolution(d) for d in queries], lambda: [registry.evolution_of(d) for d in queries]),
+    ]
+    print(f"{len(domons)} DOMON, registre construit en {build_ms:.2f} ms, {args.lookups} recherches par cas")
+    print(f"{'lookup':>10} {'avant µs':>10} {'après µs':>10} {'gain':>8}")
+    for name, before, after in cases:
+        assert before() == after(), name
+        t0 = time.perf_counter()
+        before()
+        t_before = (time.perf_counter() - t0) * 1e6 / args.lookups
+        t0 = time.perf_counter()
+        after()
+        t_after = (time.perf_counter() - t0) * 1e6 / args.lookups
+        print(f"{name:>10} {t_before:>10.2f} {t_after:>10.3f} {t_before / t_after:>7.0f}x")
+
+
+def bench_spawn(args):
+    import random
+    from datetime import datetime, timezone
+    from catalog import load_catalog, DomonRegistry
+    from spawn_tables import SpawnTables
+
+    rarity_proba = {"Common": 55, "Uncommon": 24, "Rare": 14, "Legendary": 7}
+    registry = DomonRegistry(load_catalog(args.catalog))
+    tables = SpawnTables(registry, rarity_proba)
+    tables.configure({
+        "channels": {"42": {"type": {"Spectre": 3}}},
+        "windows": [{"name": "nuit", "hours": [0, 24], "rarity": {"Legendary": 2}}],
+        "bimnet": {"rarity": {"Rare": 1.5, "Legendary": 2}},
+    })
+    rng = random.Random(1)
+    now = datetime.now(timezone.utc)
+
+    # Ancien schéma : liste de 151 poids reconstruite puis random.choices à chaque tick
+    t0 = time.perf_counter()
+    for _ in range(args.draws):
+        rng.choices(registry.domons, weights=[rarity_proba.get(d["rarity"], 10) for d in registry.domons], k=1)[0]
+    before = (time.perf_counter() - t0) * 1e6 / args.draws
+    t0 = time.perf_counter()
+    for _ in range(args.draws):
+        tables.sample(rng, guild_id=1, channel_id=42, now=now, bimnet=True)
+    after = (time.perf_counter() - t0) * 1e6 / args.draws
+    print(f"{args.draws} tirages : choices+poids {before:.2f} µs/tirage, alias {after:.3f} µs/tirage ({before / after:.0f}x)")
+    print("tables:", tables.metrics())
+    for layers in [(), tables.active_layers(1, 42, now, True)]:
+        check = tables.self_check(args.check, layers, seed=3)
+        print(f"self-check {layers or 'base'}: {'OK' if check['ok'] else 'ÉCHEC'} χ²={check['chi2']} (seuil {check['critical']})")
+        for r, p in check["expected"].items():
+            print(f"    {r:>10}: attendu {p:.4f}  observé {check['observed'][r]:.4f}")
+
+
+def bench_battle(args):
+    import random
+    from catalog import load_catalog
+    from battle_engine import BattleState, replay
+
+    domons = load_catalog(args.catalog).domons
+    policy = random.Random(11)
+    turns = 0
+    t0 = time.perf_counter()
+    for i in range(args.battles):
+        state = BattleState.new(policy.choice(domons), policy.choice(domons), seed=i)
+        while not state.finished:
+            state.step(policy.randrange(4))
+        turns += state.turns
+    elapsed = time.perf_counter() - t0
+    print(f"{args.battles} combats, {turns} tours en {elapsed:.2f} s — {turns / elapsed:,.0f} tours/s, "
+          f"{turns / args.battles:.1f} tours/combat")
+
+    # rejeu déterministe : même graine + mêmes coups → même issue
+    d1, d2 = domons[0], domons[150]
+    state = BattleState.new(d1, d2, seed=1234)
+    while not state.finished:
+        state.step(policy.choice([0, 1, 2, 3, None]))
+    again = replay(d1, d2, 1234, state.moves)
+    assert (again.winner, [f.hp for f in again.fighters]) == (state.winner, [f.hp for f in state.fighters])
+    print(f"rejeu seed=1234 : {len(state.moves)} coups, vainqueur {state.winner} — identique")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DOMON bot benchmarks")
+    sub = parser.add_subparsers(dest="suite", required=True)
+
+    p = sub.add_parser("dropbox", help="connexions/requêtes par save contre un Dropbox local")
+    p.add_argument("--saves", type=int, default=200)
+    p.add_argument("--size", type=int, default=64 * 1024)
+    p.add_argument("--reject-every", type=int, default=0, help="simule un 401 tous les N uploads")
+    p.add_argument("--concurrency", type=int, default=4, help="uploads simultanés du client async")
+    p.set_defaults(func=bench_dropbox)
+
+    p = sub.add_parser("codecs", help="taille et temps encode/decode des codecs de snapshot")
+    p.add_argument("--players", type=int, default=50000)
+    p.add_argument("--rounds", type=int, default=3)
+    p.set_defaults(func=bench_codecs)
+
+    p = sub.add_parser("registry", help="recherches DOMON : scans linéaires vs DomonRegistry")
+    p.add_argument("--catalog", default="domons.json")
+    p.add_argument("--lookups", type=int, default=2000)
+    p.set_defaults(func=bench_registry)
+
+    p = sub.add_parser("spawn", help="tirage de spawn : random.choices vs tables d'alias + auto-contrôle χ²")
+    p.add_argument("--catalog", default="domons.json")
+    p.add_argument("--draws", type=int, default=20000)
+    p.add_argument("--check", type=int, default=100000)
+    p.set_defaults(func=bench_spawn)
+
+    p = sub.add_parser("battle", help="simulation headless du moteur de combat + rejeu déterministe")
+    p.add_argument("--catalog", default="domons.json")
+    p.add_argument("--battles", type=int, default=50000)
+    p.set_defaults(func=bench_battle)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
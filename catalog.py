@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import hashlib
+import marshal
+import unicodedata
+from types import MappingProxyType
+
+from storage import atomic_write
+
+# ====================================
+# --- Catalogue DOMON (fichier data) ---
+# ====================================
+# Le catalogue vit dans domons.json ({"version", "domons": [...]}) au lieu d'un
+# littéral Python. Une version compilée (marshal) est gardée à côté, indexée
+# par le sha256 du fichier source : tant que le JSON ne change pas, le
+# rechargement ne re-parse rien. Les fiches exposées sont figées (lecture seule).
+
+CACHE_MAGIC = b"DMNC\x01"
+REQUIRED_FIELDS = ("num", "name", "type", "rarity", "description", "stats", "moves")
+
+
+def normalize_str(s: str) -> str:
+    if not isinstance(s, str):
+        return s
+    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii").strip().lower()
+
+
+def freeze_domon(d):
+    # chemin rapide pour le schéma connu : les dicts sortent frais de marshal/json,
+    # on les enveloppe sans copie
+    d["stats"] = MappingProxyType(d["stats"])
+    d["moves"] = tuple(MappingProxyType(m) for m in d["moves"])
+    return MappingProxyType(d)  # d["name"], d.get(...) restent valides, l'écriture lève TypeError
+
+
+class Catalog:
+    def __init__(self, version, fingerprint, domons, source_hash, source="json", load_ms=0.0):
+        self.version = version
+        self.fingerprint = fingerprint  # empreinte du contenu (indépendante de la mise en forme)
+        self.domons = tuple(freeze_domon(d) for d in domons)
+        self.source_hash = source_hash
+        self.source = source            # "json" (compilé) ou "cache"
+        self.load_ms = load_ms
+
+    def __len__(self):
+        return len(self.domons)
+
+    def __iter__(self):
+        return iter(self.domons)
+
+    def metrics(self):
+        return {
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "domons": len(self.domons),
+            "source": self.source,
+            "load_ms": round(self.load_ms, 2),
+        }
+
+
+def validate_domons(domons):
+    seen = set()
+    for d in domons:
+        missing = [k for k in REQUIRED_FIELDS if k not in d]
+        if missing:
+            raise ValueError(f"DOMON {d.get('num', '?')}: champs manquants {missing}")
+        if d["num"] in seen:
+            raise ValueError(f"DOMON {d['num']}: numéro en double")
+        seen.add(d["num"])
+    names = {d["name"] for d in domons}
+    for d in domons:
+        if d.get("evolution") and d["evolution"] not in names:
+            raise ValueError(f"DOMON {d['num']}: évolution inconnue {d['evolution']!r}")
+
+
+def compile_catalog(raw: bytes):
+    doc = json.loads(raw.decode("utf-8"))
+    domons = doc["domons"]
+    validate_domons(domons)
+    canonical = json.dumps(domons, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return {
+        "version": doc.get("version", 1),
+        "fingerprint": hashlib.sha256(canonical).hexdigest()[:16],
+        "domons": domons,
+    }
+
+
+def _read_cache(cache_path, source_hash):
+    try:
+        with open(cache_path, "rb") as f:
+            blob = f.read()
+    except FileNotFoundError:
+        return None
+    if not blob.startswith(CACHE_MAGIC):
+        return None
+    try:
+        payload = marshal.loads(blob[len(CACHE_MAGIC):])
+    except (EOFError, ValueError, TypeError):
+        return None
+    if payload.get("source") != source_hash:
+        return None
+    return payload
+
+
+def load_catalog(path, cache_path=None):
+    t0 = time.perf_counter()
+    with open(path, "rb") as f:
+        raw = f.read()
+    source_hash = hashlib.sha256(raw).hexdigest()
+    cache_path = cache_path or f"{os.path.splitext(path)[0]}.cache"
+    payload = _read_cache(cache_path, source_hash)
+    source = "cache"
+    if payload is None:
+        payload = compile_catalog(raw)
+        payload["source"] = source_hash
+        source = "json"
+        try:
+            atomic_write(cache_path, CACHE_MAGIC + marshal.dumps(payload))
+        except OSError as e:
+            print(f"⚠️ CATALOG: cache non écrit ({e})")
+    catalog = Catalog(payload["version"], payload["fingerprint"], payload["domons"], source_hash, source=source)
+    catalog.load_ms = (time.perf_counter() - t0) * 1000
+    return catalog
+
+
+# --------- Registre : index construits une fois par catalogue ----------
+class DomonRegistry:
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.domons = catalog.domons
+        self.by_num = {d["num"]: d for d in self.domons}
+        self.by_name = {normalize_str(d["name"]): d for d in self.domons}
+        by_rarity, by_type = {}, {}
+        for d in self.domons:
+            by_rarity.setdefault(d["rarity"], []).append(d)
+            by_type.setdefault(d["type"], []).append(d)
+        self.by_rarity = {k: tuple(v) for k, v in by_rarity.items()}
+        self.by_type = {k: tuple(v) for k, v in by_type.items()}
+        # évolutions : num → DOMON suivant, et num → pré-évolutions (ordre du catalogue)
+        exact = {d["name"]: d for d in self.domons}
+        self.evolves_to = {}
+        evolves_from = {}
+        for d in self.domons:
+            evo = exact.get(d.get("evolution") or "")
+            if evo:
+                self.evolves_to[d["num"]] = evo
+                evolves_from.setdefault(evo["num"], []).append(d)
+        self.evolves_from = {k: tuple(v) for k, v in evolves_from.items()}
+
+    def __len__(self):
+        return len(self.domons)
+
+    def __iter__(self):
+        return iter(self.domons)
+
+    def get(self, num):
+        try:
+            return self.by_num.get(int(num))
+        except (TypeError, ValueError):
+            return None
+
+    def find(self, name):
+        return self.by_name.get(normalize_str(name))
+
+    def lookup(self, name_or_num):
+        # "#25", "25" ou un nom (accents/casse ignorés)
+        key = str(name_or_num).strip().lstrip("#")
+        return (self.get(key) if key.isdigit() else None) or self.find(key)
+
+    def of_rarity(self, rarity):
+        return self.by_rarity.get(rarity, ())
+
+    def of_type(self, type_):
+        return self.by_type.get(type_, ())
+
+    def evolution_of(self, domon):
+        return self.evolves_to.get(domon["num"])
+
+    def pre_evolutions(self, domon):
+        return self.evolves_from.get(domon["num"], ())
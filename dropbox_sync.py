@@ -0,0 +1,507 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import requests
+
+from storage import atomic_write, shard_matches, MANIFEST_NAME
+
+# ==========================
+# --- Client Dropbox v2   ---
+# ==========================
+# Token OAuth mis en cache jusqu'à peu avant expires_in, session HTTP
+# keep-alive partagée, refresh transparent sur 401. Les URLs sont
+# injectables pour pouvoir viser un serveur local de substitution.
+DROPBOX_API_URL = "https://api.dropboxapi.com"
+DROPBOX_CONTENT_URL = "https://content.dropboxapi.com"
+DROPBOX_HASH_BLOCK = 4 * 1024 * 1024
+# tentatives par requête : un token tout juste rafraîchi peut être refusé à son tour
+# (autre 401 concurrent), d'où deux retries pour les clients sync et async
+AUTH_ATTEMPTS = 3
+
+def dropbox_content_hash(data: bytes) -> str:
+    # Algorithme "content_hash" de Dropbox : sha256 de la concaténation des
+    # sha256 de chaque bloc de 4 Mo.
+    blocks = b"".join(
+        hashlib.sha256(data[i:i + DROPBOX_HASH_BLOCK]).digest()
+        for i in range(0, len(data), DROPBOX_HASH_BLOCK)
+    )
+    return hashlib.sha256(blocks).hexdigest()
+
+def is_not_found(resp):
+    # Dropbox signale un fichier absent par 409 + error_summary "path/not_found/..."
+    if resp.status_code != 409:
+        return False
+    try:
+        return resp.json().get("error_summary", "").startswith("path/not_found")
+    except ValueError:
+        return False
+
+
+class DropboxClient:
+    def __init__(self, app_key, app_secret, refresh_token,
+                 api_url=DROPBOX_API_URL, content_url=DROPBOX_CONTENT_URL,
+                 timeout=20, refresh_margin=300, session=None, state_path=None):
+        self.app_key = app_key
+        self.app_secret = app_secret
+        self.refresh_token = refresh_token
+        self.api_url = api_url.rstrip("/")
+        self.content_url = content_url.rstrip("/")
+        self.timeout = timeout
+        self.refresh_margin = refresh_margin
+        self.session = session or requests.Session()
+        self._token = None
+        self._token_expires = 0.0
+        self._lock = Lock()
+        self._state_lock = Lock()  # _remote + fichier d'état
+        self.state_path = state_path
+        self._remote = self._load_remote_state()
+        self.stats = {
+            "requests": 0, "token_refreshes": 0, "retries_401": 0, "errors": 0,
+            "uploads": 0, "uploads_skipped": 0, "downloads": 0, "downloads_skipped": 0,
+            "bytes_sent": 0, "bytes_received": 0, "bytes_skipped": 0,
+        }
+
+    # --------- OAuth ----------
+    def access_token(self, force=False, rejected=None):
+        # rejected : token refusé (401) ; déjà remplacé par un autre thread → pas de nouveau refresh
+        with self._lock:
+            if not force and self._token and self._token != rejected and time.monotonic() < self._token_expires:
+                return self._token
+            data = {
+                "refresh_token": self.refresh_token,
+                "grant_type": "refresh_token",
+                "client_id": self.app_key,
+                "client_secret": self.app_secret,
+            }
+            try:
+                resp = self.session.post(f"{self.api_url}/oauth2/token", data=data, timeout=15)
+                self.stats["requests"] += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                print("❌ Dropbox refresh error:", e)
+                return None
+            if resp.status_code != 200:
+                self.stats["errors"] += 1
+                print("❌ Dropbox refresh error:", resp.text)
+                return None
+            body = resp.json()
+            self._token = body.get("access_token")
+            expires_in = body.get("expires_in", 14400)
+            self._token_expires = time.monotonic() + max(0, expires_in - self.refresh_margin)
+            self.stats["token_refreshes"] += 1
+            return self._token
+
+    def invalidate_token(self):
+        with self._lock:
+            self._token = None
+            self._token_expires = 0.0
+
+    # --------- Requêtes ----------
+    def _post(self, url, headers=None, data=None, timeout=None):
+        # Retourne la réponse, ou None si aucun token n'a pu être obtenu.
+        token = None
+        for attempt in range(AUTH_ATTEMPTS):
+            token = self.access_token(rejected=token)
+            if not token:
+                return None
+            h = dict(headers or {})
+            h["Authorization"] = f"Bearer {token}"
+            resp = self.session.post(url, headers=h, data=data, timeout=timeout or self.timeout)
+            self.stats["requests"] += 1
+            if resp.status_code != 401:
+                return resp
+            # token expiré/révoqué côté Dropbox → un refresh (s'il n'a pas déjà eu lieu) puis retry
+            self.stats["retries_401"] += 1
+        return resp
+
+    def upload(self, remote_path, data: bytes):
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "Dropbox-API-Arg": json.dumps({
+                "path": remote_path,
+                "mode": "overwrite",
+                "mute": True,
+            }),
+        }
+        return self._post(f"{self.content_url}/2/files/upload", headers=headers, data=data)
+
+    def download(self, remote_path):
+        headers = {"Dropbox-API-Arg": json.dumps({"path": remote_path})}
+        return self._post(f"{self.content_url}/2/files/download", headers=headers)
+
+    def delete(self, remote_path):
+        headers = {"Content-Type": "application/json"}
+        resp = self._post(f"{self.api_url}/2/files/delete_v2", headers=headers, data=json.dumps({"path": remote_path}))
+        if resp is not None and resp.status_code == 200:
+            self._forget(remote_path)
+        return resp
+
+    def get_metadata(self, remote_path):
+        headers = {"Content-Type": "application/json"}
+        body = json.dumps({"path": remote_path})
+        return self._post(f"{self.api_url}/2/files/get_metadata", headers=headers, data=body)
+
+    # --------- Synchro par content_hash ----------
+    # Dernier état connu du distant ({remote_path: {"content_hash", "rev"}}),
+    # gardé sur disque pour survivre aux redémarrages.
+    def _load_remote_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print("⚠️ Dropbox sync state read error:", e)
+            return {}
+
+    def _remember(self, remote_path, content_hash, rev=None):
+        with self._state_lock:
+            self._remote[remote_path] = {"content_hash": content_hash, "rev": rev}
+            self._save_remote_state()
+
+    def _forget(self, remote_path):
+        with self._state_lock:
+            if self._remote.pop(remote_path, None) is not None:
+                self._save_remote_state()
+
+    def _save_remote_state(self):
+        # appelé sous _state_lock (uploads/downloads en parallèle depuis plusieurs threads)
+        if not self.state_path:
+            return
+        try:
+            atomic_write(self.state_path, json.dumps(self._remote).encode("utf-8"))
+        except Exception as e:
+            print("⚠️ Dropbox sync state write error:", e)
+
+    def sync_upload(self, local_path, remote_path):
+        # Retourne (statut, réponse) ; statut ∈ missing | skipped | uploaded | failed | no_token
+        if not os.path.exists(local_path):
+            return "missing", None
+        with open(local_path, "rb") as f:
+            data = f.read()
+        local_hash = dropbox_content_hash(data)
+        if self._remote.get(remote_path, {}).get("content_hash") == local_hash:
+            self.stats["uploads_skipped"] += 1
+            self.stats["bytes_skipped"] += len(data)
+            return "skipped", None
+        resp = self.upload(remote_path, data)
+        if resp is None:
+            return "no_token", None
+        if resp.status_code != 200:
+            return "failed", resp
+        self.stats["uploads"] += 1
+        self.stats["bytes_sent"] += len(data)
+        try:
+            meta = resp.json()
+        except ValueError:
+            meta = {}
+        self._remember(remote_path, meta.get("content_hash") or local_hash, meta.get("rev"))
+        return "uploaded", resp
+
+    def sync_download(self, local_path, remote_path):
+        # Retourne (statut, réponse) ; statut ∈ skipped | downloaded | not_found | failed | no_token
+        # not_found uniquement sur un vrai 409 path/not_found ; 429, 5xx, 401… → failed
+        local_hash = None
+        if os.path.exists(local_path):
+            with open(local_path, "rb") as f:
+                local_hash = dropbox_content_hash(f.read())
+        if local_hash:
+            meta_resp = self.get_metadata(remote_path)
+            if meta_resp is None:
+                return "no_token", None
+            if meta_resp.status_code == 200:
+                meta = meta_resp.json()
+                if meta.get("content_hash") == local_hash:
+                    self.stats["downloads_skipped"] += 1
+                    self.stats["bytes_skipped"] += meta.get("size", 0)
+                    self._remember(remote_path, local_hash, meta.get("rev"))
+                    return "skipped", meta_resp
+        resp = self.download(remote_path)
+        if resp is None:
+            return "no_token", None
+        if resp.status_code != 200:
+            return ("not_found" if is_not_found(resp) else "failed"), resp
+        with open(local_path, "wb") as f:
+            f.write(resp.content)
+        self.stats["downloads"] += 1
+        self.stats["bytes_received"] += len(resp.content)
+        self._remember(remote_path, dropbox_content_hash(resp.content))
+        return "downloaded", resp
+
+    def metrics(self):
+        s = dict(self.stats)
+        s["token_cached"] = bool(self._token) and time.monotonic() < self._token_expires
+        return s
+
+
+# ==================================
+# --- Client Dropbox asynchrone   ---
+# ==================================
+# Même API que DropboxClient mais en coroutines aiohttp, sur la boucle du bot.
+# Partage le token, le cache content_hash et les compteurs du client
+# synchrone (utilisé au boot, avant que la boucle ne tourne).
+class DropboxResponse:
+    # Réponse lue entièrement, interface compatible avec requests.Response
+    def __init__(self, status_code, content: bytes):
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", "replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncDropboxClient:
+    def __init__(self, client: DropboxClient, max_concurrency=4, timeout=20, connect_timeout=10):
+        self.client = client
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.max_concurrency = max_concurrency
+        self._session = None
+        self._slots = None
+        self._refresh_lock = None
+        self._loop = None
+
+    def _ensure_session(self):
+        # créés paresseusement, une fois par boucle : session, sémaphore et verrou sont liés
+        # à la boucle active (bot.run en ouvre une nouvelle à chaque reconnexion)
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._loop = loop
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._refresh_lock = asyncio.Lock()
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._session = None
+
+    async def _raw_post(self, url, headers=None, data=None):
+        # sans créneau : l'appelant tient déjà un slot (ou c'est le refresh, sérialisé)
+        session = self._ensure_session()
+        async with session.post(url, headers=headers, data=data) as resp:
+            body = await resp.read()
+        self.client.stats["requests"] += 1
+        return DropboxResponse(resp.status, body)
+
+    # --------- OAuth ----------
+    async def access_token(self, force=False, rejected=None):
+        # rejected : token refusé (401) ; on ne rafraîchit que s'il est toujours le token courant,
+        # sinon une autre requête l'a déjà remplacé et N 401 simultanés donnent un seul refresh
+        c = self.client
+
+        def usable():
+            return not force and c._token and c._token != rejected and time.monotonic() < c._token_expires
+
+        if usable():
+            return c._token
+        self._ensure_session()
+        async with self._refresh_lock:
+            if usable():
+                return c._token
+            data = {
+                "refresh_token": c.refresh_token,
+                "grant_type": "refresh_token",
+                "client_id": c.app_key,
+                "client_secret": c.app_secret,
+            }
+            try:
+                resp = await self._raw_post(f"{c.api_url}/oauth2/token", data=data)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                c.stats["errors"] += 1
+                print("❌ Dropbox refresh error:", e)
+                return None
+            if resp.status_code != 200:
+                c.stats["errors"] += 1
+                print("❌ Dropbox refresh error:", resp.text)
+                return None
+            body = resp.json()
+            with c._lock:
+                c._token = body.get("access_token")
+                c._token_expires = time.monotonic() + max(0, body.get("expires_in", 14400) - c.refresh_margin)
+            c.stats["token_refreshes"] += 1
+            return c._token
+
+    # --------- Requêtes ----------
+    async def _post(self, url, headers=None, data=None):
+        # le token est lu une fois le créneau obtenu : pas de token périmé pendant l'attente.
+        resp = None
+        token = None
+        self._ensure_session()
+        async with self._slots:
+            for attempt in range(AUTH_ATTEMPTS):
+                token = await self.access_token(rejected=token)
+                if not token:
+                    return None
+                h = dict(headers or {})
+                h["Authorization"] = f"Bearer {token}"
+                resp = await self._raw_post(url, headers=h, data=data)
+                if resp.status_code != 401:
+                    return resp
+                self.client.stats["retries_401"] += 1
+        return resp
+
+    async def upload(self, remote_path, data: bytes):
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "Dropbox-API-Arg": json.dumps({"path": remote_path, "mode": "overwrite", "mute": True}),
+        }
+        return await self._post(f"{self.client.content_url}/2/files/upload", headers=headers, data=data)
+
+    async def download(self, remote_path):
+        headers = {"Dropbox-API-Arg": json.dumps({"path": remote_path})}
+        return await self._post(f"{self.client.content_url}/2/files/download", headers=headers)
+
+    async def get_metadata(self, remote_path):
+        headers = {"Content-Type": "application/json"}
+        return await self._post(f"{self.client.api_url}/2/files/get_metadata", headers=headers,
+                                data=json.dumps({"path": remote_path}))
+
+    async def delete(self, remote_path):
+        headers = {"Content-Type": "application/json"}
+        resp = await self._post(f"{self.client.api_url}/2/files/delete_v2", headers=headers,
+                                data=json.dumps({"path": remote_path}))
+        if resp is not None and resp.status_code == 200:
+            await asyncio.to_thread(self.client._forget, remote_path)
+        return resp
+
+    # --------- Synchro par content_hash ----------
+    # Lecture/écriture disque et hash dans un thread : la boucle ne bloque jamais.
+    async def sync_upload(self, local_path, remote_path):
+        c = self.client
+        if not os.path.exists(local_path):
+            return "missing", None
+        data = await asyncio.to_thread(_read_bytes, local_path)
+        local_hash = await asyncio.to_thread(dropbox_content_hash, data)
+        if c._remote.get(remote_path, {}).get("content_hash") == local_hash:
+            c.stats["uploads_skipped"] += 1
+            c.stats["bytes_skipped"] += len(data)
+            return "skipped", None
+        resp = await self.upload(remote_path, data)
+        if resp is None:
+            return "no_token", None
+        if resp.status_code != 200:
+            return "failed", resp
+        c.stats["uploads"] += 1
+        c.stats["bytes_sent"] += len(data)
+        try:
+            meta = resp.json()
+        except ValueError:
+            meta = {}
+        await asyncio.to_thread(c._remember, remote_path, meta.get("content_hash") or local_hash, meta.get("rev"))
+        return "uploaded", resp
+
+    async def sync_download(self, local_path, remote_path):
+        c = self.client
+        local_hash = None
+        if os.path.exists(local_path):
+            local_hash = await asyncio.to_thread(_file_content_hash, local_path)
+        if local_hash:
+            meta_resp = await self.get_metadata(remote_path)
+            if meta_resp is None:
+                return "no_token", None
+            if meta_resp.status_code == 200:
+                meta = meta_resp.json()
+                if meta.get("content_hash") == local_hash:
+                    c.stats["downloads_skipped"] += 1
+                    c.stats["bytes_skipped"] += meta.get("size", 0)
+                    await asyncio.to_thread(c._remember, remote_path, local_hash, meta.get("rev"))
+                    return "skipped", meta_resp
+        resp = await self.download(remote_path)
+        if resp is None:
+            return "no_token", None
+        if resp.status_code != 200:
+            return ("not_found" if is_not_found(resp) else "failed"), resp
+        await asyncio.to_thread(_write_bytes, local_path, resp.content)
+        c.stats["downloads"] += 1
+        c.stats["bytes_received"] += len(resp.content)
+        content_hash = await asyncio.to_thread(dropbox_content_hash, resp.content)
+        await asyncio.to_thread(c._remember, remote_path, content_hash)
+        return "downloaded", resp
+
+    def metrics(self):
+        s = {"max_concurrency": self.max_concurrency, "session_open": bool(self._session and not self._session.closed)}
+        if self._slots is not None:
+            s["slots_free"] = self._slots._value
+        return s
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def _file_content_hash(path):
+    return dropbox_content_hash(_read_bytes(path))
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+# ==========================
+# --- Téléchargements de boot ---
+# ==========================
+# configured : Dropbox est configuré (refresh token présent) ; "no_token" n'est
+# alors plus un démarrage hors-ligne normal mais un échec.
+def download_failed(status, configured=True):
+    return status == "failed" or status == "no_token" and configured
+
+def refuse_empty_boot(status, local_path, configured=True):
+    # Téléchargement raté (réseau, 429, 5xx, token refusé) : démarrer sans copie locale
+    # reviendrait à démarrer vide, et le premier save écraserait les vraies données.
+    if not download_failed(status, configured):
+        return
+    if not os.path.exists(local_path):
+        raise SystemExit(f"❌ Could not fetch {local_path} from Dropbox and no local copy: aborting startup.")
+    print(f"⚠️ Could not fetch {local_path} from Dropbox: starting from the local copy.")
+
+def download_shard_set(client, local_dir, remote_dir, download, configured=True):
+    # manifeste distant à côté du local, puis seulement les shards absents ou
+    # abîmés ; le manifeste n'est remplacé que si tous ses shards sont vérifiés.
+    # download(local_path, remote_path) → statut de sync_download, "failed" sur exception
+    os.makedirs(local_dir, exist_ok=True)
+    manifest_path = os.path.join(local_dir, MANIFEST_NAME)
+    incoming_path = f"{manifest_path}.download"
+    status = download(incoming_path, f"{remote_dir}/{MANIFEST_NAME}")
+    if status == "not_found" or status == "no_token" and not configured:
+        return  # rien sur Dropbox (ou Dropbox non configuré) : premier boot shardé
+    if status not in ("downloaded", "skipped"):
+        # manifeste distant inconnu : repartir d'un jeu local ou vide puis publier
+        # effacerait les joueurs présents sur Dropbox
+        raise SystemExit(f"❌ Could not fetch the shard manifest from Dropbox ({status}): aborting startup.")
+    with open(incoming_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    entries = list(manifest.get("versions", {}).values())
+    missing = [v["file"] for v in entries if not shard_matches(local_dir, v)]
+
+    def fetch(name):
+        try:
+            return client.sync_download(os.path.join(local_dir, name), f"{remote_dir}/{name}")[0]
+        except Exception as e:
+            print(f"❌ Dropbox download error ({name}):", e)
+            return "error"
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            statuses = list(pool.map(fetch, missing))
+        failed = [name for name, st in zip(missing, statuses) if st not in ("downloaded", "skipped")]
+        print(f"✅ {len(missing) - len(failed)}/{len(missing)} shard(s) downloaded from Dropbox.")
+    bad = [v["file"] for v in entries if not shard_matches(local_dir, v)]
+    if bad:
+        if os.path.exists(manifest_path):
+            print(f"❌ {len(bad)} shard(s) missing or corrupt ({', '.join(bad[:5])}): keeping the previous local shard set.")
+            return
+        # sans jeu local, démarrer vide puis compacter effacerait les autres joueurs sur Dropbox
+        raise SystemExit(f"❌ {len(bad)} shard(s) missing or corrupt ({', '.join(bad[:5])}), aborting startup.")
+    os.replace(incoming_path, manifest_path)
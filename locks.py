@@ -0,0 +1,84 @@
+import time
+import asyncio
+import contextlib
+import contextvars
+
+# ================================================
+# --- Verrous fins (un par spawn, un par joueur) ---
+# ================================================
+# Tous les verrous d'une opération sont pris d'un coup, dans un ordre global
+# (spawns puis joueurs, puis par id) : pas d'interblocage possible. Prendre un
+# verrou qui précède un verrou déjà tenu par la même tâche lève une erreur.
+#
+# Les verrous tenus sont suivis par tâche (contextvar). Une tâche lancée par
+# create_task copie le contexte de sa créatrice : les tâches de fond (worker
+# d'outbox, timers) partent donc d'un contexte vierge via spawn_task, sinon
+# elles se croiraient détentrices des verrous de la tâche qui les a lancées.
+LOCK_ORDER = {"spawn": 0, "player": 1}
+_held_locks = contextvars.ContextVar("held_locks", default=())
+
+class LockManager:
+    def __init__(self):
+        self._locks = {}  # clé → [verrou, détenteurs + en attente] ; retiré à 0 (pas de fuite par joueur)
+        self.stats = {kind: {"acquired": 0, "contended": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0} for kind in LOCK_ORDER}
+
+    @staticmethod
+    def _order(key):
+        return (LOCK_ORDER[key[0]], str(key[1]))
+
+    @contextlib.asynccontextmanager
+    async def hold(self, *keys):
+        keys = sorted({(kind, str(ident)) for kind, ident in keys}, key=self._order)
+        held = _held_locks.get()
+        if held and keys and self._order(keys[0]) <= self._order(held[-1]):
+            raise RuntimeError(f"lock order violation: {keys[0]} after {held[-1]}")
+        acquired = []
+        users = []
+        token = None
+        try:
+            for key in keys:
+                entry = self._locks.get(key)
+                if entry is None:
+                    entry = self._locks[key] = [asyncio.Lock(), 0]
+                entry[1] += 1
+                users.append(key)
+                lock = entry[0]
+                st = self.stats[key[0]]
+                if lock.locked():
+                    st["contended"] += 1
+                t0 = time.perf_counter()
+                await lock.acquire()
+                acquired.append(lock)
+                waited = (time.perf_counter() - t0) * 1000
+                st["acquired"] += 1
+                st["wait_ms_total"] += waited
+                st["wait_ms_max"] = max(st["wait_ms_max"], waited)
+            token = _held_locks.set(held + tuple(keys))
+            yield
+        finally:
+            if token is not None:
+                _held_locks.reset(token)
+            for lock in reversed(acquired):
+                lock.release()
+            for key in users:
+                entry = self._locks[key]
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def spawn(self, key, *user_ids):
+        return self.hold(("spawn", key), *(("player", uid) for uid in user_ids))
+
+    def player(self, *user_ids):
+        return self.hold(*(("player", uid) for uid in user_ids))
+
+    def metrics(self):
+        out = {"locks": len(self._locks), "held": sum(1 for lock, _ in list(self._locks.values()) if lock.locked())}
+        for kind, st in self.stats.items():
+            out[kind] = dict(st, wait_ms_avg=round(st["wait_ms_total"] / st["acquired"], 3) if st["acquired"] else 0.0)
+        return out
+
+def spawn_task(coro):
+    # tâche de fond sans l'état de contexte (verrous tenus) de l'appelant ;
+    # create_task(context=...) n'existe qu'à partir de Python 3.11
+    return contextvars.Context().run(asyncio.get_running_loop().create_task, coro)
@@ -2,19 +2,31 @@ import os
 import sys
 import time
 import json
-import unicodedata
 import discord
 import random
 import asyncio
+import functools
+import itertools
+import statistics
+import atexit
 import traceback
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 from threading import Thread
+from collections import deque
 from flask import Flask
 from datetime import datetime, timezone, timedelta
+from dataclasses import dataclass, asdict, fields, field
 import pytz
-import requests
 from discord.errors import LoginFailure, PrivilegedIntentsRequired, HTTPException
+from storage import PlayerPersistence, ShardedPlayerPersistence, SqlitePlayerStore, JsonFileWriter, MANIFEST_NAME, SnapshotCodecError
+from dropbox_sync import DropboxClient, AsyncDropboxClient, refuse_empty_boot, download_shard_set
+from catalog import load_catalog, normalize_str, DomonRegistry
+from spawn_tables import SpawnTables, check_sampler
+from battle_engine import BattleState
+from timers import TimerService
+from locks import LockManager
+from outbox import ChannelOutbox, outbox_stats, PRIORITY_CRITICAL, PRIORITY_NORMAL, PRIORITY_INFO
 
 # =========================
 # --- Config / ENV     ---
@@ -34,82 +46,111 @@ DROPBOX_APP_KEY = os.getenv("DROPBOX_APP_KEY")
 DROPBOX_APP_SECRET = os.getenv("DROPBOX_APP_SECRET")
 DROPBOX_REFRESH_TOKEN = os.getenv("DROPBOX_REFRESH_TOKEN")
 DROPBOX_PATH = "/players.json"
+DROPBOX_DB_PATH = "/players.db"
+
+DROPBOX_API_URL = os.getenv("DROPBOX_API_URL", "https://api.dropboxapi.com")
+DROPBOX_CONTENT_URL = os.getenv("DROPBOX_CONTENT_URL", "https://content.dropboxapi.com")
+
+dropbox = DropboxClient(
+    DROPBOX_APP_KEY,
+    DROPBOX_APP_SECRET,
+    DROPBOX_REFRESH_TOKEN,
+    api_url=DROPBOX_API_URL,
+    content_url=DROPBOX_CONTENT_URL,
+    state_path=".dropbox_sync.json",
+)
+
+# Une fois le bot connecté, les transferts passent par le client aiohttp sur la
+# boucle du bot (bot_loop) ; avant, et depuis le boot, par le client synchrone.
+adropbox = AsyncDropboxClient(dropbox, max_concurrency=int(os.getenv("DROPBOX_MAX_CONCURRENCY", "4")))
+bot_loop = None
+
+def _on_bot_loop(coro, timeout=60):
+    # Appelé depuis un thread (writer, pool) : exécute la coroutine sur la boucle du bot.
+    fut = asyncio.run_coroutine_threadsafe(coro, bot_loop)
+    try:
+        return fut.result(timeout=timeout)
+    except BaseException:
+        fut.cancel()
+        raise
 
-def get_dropbox_access_token():
-    url = "https://api.dropboxapi.com/oauth2/token"
-    data = {
-        "refresh_token": DROPBOX_REFRESH_TOKEN,
-        "grant_type": "refresh_token",
-        "client_id": DROPBOX_APP_KEY,
-        "client_secret": DROPBOX_APP_SECRET,
-    }
+def _can_use_bot_loop():
+    if bot_loop is None or not bot_loop.is_running() or bot_loop.is_closed():
+        return False
     try:
-        resp = requests.post(url, data=data, timeout=15)
-    except Exception as e:
-        print("❌ Dropbox refresh error:", e)
-        return None
-    if resp.status_code == 200:
-        return resp.json().get("access_token")
-    else:
-        print("❌ Dropbox refresh error:", resp.text)
-        return None
+        asyncio.get_running_loop()
+        return False  # déjà dans une boucle : ne jamais bloquer dessus
+    except RuntimeError:
+        return True
 
-def upload_players_dropbox():
-    access_token = get_dropbox_access_token()
-    if not access_token:
+def _report_upload(local_path, status, resp):
+    if status == "missing":
+        print(f"ℹ️ No {local_path} to upload yet.")
+    elif status == "no_token":
         print("❌ No Dropbox access token, can't upload.")
-        return
-    if not os.path.exists("players.json"):
-        print("ℹ️ No players.json to upload yet.")
-        return
+    elif status == "skipped":
+        pass  # contenu identique au dernier upload
+    elif status == "uploaded":
+        print(f"☁️ {local_path} uploaded to Dropbox.")
+    else:
+        print(f"❌ Failed to upload {local_path}:", resp.text)
+    return status in ("uploaded", "skipped")
+
+def _report_download(local_path, status, resp):
+    if status == "no_token":
+        print("❌ No Dropbox access token, can't download.")
+    elif status == "skipped":
+        print(f"✅ {local_path} already up to date with Dropbox (no transfer).")
+    elif status == "downloaded":
+        print(f"✅ {local_path} downloaded from Dropbox.")
+    elif status == "not_found":
+        print(f"🆕 No {local_path} found on Dropbox. Will create new one on first save.")
+    else:
+        print(f"❌ Dropbox download of {local_path} failed:", resp.status_code if resp is not None else "?", resp.text if resp is not None else "")
+    return status
+
+async def upload_players_dropbox_async(local_path="players.json", remote_path=DROPBOX_PATH):
     try:
-        with open("players.json", "rb") as f:
-            data = f.read()
+        status, resp = await adropbox.sync_upload(local_path, remote_path)
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
-        print("❌ Couldn't read players.json:", e)
-        return
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/octet-stream",
-        "Dropbox-API-Arg": json.dumps({
-            "path": DROPBOX_PATH,
-            "mode": "overwrite",
-            "mute": True,
-        }),
-    }
+        print(f"❌ Failed to upload {local_path}:", e)
+        return False
+    return _report_upload(local_path, status, resp)
+
+def upload_players_dropbox(local_path="players.json", remote_path=DROPBOX_PATH):
+    if _can_use_bot_loop():
+        try:
+            return _on_bot_loop(upload_players_dropbox_async(local_path, remote_path))
+        except Exception as e:
+            print(f"❌ Failed to upload {local_path}:", e)
+            return False
     try:
-        resp = requests.post("https://content.dropboxapi.com/2/files/upload", headers=headers, data=data, timeout=20)
+        status, resp = dropbox.sync_upload(local_path, remote_path)
     except Exception as e:
-        print("❌ Failed to upload players.json:", e)
-        return
-    if resp.status_code == 200:
-        print("☁️ players.json uploaded to Dropbox.")
+        print(f"❌ Failed to upload {local_path}:", e)
+        return False
+    return _report_upload(local_path, status, resp)
+
+def delete_dropbox_file(remote_path):
+    if _can_use_bot_loop():
+        resp = _on_bot_loop(adropbox.delete(remote_path))
     else:
-        print("❌ Failed to upload players.json:", resp.text)
+        resp = dropbox.delete(remote_path)
+    if resp is not None and resp.status_code not in (200, 409):
+        print(f"⚠️ Dropbox delete {remote_path} failed:", resp.text)
 
-def download_players_dropbox():
-    access_token = get_dropbox_access_token()
-    if not access_token:
-        print("❌ No Dropbox access token, can't download.")
-        return
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Dropbox-API-Arg": json.dumps({"path": DROPBOX_PATH}),
-    }
+def download_players_dropbox(local_path="players.json", remote_path=DROPBOX_PATH):
     try:
-        resp = requests.post("https://content.dropboxapi.com/2/files/download", headers=headers, timeout=20)
+        status, resp = dropbox.sync_download(local_path, remote_path)
     except Exception as e:
         print("❌ Dropbox download error:", e)
-        return
-    if resp.status_code == 200:
-        try:
-            with open("players.json", "wb") as f:
-                f.write(resp.content)
-            print("✅ players.json downloaded from Dropbox.")
-        except Exception as e:
-            print("❌ Couldn't write players.json:", e)
-    else:
-        print("🆕 No players.json found on Dropbox. Will create new one on first save.")
+        return "failed"
+    return _report_download(local_path, status, resp)
+
+def download_shards_dropbox(local_dir, remote_dir):
+    download_shard_set(dropbox, local_dir, remote_dir, download_players_dropbox, bool(DROPBOX_REFRESH_TOKEN))
 
 # ==============================
 # --- Keep-alive Flask server ---
@@ -124,6 +165,33 @@ def home():
 def health():
     return "OK", 200
 
+@app.get('/metrics')
+def metrics():
+    return {
+        "persistence": persistence.metrics(),
+        "json_files": json_files.metrics(),
+        "dropbox": dropbox.metrics(),
+        "dropbox_async": adropbox.metrics(),
+        "catalog": CATALOG.metrics(),
+        "spawn_tables": SPAWN_TABLES.metrics(),
+        "render_cache": RENDER_CACHE.metrics(),
+        "spawns": {
+            "channels": len(config["spawn_channels"]) if config else 0,
+            "active": sum(1 for st in game_state.spawns.values() if st.active_spawn),
+            "bimnet_guilds": sum(1 for g in game_state.bimnet if is_bimnet_active(g)),
+            "scheduled": TIMERS.armed("spawn"),
+        },
+        "outbox": outbox_metrics(),
+        "locks": LOCKS.metrics(),
+        "timers": TIMERS.metrics(),
+        "battles": dict(
+            battle_ui_stats,
+            active=len(ACTIVE_BATTLES),
+            busy_players=len(BUSY_PLAYERS),
+            setup_median_s=round(statistics.median(battle_setup_times), 2) if battle_setup_times else None,
+        ),
+    }, 200
+
 def run_web():
     port = int(os.getenv("PORT", "10000"))
     app.run(host='0.0.0.0', port=port, threaded=True)
@@ -147,22 +215,61 @@ bot = commands.Bot(command_prefix="!", intents=intents)
 SAVE_FILE = "players.json"
 CONFIG_FILE = "config.json"
 STATE_FILE = "state.json"
+JOURNAL_FILE = "players.journal"
+DB_FILE = "players.db"
+SHARDS_DIR = "players_shards"
 players = None
 config = None
 
-scan_lock = asyncio.Lock()
-scan_timer_task = None
+# --------- Persistence ----------
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").strip().lower()  # json | sqlite
+PERSIST_INTERVAL_SECONDS = float(os.getenv("PERSIST_INTERVAL_SECONDS", "2"))
+COMPACT_INTERVAL_SECONDS = float(os.getenv("COMPACT_INTERVAL_SECONDS", "60"))
+COMPACT_MAX_BYTES = int(os.getenv("COMPACT_MAX_BYTES", str(256 * 1024)))
+# json | gzip | lzma | marshal (auto-détecté à la lecture). marshal dépend de la version
+# de Python : un snapshot marshal n'est relu que par la même version (majeure.mineure),
+# repasser en json avant de changer d'interpréteur (runtime.txt / image Docker)
+PLAYERS_CODEC = os.getenv("PLAYERS_CODEC", "json").strip().lower()
+PLAYER_SHARDS = int(os.getenv("PLAYER_SHARDS", "0"))  # 0 = un seul players.json
+
+if STORAGE_BACKEND == "sqlite":
+    # players/state/config dans un seul fichier WAL ; import auto de players.json au 1er boot
+    persistence = SqlitePlayerStore(
+        DB_FILE,
+        upload=lambda path, name: upload_players_dropbox(path, f"/{name}"),
+        import_from=SAVE_FILE,
+        kv_files={"state": STATE_FILE, "config": CONFIG_FILE},
+        backup_interval=COMPACT_INTERVAL_SECONDS,
+    )
+elif PLAYER_SHARDS > 0:
+    # seuls les shards modifiés sont réécrits/uploadés ; manifeste publié en dernier
+    persistence = ShardedPlayerPersistence(
+        SHARDS_DIR,
+        shards=PLAYER_SHARDS,
+        legacy_path=SAVE_FILE,
+        upload=lambda path, name: upload_players_dropbox(path, f"/{name}"),
+        remove=lambda name: delete_dropbox_file(f"/{name}"),
+        journal_path=JOURNAL_FILE,
+        compact_interval=COMPACT_INTERVAL_SECONDS,
+        compact_max_bytes=COMPACT_MAX_BYTES,
+        codec=PLAYERS_CODEC,
+    )
+else:
+    persistence = PlayerPersistence(
+        SAVE_FILE,
+        upload=lambda path, name: upload_players_dropbox(path, f"/{name}"),
+        journal_path=JOURNAL_FILE,
+        compact_interval=COMPACT_INTERVAL_SECONDS,
+        compact_max_bytes=COMPACT_MAX_BYTES,
+        codec=PLAYERS_CODEC,
+    )
+
 
 SCAN_WINDOW_SECONDS = 120
 BATTLE_TIMEOUT = 60
 MAX_SELECT_OPTIONS = 25  # Limite Discord
 
 # --------- Helpers encodage / temps ----------
-def normalize_str(s: str) -> str:
-    if not isinstance(s, str):
-        return s
-    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii").strip().lower()
-
 def now_utc_iso():
     return datetime.now(timezone.utc).isoformat()
 
@@ -172,1797 +279,329 @@ def parse_iso(dt_str):
     except Exception:
         return None
 
-# --------- Game-wide state ----------
+# --------- Game state (par salon de spawn / par guilde) ----------
+# Chargé une seule fois au boot ; les helpers modifient l'objet en mémoire et
+# save_state() ne fait que le marquer dirty (écrit par persist_task).
+# Chaque salon de spawn a son propre DOMON sauvage, son verrou et son timer de
+# scan ; le boost BIMNet est par guilde.
+@dataclass
+class SpawnState:
+    active_spawn: bool = False
+    spawned_domon: int | None = None
+    scan_claimed: str | None = None
+    capture_attempted: str | None = None
+    scan_timer_started: datetime | None = None
+
+    def to_dict(self):
+        d = asdict(self)
+        if d["scan_timer_started"] is not None:
+            d["scan_timer_started"] = d["scan_timer_started"].isoformat()
+        return d
+
+    @classmethod
+    def from_dict(cls, raw):
+        known = {f.name for f in fields(cls)}
+        state = cls(**{k: v for k, v in (raw or {}).items() if k in known})
+        state.scan_timer_started = parse_iso(state.scan_timer_started)
+        return state
+
+@dataclass
+class GameState:
+    spawns: dict = field(default_factory=dict)  # {channel_id: SpawnState}
+    bimnet: dict = field(default_factory=dict)  # {guild_id: datetime de fin}
+    timers: list = field(default_factory=list)  # échéances persistées (TIMERS.snapshot())
+
+    def spawn(self, key):
+        st = self.spawns.get(key)
+        if st is None:
+            st = self.spawns[key] = SpawnState()
+        return st
+
+    def to_dict(self):
+        return {
+            "spawns": {k: st.to_dict() for k, st in self.spawns.items()},
+            "bimnet": {g: until.isoformat() for g, until in self.bimnet.items()},
+            "timers": self.timers,
+        }
+
+    @classmethod
+    def from_dict(cls, raw):
+        raw = raw or {}
+        if "spawns" not in raw:
+            # ancien state.json global : rattaché au salon de spawn historique (remap_legacy_state)
+            state = cls(spawns={LEGACY_SPAWN_KEY: SpawnState.from_dict(raw)})
+            until = parse_iso(raw.get("bimnet_until"))
+            if until:
+                state.bimnet[LEGACY_SPAWN_KEY] = until
+            return state
+        state = cls(spawns={k: SpawnState.from_dict(v) for k, v in raw["spawns"].items()}, timers=raw.get("timers") or [])
+        for g, until in (raw.get("bimnet") or {}).items():
+            until = parse_iso(until)
+            if until:
+                state.bimnet[g] = until
+        return state
+
+LEGACY_SPAWN_KEY = "legacy"
+game_state = GameState()
+state_dirty = False
+json_files = JsonFileWriter()
+# Échéances de jeu (fin de scan, fin de BIMNet, tour de combat) : un seul service
+TIMERS = TimerService()
+
+# Verrous fins : un par spawn, un par joueur (voir locks.py)
+LOCKS = LockManager()
+
+def player_locked(func):
+    # commande qui modifie l'inventaire / la progression de son auteur
+    @functools.wraps(func)
+    async def wrapper(ctx, *args, **kwargs):
+        async with LOCKS.player(ctx.author.id):
+            return await func(ctx, *args, **kwargs)
+    return wrapper
+
 def load_state():
+    if STORAGE_BACKEND == "sqlite":
+        return GameState.from_dict(persistence.get_kv("state"))
     try:
         if os.path.exists(STATE_FILE):
             with open(STATE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+                return GameState.from_dict(json.load(f))
     except Exception as e:
         print("⚠️ STATE_FILE read error, resetting:", e)
-    return {
-        "active_spawn": False,
-        "spawned_domon": None,
-        "scan_claimed": None,
-        "capture_attempted": None,
-        "scan_timer_started": None,
-        "bimnet_until": None
-    }
+    return GameState()
 
-def save_state(state):
-    try:
-        with open(STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print("⚠️ STATE_FILE write error:", e)
-
-def reset_state():
-    state = load_state()
-    state.update({
-        "active_spawn": False,
-        "spawned_domon": None,
-        "scan_claimed": None,
-        "capture_attempted": None,
-        "scan_timer_started": None
-    })
-    save_state(state)
-    return state
-
-def get_current_domon():
-    state = load_state()
-    if state["spawned_domon"] is not None:
-        return next((d for d in DOMON_LIST if d["num"] == state["spawned_domon"]), None)
+def save_state():
+    global state_dirty
+    state_dirty = True
+
+TIMERS.on_change = save_state
+
+def flush_state():
+    global state_dirty
+    if not state_dirty:
+        return
+    state_dirty = False
+    game_state.timers = TIMERS.snapshot()
+    if STORAGE_BACKEND == "sqlite":
+        persistence.set_kv("state", game_state.to_dict())
+    else:
+        json_files.write(STATE_FILE, game_state.to_dict())
+
+def close_persistence():
+    flush_state()
+    json_files.close()
+    persistence.close()
+
+atexit.register(close_persistence)
+
+def reset_state(key):
+    game_state.spawns[key] = SpawnState()
+    save_state()
+    return game_state.spawns[key]
+
+def get_current_domon(key):
+    st = game_state.spawns.get(key)
+    if st and st.spawned_domon is not None:
+        return REGISTRY.get(st.spawned_domon)
     return None
 
-def set_spawned_domon(domon):
-    state = load_state()
-    state.update({
-        "active_spawn": True,
-        "spawned_domon": domon["num"],
-        "scan_claimed": None,
-        "capture_attempted": None,
-        "scan_timer_started": None
-    })
-    save_state(state)
-
-def clear_spawn():
-    reset_state()
-
-def claim_scan(user_id):
-    state = load_state()
-    state["scan_claimed"] = user_id
-    state["capture_attempted"] = None
-    state["scan_timer_started"] = now_utc_iso()
-    save_state(state)
-
-def mark_attempt(user_id):
-    state = load_state()
-    state["capture_attempted"] = user_id
-    save_state(state)
-
-def is_scan_expired():
-    state = load_state()
-    if not state["scan_timer_started"]:
-        return False
-    started = parse_iso(state["scan_timer_started"])
+def set_spawned_domon(key, domon):
+    st = reset_state(key)
+    st.active_spawn = True
+    st.spawned_domon = domon["num"]
+    save_state()
+
+def clear_spawn(key):
+    reset_state(key)
+
+def orphan_spawn_keys():
+    # salons dont le DOMON en cours n'existe plus dans le catalogue
+    return [k for k, st in game_state.spawns.items()
+            if st.spawned_domon is not None and REGISTRY.get(st.spawned_domon) is None]
+
+def claim_scan(key, user_id):
+    st = game_state.spawn(key)
+    st.scan_claimed = user_id
+    st.capture_attempted = None
+    st.scan_timer_started = datetime.now(timezone.utc)
+    save_state()
+
+def mark_attempt(key, user_id):
+    game_state.spawn(key).capture_attempted = user_id
+    save_state()
+
+def is_scan_expired(key):
+    st = game_state.spawns.get(key)
+    started = st.scan_timer_started if st else None
     if not started:
         return False
     now = datetime.now(timezone.utc)
     return (now - started).total_seconds() > SCAN_WINDOW_SECONDS
 
-def is_bimnet_active():
-    state = load_state()
-    if not state["bimnet_until"]:
-        return False
-    until = parse_iso(state["bimnet_until"])
-    return until and datetime.now(timezone.utc) < until
-
-def activate_bimnet(minutes=30):
-    state = load_state()
-    state["bimnet_until"] = (datetime.now(timezone.utc) + timedelta(minutes=minutes)).isoformat()
-    save_state(state)
+def is_bimnet_active(guild_id):
+    until = game_state.bimnet.get(str(guild_id))
+    return bool(until) and datetime.now(timezone.utc) < until
+
+def activate_bimnet(guild_id, minutes=30):
+    until = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+    game_state.bimnet[str(guild_id)] = until
+    TIMERS.arm("bimnet", str(guild_id), until.timestamp())
+    save_state()
+    reschedule_guild_spawns(guild_id)
+
+def restore_timers():
+    # échéances persistées + celles déduites de l'état (ancien state.json sans timers)
+    TIMERS.restore(game_state.timers)
+    for key, st in game_state.spawns.items():
+        if st.scan_timer_started and TIMERS.deadline("scan", key) is None:
+            TIMERS.arm("scan", key, st.scan_timer_started.timestamp() + SCAN_WINDOW_SECONDS)
+    for guild_id, until in game_state.bimnet.items():
+        if TIMERS.deadline("bimnet", guild_id) is None:
+            TIMERS.arm("bimnet", guild_id, until.timestamp())
 
 def load_players():
     try:
-        if os.path.exists(SAVE_FILE):
-            with open(SAVE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+        return persistence.load()
     except Exception as e:
+        if persistence.backend == "json-sharded" or isinstance(e, SnapshotCodecError):
+            # démarrer vide puis compacter écraserait les données (et le manifeste côté Dropbox)
+            raise SystemExit(f"❌ Player data unreadable, aborting startup: {e}")
         print("⚠️ players.json read error, starting empty:", e)
-    return {}
+    data = {}
+    persistence.bind(data)
+    return data
 
-def save_players(players_obj):
-    try:
-        with open(SAVE_FILE, "w", encoding="utf-8") as f:
-            json.dump(players_obj, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print("⚠️ players.json write error:", e)
-        return
-    try:
-        upload_players_dropbox()
-    except Exception as e:
-        print("⚠️ Dropbox upload skipped:", e)
+def save_players(players_obj, *user_ids):
+    # Write-behind : on marque seulement les joueurs modifiés (tous si aucun id),
+    # persist_task se charge d'écrire le fichier + upload Dropbox hors event loop.
+    persistence.mark_dirty(players_obj, user_ids)
+
+# --------- Mutations joueurs (journalisées) ----------
+def create_player(user_id, data):
+    persistence.record(players, {"op": "player", "uid": user_id, "data": data})
+
+def add_item(user_id, item, delta=1):
+    persistence.record(players, {"op": "item", "uid": user_id, "item": item, "delta": delta})
+
+def add_xp(user_id, delta):
+    persistence.record(players, {"op": "xp", "uid": user_id, "delta": delta})
+
+def add_to_collection(user_id, domon):
+    persistence.record(players, {"op": "collect", "uid": user_id, "num": domon["num"]})
+
+def set_flag(user_id, flag, value):
+    persistence.record(players, {"op": "flag", "uid": user_id, "flag": flag, "value": value})
+
+def set_player_field(user_id, field, value):
+    persistence.record(players, {"op": "set", "uid": user_id, "field": field, "value": value})
 
 def load_config():
+    if STORAGE_BACKEND == "sqlite":
+        return persistence.get_kv("config", {"spawn_channels": {}})
     try:
         if os.path.exists(CONFIG_FILE):
             with open(CONFIG_FILE, "r", encoding="utf-8") as f:
                 return json.load(f)
     except Exception as e:
         print("⚠️ config.json read error:", e)
-    return {"spawn_channel_id": None}
+    return {"spawn_channels": {}}
 
 def save_config(cfg):
-    try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(cfg, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print("⚠️ config.json write error:", e)
-
-# ------- Liste des 151 DOMON (évolutions incluses) -------
-DOMON_LIST = [
-    {
-        "num": 1, "name": "Craquos", "type": "Structure", "rarity": "Common", "evolution": "Fissuron",
-        "description": "Small crack spirit, dwells in old walls.",
-        "stats": {"hp": 38, "atk": 10, "def": 8, "spd": 10},
-        "moves": [
-            {"name": "Wall Slam", "power": 10, "accuracy": 95, "desc": "Slams the wall at the enemy."},
-            {"name": "Crack Shot", "power": 8, "accuracy": 100, "desc": "Shoots a fissure at the foe."},
-            {"name": "Defensive Curl", "power": 0, "accuracy": 100, "desc": "Boosts defense for one turn."},
-            {"name": "Shatter", "power": 14, "accuracy": 80, "desc": "A risky, powerful attack."}
-        ]
-    },
-    {
-        "num": 2, "name": "Fissuron", "type": "Structure", "rarity": "Uncommon", "evolution": "Seismorph",
-        "description": "Its power shakes the foundations.",
-        "stats": {"hp": 45, "atk": 13, "def": 10, "spd": 12},
-        "moves": [
-            {"name": "Quake Burst", "power": 14, "accuracy": 90, "desc": "A small quake hits the foe."},
-            {"name": "Stone Shield", "power": 0, "accuracy": 100, "desc": "Increases defense sharply."},
-            {"name": "Crackling Slam", "power": 11, "accuracy": 100, "desc": "Hits with a rumbling blow."},
-            {"name": "Seismic Press", "power": 17, "accuracy": 75, "desc": "Crushing attack, low accuracy."}
-        ]
-    },
-    {
-        "num": 3, "name": "Seismorph", "type": "Structure", "rarity": "Rare", "evolution": None,
-        "description": "The king of structural tremors.",
-        "stats": {"hp": 52, "atk": 19, "def": 13, "spd": 14},
-        "moves": [
-            {"name": "Epic Quake", "power": 22, "accuracy": 85, "desc": "Massive quake rocks the field."},
-            {"name": "Steel Guard", "power": 0, "accuracy": 100, "desc": "Raises defense sharply."},
-            {"name": "Crush Down", "power": 16, "accuracy": 90, "desc": "Heavy blow lowers foe's defense."},
-            {"name": "Rock Avalanche", "power": 15, "accuracy": 95, "desc": "Cascades of debris fall on the enemy."}
-        ]
-    },
-    {
-        "num": 4, "name": "Moldina", "type": "Bio-Parasite", "rarity": "Common", "evolution": "Moldarak",
-        "description": "Mouldy spores haunt humid corners.",
-        "stats": {"hp": 37, "atk": 9, "def": 8, "spd": 11},
-        "moves": [
-            {"name": "Spore Puff", "power": 9, "accuracy": 100, "desc": "A cloud of spores, may poison."},
-            {"name": "Fungal Bite", "power": 8, "accuracy": 95, "desc": "A bite that saps HP."},
-            {"name": "Mold Shield", "power": 0, "accuracy": 100, "desc": "Boosts defense for one turn."},
-            {"name": "Musty Gust", "power": 11, "accuracy": 90, "desc": "A stinky wind, may reduce speed."}
-        ]
-    },
-    {
-        "num": 5, "name": "Moldarak", "type": "Bio-Parasite", "rarity": "Uncommon", "evolution": "Sporusor",
-        "description": "Spreads rapidly when ignored.",
-        "stats": {"hp": 44, "atk": 13, "def": 11, "spd": 12},
-        "moves": [
-            {"name": "Toxic Spores", "power": 13, "accuracy": 95, "desc": "May poison the enemy."},
-            {"name": "Rapid Spread", "power": 11, "accuracy": 100, "desc": "Hits quickly, ignores defense boosts."},
-            {"name": "Moldy Barrier", "power": 0, "accuracy": 100, "desc": "Absorbs next hit, raises defense."},
-            {"name": "Rot Smack", "power": 14, "accuracy": 90, "desc": "Hard hit, may poison."}
-        ]
-    },
-    {
-        "num": 6, "name": "Sporusor", "type": "Bio-Parasite", "rarity": "Rare", "evolution": None,
-        "description": "Toxic, can corrupt an entire block!",
-        "stats": {"hp": 52, "atk": 18, "def": 13, "spd": 14},
-        "moves": [
-            {"name": "Corrupt Cloud", "power": 19, "accuracy": 90, "desc": "Poisonous gas engulfs the foe."},
-            {"name": "Myco Drain", "power": 13, "accuracy": 100, "desc": "Drains enemy's HP."},
-            {"name": "Toxic Guard", "power": 0, "accuracy": 100, "desc": "Greatly increases defense."},
-            {"name": "Fungal Rage", "power": 20, "accuracy": 85, "desc": "All-out attack, low accuracy."}
-        ]
-    },
-    {
-        "num": 7, "name": "Voltus", "type": "Énergie", "rarity": "Common", "evolution": "Voltark",
-        "description": "Loves electric wires, flickers the lights.",
-        "stats": {"hp": 36, "atk": 11, "def": 8, "spd": 13},
-        "moves": [
-            {"name": "Zap", "power": 10, "accuracy": 95, "desc": "Sends a shock at the enemy."},
-            {"name": "Short Circuit", "power": 7, "accuracy": 100, "desc": "Disrupts foe's attack (may lower atk)."},
-            {"name": "Static Field", "power": 0, "accuracy": 100, "desc": "Boosts defense, may paralyze."},
-            {"name": "Flicker Strike", "power": 12, "accuracy": 85, "desc": "Quick, but not always reliable."}
-        ]
-    },
-    {
-        "num": 8, "name": "Voltark", "type": "Énergie", "rarity": "Uncommon", "evolution": "Voltaura",
-        "description": "Grows strong near overloaded panels.",
-        "stats": {"hp": 42, "atk": 14, "def": 9, "spd": 14},
-        "moves": [
-            {"name": "Overload", "power": 13, "accuracy": 90, "desc": "Electric surge, may paralyze."},
-            {"name": "Power Drain", "power": 10, "accuracy": 100, "desc": "Drains foe's energy."},
-            {"name": "Amp Guard", "power": 0, "accuracy": 100, "desc": "Raises defense for 2 turns."},
-            {"name": "Spark Burst", "power": 15, "accuracy": 85, "desc": "A sudden, strong jolt."}
-        ]
-    },
-    {
-        "num": 9, "name": "Voltaura", "type": "Énergie", "rarity": "Rare", "evolution": None,
-        "description": "Can short-circuit an entire building.",
-        "stats": {"hp": 49, "atk": 18, "def": 12, "spd": 16},
-        "moves": [
-            {"name": "Short Circuit", "power": 17, "accuracy": 85, "desc": "Massive surge, can paralyze."},
-            {"name": "Electric Veil", "power": 0, "accuracy": 100, "desc": "Shields with electricity, raises defense."},
-            {"name": "Thunder Crash", "power": 19, "accuracy": 80, "desc": "Huge power, but risky."},
-            {"name": "Static Pulse", "power": 13, "accuracy": 95, "desc": "Paralyzes if it hits twice in a row."}
-        ]
-    },
-    {
-        "num": 10, "name": "Widowra", "type": "Spectre", "rarity": "Uncommon", "evolution": "Widowhex",
-        "description": "Restless soul of a past owner.",
-        "stats": {"hp": 37, "atk": 10, "def": 11, "spd": 13},
-        "moves": [
-            {"name": "Ghost Grip", "power": 12, "accuracy": 95, "desc": "Icy hands grip the foe."},
-            {"name": "Spirit Veil", "power": 0, "accuracy": 100, "desc": "Raises defense for one turn."},
-            {"name": "Whisper Strike", "power": 9, "accuracy": 100, "desc": "A quick haunting hit."},
-            {"name": "Haunting Scream", "power": 15, "accuracy": 80, "desc": "Terrifies the foe, may lower defense."}
-        ]
-    },
-    {
-        "num": 11, "name": "Widowhex", "type": "Spectre", "rarity": "Rare", "evolution": None,
-        "description": "Haunts corridors during renovations.",
-        "stats": {"hp": 44, "atk": 15, "def": 13, "spd": 14},
-        "moves": [
-            {"name": "Eerie Wail", "power": 16, "accuracy": 85, "desc": "A bone-chilling shriek."},
-            {"name": "Spectral Wall", "power": 0, "accuracy": 100, "desc": "Greatly boosts defense."},
-            {"name": "Phantom Slash", "power": 12, "accuracy": 95, "desc": "Slashes with ghostly claws."},
-            {"name": "Nightmare", "power": 18, "accuracy": 80, "desc": "May put the foe to sleep."}
-        ]
-    },
-    {
-        "num": 12, "name": "BIMbug", "type": "Numérique", "rarity": "Common", "evolution": "BIMphage",
-        "description": "Digital glitch in the building's blueprint.",
-        "stats": {"hp": 34, "atk": 10, "def": 7, "spd": 14},
-        "moves": [
-            {"name": "Bug Byte", "power": 9, "accuracy": 100, "desc": "Digital gnawing attack."},
-            {"name": "Glitch Wave", "power": 8, "accuracy": 95, "desc": "Sends corrupt data to foe."},
-            {"name": "Error Shield", "power": 0, "accuracy": 100, "desc": "Raises defense, avoids crits."},
-            {"name": "Pixel Jam", "power": 12, "accuracy": 85, "desc": "Overloads the enemy."}
-        ]
-    },
-    {
-        "num": 13, "name": "BIMphage", "type": "Numérique", "rarity": "Uncommon", "evolution": "BIMgeist",
-        "description": "Eats away at data models.",
-        "stats": {"hp": 39, "atk": 13, "def": 8, "spd": 15},
-        "moves": [
-            {"name": "Data Drain", "power": 12, "accuracy": 100, "desc": "Siphons HP as data."},
-            {"name": "Code Shield", "power": 0, "accuracy": 100, "desc": "Avoids one attack, raises defense."},
-            {"name": "Bitstorm", "power": 14, "accuracy": 90, "desc": "Hits with a flurry of bits."},
-            {"name": "System Crash", "power": 16, "accuracy": 80, "desc": "Chance to stun the enemy."}
-        ]
-    },
-    {
-        "num": 14, "name": "BIMgeist", "type": "Numérique", "rarity": "Rare", "evolution": None,
-        "description": "Causes plans to vanish mysteriously.",
-        "stats": {"hp": 45, "atk": 17, "def": 11, "spd": 17},
-        "moves": [
-            {"name": "Vanishing Code", "power": 18, "accuracy": 85, "desc": "Attack that may disable moves."},
-            {"name": "Data Cloak", "power": 0, "accuracy": 100, "desc": "Boosts defense and evasion."},
-            {"name": "Blueprint Break", "power": 14, "accuracy": 95, "desc": "Destroys enemy plans."},
-            {"name": "Glitch Blast", "power": 19, "accuracy": 80, "desc": "Massive digital attack."}
-        ]
-    },
-     {
-        "num": 15, "name": "Humidon", "type": "Climat", "rarity": "Common", "evolution": "Humistorm",
-        "description": "Dampens rooms with chilly mist.",
-        "stats": {"hp": 39, "atk": 9, "def": 9, "spd": 12},
-        "moves": [
-            {"name": "Mist Spray", "power": 9, "accuracy": 100, "desc": "Blinds foe with cold mist."},
-            {"name": "Chill Touch", "power": 10, "accuracy": 95, "desc": "Saps some attack power."},
-            {"name": "Condense", "power": 0, "accuracy": 100, "desc": "Raises defense with damp air."},
-            {"name": "Humidity Pulse", "power": 13, "accuracy": 90, "desc": "A sudden burst of moist air."}
-        ]
-    },
-    {
-        "num": 16, "name": "Humistorm", "type": "Climat", "rarity": "Uncommon", "evolution": "Humicrypt",
-        "description": "Makes paint peel from the walls.",
-        "stats": {"hp": 44, "atk": 13, "def": 10, "spd": 13},
-        "moves": [
-            {"name": "Storm Surge", "power": 14, "accuracy": 90, "desc": "Hits all enemies with damp storm."},
-            {"name": "Soak", "power": 10, "accuracy": 100, "desc": "Reduces foe's defense."},
-            {"name": "Rain Veil", "power": 0, "accuracy": 100, "desc": "Protects with a veil of water."},
-            {"name": "Peel Blast", "power": 15, "accuracy": 85, "desc": "Blasts paint chips at foe."}
-        ]
-    },
-    {
-        "num": 17, "name": "Humicrypt", "type": "Climat", "rarity": "Rare", "evolution": None,
-        "description": "Turns entire homes into wet tombs.",
-        "stats": {"hp": 52, "atk": 16, "def": 13, "spd": 15},
-        "moves": [
-            {"name": "Tomb Mist", "power": 17, "accuracy": 90, "desc": "Drains HP with cryptic fog."},
-            {"name": "Flood Wall", "power": 0, "accuracy": 100, "desc": "Doubles defense for 1 turn."},
-            {"name": "Waterlogged", "power": 15, "accuracy": 95, "desc": "Slows and damages foe."},
-            {"name": "Seepage", "power": 20, "accuracy": 80, "desc": "Strong attack, low accuracy."}
-        ]
-    },
-    {
-        "num": 18, "name": "Crackmite", "type": "Structure", "rarity": "Common", "evolution": "Crumblex",
-        "description": "Microscopic crack-maker.",
-        "stats": {"hp": 35, "atk": 11, "def": 8, "spd": 14},
-        "moves": [
-            {"name": "Tiny Fissure", "power": 9, "accuracy": 100, "desc": "Creates a small crack in foe."},
-            {"name": "Micro Bite", "power": 8, "accuracy": 95, "desc": "Fast, tiny attack."},
-            {"name": "Hide in Wall", "power": 0, "accuracy": 100, "desc": "Raises defense by burrowing."},
-            {"name": "Crackle Rush", "power": 13, "accuracy": 85, "desc": "Quick multi-hit attack."}
-        ]
-    },
-    {
-        "num": 19, "name": "Crumblex", "type": "Structure", "rarity": "Uncommon", "evolution": None,
-        "description": "Causes tiles to snap underfoot.",
-        "stats": {"hp": 42, "atk": 14, "def": 10, "spd": 13},
-        "moves": [
-            {"name": "Tile Snap", "power": 14, "accuracy": 95, "desc": "Can break the foe's defense."},
-            {"name": "Ground Shake", "power": 11, "accuracy": 100, "desc": "Affects all foes slightly."},
-            {"name": "Fortify", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Dust Cloud", "power": 13, "accuracy": 90, "desc": "Reduces foe's accuracy."}
-        ]
-    },
-    {
-        "num": 20, "name": "Mycosor", "type": "Bio-Parasite", "rarity": "Uncommon", "evolution": None,
-        "description": "Mould roots as tough as concrete.",
-        "stats": {"hp": 41, "atk": 12, "def": 12, "spd": 12},
-        "moves": [
-            {"name": "Root Whip", "power": 13, "accuracy": 95, "desc": "Strikes with strong roots."},
-            {"name": "Fungal Armor", "power": 0, "accuracy": 100, "desc": "Greatly boosts defense."},
-            {"name": "Parasite Lash", "power": 10, "accuracy": 100, "desc": "Saps a little HP."},
-            {"name": "Spore Flare", "power": 15, "accuracy": 85, "desc": "Chance to paralyze."}
-        ]
-    },
-    {
-        "num": 21, "name": "Cablon", "type": "Énergie", "rarity": "Common", "evolution": "Cablast",
-        "description": "Bites through any cable.",
-        "stats": {"hp": 37, "atk": 12, "def": 8, "spd": 13},
-        "moves": [
-            {"name": "Cable Bite", "power": 10, "accuracy": 100, "desc": "Hits foe with a bite."},
-            {"name": "Spark Snap", "power": 9, "accuracy": 95, "desc": "May paralyze enemy."},
-            {"name": "Wire Wrap", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Power Chew", "power": 13, "accuracy": 85, "desc": "Strong bite, but risky."}
-        ]
-    },
-    {
-        "num": 22, "name": "Cablast", "type": "Énergie", "rarity": "Uncommon", "evolution": None,
-        "description": "Sparks fly in its wake.",
-        "stats": {"hp": 42, "atk": 15, "def": 10, "spd": 14},
-        "moves": [
-            {"name": "Blast Spark", "power": 13, "accuracy": 95, "desc": "A surge of electricity."},
-            {"name": "Live Wire", "power": 12, "accuracy": 100, "desc": "May lower foe's defense."},
-            {"name": "Power Shell", "power": 0, "accuracy": 100, "desc": "Boosts defense for 2 turns."},
-            {"name": "Shockwave", "power": 15, "accuracy": 85, "desc": "All-out electric attack."}
-        ]
-    },
-    {
-        "num": 23, "name": "Echoz", "type": "Spectre", "rarity": "Common", "evolution": "Echomire",
-        "description": "Leaves behind whispers and chills.",
-        "stats": {"hp": 35, "atk": 10, "def": 9, "spd": 13},
-        "moves": [
-            {"name": "Echo Hit", "power": 9, "accuracy": 100, "desc": "Hits with echoing force."},
-            {"name": "Haunt", "power": 11, "accuracy": 95, "desc": "May lower enemy's defense."},
-            {"name": "Chill Veil", "power": 0, "accuracy": 100, "desc": "Boosts defense."},
-            {"name": "Spectral Pulse", "power": 14, "accuracy": 90, "desc": "Strong spectral attack."}
-        ]
-    },
-    {
-        "num": 24, "name": "Echomire", "type": "Spectre", "rarity": "Uncommon", "evolution": None,
-        "description": "Makes every noise seem haunted.",
-        "stats": {"hp": 42, "atk": 13, "def": 11, "spd": 15},
-        "moves": [
-            {"name": "Haunted Blast", "power": 13, "accuracy": 95, "desc": "A ghostly explosion."},
-            {"name": "Wail", "power": 12, "accuracy": 100, "desc": "Lowers foe's attack stat."},
-            {"name": "Night Shroud", "power": 0, "accuracy": 100, "desc": "Boosts defense and evasion."},
-            {"name": "Echo Storm", "power": 16, "accuracy": 85, "desc": "Loud, multi-hit attack."}
-        ]
-    },
-    {
-        "num": 25, "name": "Glitchum", "type": "Numérique", "rarity": "Common", "evolution": "Glitchurn",
-        "description": "Digital static entity.",
-        "stats": {"hp": 34, "atk": 10, "def": 8, "spd": 14},
-        "moves": [
-            {"name": "Static Jab", "power": 9, "accuracy": 100, "desc": "Jabs with digital static."},
-            {"name": "Code Glitch", "power": 8, "accuracy": 95, "desc": "Causes random effects."},
-            {"name": "Firewall", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Data Surge", "power": 13, "accuracy": 85, "desc": "Powerful but risky."}
-        ]
-    },
-    {
-        "num": 26, "name": "Glitchurn", "type": "Numérique", "rarity": "Uncommon", "evolution": None,
-        "description": "Causes screens to flicker.",
-        "stats": {"hp": 40, "atk": 12, "def": 9, "spd": 15},
-        "moves": [
-            {"name": "Flicker Hit", "power": 12, "accuracy": 95, "desc": "May reduce foe's accuracy."},
-            {"name": "System Error", "power": 10, "accuracy": 100, "desc": "Chance to confuse."},
-            {"name": "Data Guard", "power": 0, "accuracy": 100, "desc": "Boosts defense and accuracy."},
-            {"name": "Crash Loop", "power": 14, "accuracy": 85, "desc": "Powerful digital attack."}
-        ]
-    },
-    {
-        "num": 27, "name": "Condensaur", "type": "Climat", "rarity": "Common", "evolution": "Condenshade",
-        "description": "Brings indoor rain.",
-        "stats": {"hp": 37, "atk": 10, "def": 9, "spd": 12},
-        "moves": [
-            {"name": "Rain Drop", "power": 9, "accuracy": 100, "desc": "Hits with falling water."},
-            {"name": "Humidity Burst", "power": 11, "accuracy": 95, "desc": "May reduce foe's defense."},
-            {"name": "Misty Veil", "power": 0, "accuracy": 100, "desc": "Boosts defense by dampening."},
-            {"name": "Flood Attack", "power": 13, "accuracy": 90, "desc": "May confuse enemy."}
-        ]
-    },
-    {
-        "num": 28, "name": "Condenshade", "type": "Climat", "rarity": "Rare", "evolution": None,
-        "description": "Causes mysterious puddles everywhere.",
-        "stats": {"hp": 46, "atk": 14, "def": 11, "spd": 13},
-        "moves": [
-            {"name": "Puddle Trap", "power": 15, "accuracy": 95, "desc": "Slows foe for next turn."},
-            {"name": "Drench", "power": 14, "accuracy": 100, "desc": "Heavy soaking attack."},
-            {"name": "Slipstream", "power": 0, "accuracy": 100, "desc": "Boosts own speed."},
-            {"name": "Steam Cloud", "power": 16, "accuracy": 85, "desc": "Obscures foe's vision."}
-        ]
-    },
-    {
-        "num": 29, "name": "Rotophan", "type": "Structure", "rarity": "Uncommon", "evolution": None,
-        "description": "Rusts any metal structure.",
-        "stats": {"hp": 43, "atk": 13, "def": 12, "spd": 10},
-        "moves": [
-            {"name": "Rust Flake", "power": 12, "accuracy": 95, "desc": "May lower foe's defense."},
-            {"name": "Corrode", "power": 14, "accuracy": 90, "desc": "A heavy, damaging attack."},
-            {"name": "Metal Guard", "power": 0, "accuracy": 100, "desc": "Raises defense a lot."},
-            {"name": "Rot Storm", "power": 13, "accuracy": 85, "desc": "Hits with a storm of rust."}
-        ]
-    },
-    {
-        "num": 30, "name": "Smolder", "type": "Énergie", "rarity": "Rare", "evolution": None,
-        "description": "Hidden fire risk, burns unseen.",
-        "stats": {"hp": 47, "atk": 16, "def": 10, "spd": 16},
-        "moves": [
-            {"name": "Smolder Strike", "power": 16, "accuracy": 95, "desc": "A powerful burning hit."},
-            {"name": "Burn Veil", "power": 0, "accuracy": 100, "desc": "Boosts defense for 2 turns."},
-            {"name": "Fire Flicker", "power": 14, "accuracy": 100, "desc": "Quick fire attack."},
-            {"name": "Blaze Up", "power": 18, "accuracy": 80, "desc": "Very strong, but risky."}
-        ]
-    },
-      {
-        "num": 31, "name": "Drafton", "type": "Climat", "rarity": "Common", "evolution": "Drafterror",
-        "description": "Summons sudden cold drafts.",
-        "stats": {"hp": 36, "atk": 11, "def": 8, "spd": 15},
-        "moves": [
-            {"name": "Cold Draft", "power": 10, "accuracy": 100, "desc": "Hits foe with cold air."},
-            {"name": "Whistling Wind", "power": 11, "accuracy": 95, "desc": "May lower foe's speed."},
-            {"name": "Air Shield", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Shiver Blast", "power": 13, "accuracy": 90, "desc": "High chance to chill."}
-        ]
-    },
-    {
-        "num": 32, "name": "Drafterror", "type": "Climat", "rarity": "Uncommon", "evolution": None,
-        "description": "Slams doors at random times.",
-        "stats": {"hp": 44, "atk": 13, "def": 12, "spd": 15},
-        "moves": [
-            {"name": "Door Slam", "power": 14, "accuracy": 95, "desc": "Hits hard, can stun foe."},
-            {"name": "Sudden Gust", "power": 12, "accuracy": 100, "desc": "Knocks enemy back."},
-            {"name": "Draft Armor", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Wind Howl", "power": 16, "accuracy": 85, "desc": "Loud multi-hit attack."}
-        ]
-    },
-    {
-        "num": 33, "name": "Spookbyte", "type": "Spectre", "rarity": "Common", "evolution": "Spookraft",
-        "description": "Digital ghost in surveillance cams.",
-        "stats": {"hp": 34, "atk": 10, "def": 9, "spd": 15},
-        "moves": [
-            {"name": "Phantom Shock", "power": 9, "accuracy": 100, "desc": "Frightens foe with static."},
-            {"name": "Cam Flicker", "power": 11, "accuracy": 95, "desc": "May lower foe's accuracy."},
-            {"name": "Specter Veil", "power": 0, "accuracy": 100, "desc": "Boosts evasion."},
-            {"name": "Pixel Curse", "power": 14, "accuracy": 90, "desc": "Curse of corrupted data."}
-        ]
-    },
-    {
-        "num": 34, "name": "Spookraft", "type": "Spectre", "rarity": "Rare", "evolution": None,
-        "description": "Freezes all camera feeds.",
-        "stats": {"hp": 44, "atk": 13, "def": 10, "spd": 17},
-        "moves": [
-            {"name": "Freeze Frame", "power": 15, "accuracy": 95, "desc": "May paralyze foe."},
-            {"name": "Ghost Glitch", "power": 13, "accuracy": 100, "desc": "Unpredictable effects."},
-            {"name": "Nightmare Lens", "power": 0, "accuracy": 100, "desc": "Boosts critical rate."},
-            {"name": "Surveillance Swarm", "power": 18, "accuracy": 85, "desc": "Heavy, multi-hit attack."}
-        ]
-    },
-    {
-        "num": 35, "name": "Netflux", "type": "Numérique", "rarity": "Common", "evolution": "Netfreak",
-        "description": "Interferes with WiFi signals.",
-        "stats": {"hp": 36, "atk": 10, "def": 8, "spd": 13},
-        "moves": [
-            {"name": "WiFi Jam", "power": 10, "accuracy": 100, "desc": "Reduces enemy speed."},
-            {"name": "Signal Crash", "power": 12, "accuracy": 95, "desc": "Can confuse foe."},
-            {"name": "Data Shield", "power": 0, "accuracy": 100, "desc": "Boosts defense and accuracy."},
-            {"name": "Packet Burst", "power": 14, "accuracy": 90, "desc": "Powerful digital strike."}
-        ]
-    },
-    {
-        "num": 36, "name": "Netfreak", "type": "Numérique", "rarity": "Uncommon", "evolution": None,
-        "description": "Blocks all remote connections.",
-        "stats": {"hp": 42, "atk": 14, "def": 9, "spd": 15},
-        "moves": [
-            {"name": "Firewall Lock", "power": 13, "accuracy": 95, "desc": "Can block foe's next attack."},
-            {"name": "Network Snarl", "power": 13, "accuracy": 100, "desc": "Heavy hit, may confuse."},
-            {"name": "Code Cloak", "power": 0, "accuracy": 100, "desc": "Raises defense and evasion."},
-            {"name": "Total Blackout", "power": 16, "accuracy": 85, "desc": "Crippling, high-risk attack."}
-        ]
-    },
-    {
-        "num": 37, "name": "Thermora", "type": "Climat", "rarity": "Common", "evolution": "Thermogone",
-        "description": "Shifts temperatures at random.",
-        "stats": {"hp": 38, "atk": 10, "def": 9, "spd": 12},
-        "moves": [
-            {"name": "Heat Wave", "power": 11, "accuracy": 100, "desc": "May burn foe."},
-            {"name": "Cold Snap", "power": 10, "accuracy": 95, "desc": "May freeze foe."},
-            {"name": "Tempest Guard", "power": 0, "accuracy": 100, "desc": "Raises defense by 2."},
-            {"name": "Thermo Blast", "power": 14, "accuracy": 90, "desc": "Unleashes temperature chaos."}
-        ]
-    },
-    {
-        "num": 38, "name": "Thermogone", "type": "Climat", "rarity": "Rare", "evolution": None,
-        "description": "Causes heating bills to explode.",
-        "stats": {"hp": 46, "atk": 16, "def": 10, "spd": 15},
-        "moves": [
-            {"name": "Bill Shock", "power": 17, "accuracy": 90, "desc": "Heavy energy drain."},
-            {"name": "Thermal Crash", "power": 13, "accuracy": 100, "desc": "Damages both sides a bit."},
-            {"name": "Overheat", "power": 0, "accuracy": 100, "desc": "Boosts attack, lowers defense."},
-            {"name": "Winter Burst", "power": 14, "accuracy": 85, "desc": "Freezes foe, low accuracy."}
-        ]
-    },
-    {
-        "num": 39, "name": "Crustorn", "type": "Structure", "rarity": "Rare", "evolution": None,
-        "description": "Turns bricks into fragile shells.",
-        "stats": {"hp": 48, "atk": 14, "def": 15, "spd": 11},
-        "moves": [
-            {"name": "Shell Smash", "power": 16, "accuracy": 95, "desc": "Lowers foe's defense."},
-            {"name": "Brick Blast", "power": 15, "accuracy": 100, "desc": "A strong physical hit."},
-            {"name": "Reinforce", "power": 0, "accuracy": 100, "desc": "Greatly boosts own defense."},
-            {"name": "Crumble Down", "power": 18, "accuracy": 80, "desc": "Heavy damage, low accuracy."}
-        ]
-    },
-    {
-        "num": 40, "name": "Surgebite", "type": "Énergie", "rarity": "Common", "evolution": "Surgerage",
-        "description": "Causes sudden power spikes.",
-        "stats": {"hp": 36, "atk": 11, "def": 8, "spd": 14},
-        "moves": [
-            {"name": "Power Surge", "power": 11, "accuracy": 100, "desc": "May paralyze enemy."},
-            {"name": "Voltage Snap", "power": 10, "accuracy": 95, "desc": "Fast and accurate."},
-            {"name": "Static Shield", "power": 0, "accuracy": 100, "desc": "Boosts defense by 1."},
-            {"name": "Fuse Burn", "power": 15, "accuracy": 90, "desc": "Burns foe's attack stat."}
-        ]
-    },
-    {
-        "num": 41, "name": "Surgerage", "type": "Énergie", "rarity": "Uncommon", "evolution": None,
-        "description": "Melts fuses with rage.",
-        "stats": {"hp": 42, "atk": 14, "def": 11, "spd": 15},
-        "moves": [
-            {"name": "Rage Strike", "power": 14, "accuracy": 95, "desc": "Critical hit possible."},
-            {"name": "Overcharge", "power": 12, "accuracy": 100, "desc": "May boost own attack."},
-            {"name": "Shockwave", "power": 0, "accuracy": 100, "desc": "Raises own speed."},
-            {"name": "Meltdown", "power": 17, "accuracy": 85, "desc": "High power, may self-hurt."}
-        ]
-    },
-    {
-        "num": 42, "name": "Airspectra", "type": "Climat", "rarity": "Uncommon", "evolution": None,
-        "description": "Haunts air vents and ducts.",
-        "stats": {"hp": 38, "atk": 13, "def": 10, "spd": 17},
-        "moves": [
-            {"name": "Vent Slash", "power": 12, "accuracy": 95, "desc": "Hits through defense."},
-            {"name": "Spectral Breeze", "power": 13, "accuracy": 100, "desc": "May confuse foe."},
-            {"name": "Air Cloak", "power": 0, "accuracy": 100, "desc": "Evasion up for 2 turns."},
-            {"name": "Haunted Wind", "power": 16, "accuracy": 85, "desc": "Heavy ghostly gust."}
-        ]
-    },
-    {
-        "num": 43, "name": "Funglint", "type": "Bio-Parasite", "rarity": "Common", "evolution": "Fungloom",
-        "description": "Shiny mold with a bad attitude.",
-        "stats": {"hp": 37, "atk": 11, "def": 9, "spd": 12},
-        "moves": [
-            {"name": "Spore Flash", "power": 9, "accuracy": 100, "desc": "Can stun the foe."},
-            {"name": "Mold Shield", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Fungal Burst", "power": 12, "accuracy": 95, "desc": "Hits all enemies a little."},
-            {"name": "Lichen Lash", "power": 14, "accuracy": 90, "desc": "Poisons foe sometimes."}
-        ]
-    },
-    {
-        "num": 44, "name": "Fungloom", "type": "Bio-Parasite", "rarity": "Rare", "evolution": None,
-        "description": "Can darken a whole attic.",
-        "stats": {"hp": 45, "atk": 15, "def": 12, "spd": 13},
-        "moves": [
-            {"name": "Dark Spores", "power": 15, "accuracy": 95, "desc": "Reduces foe's accuracy."},
-            {"name": "Attic Shroud", "power": 0, "accuracy": 100, "desc": "Boosts own evasion."},
-            {"name": "Rot Lash", "power": 14, "accuracy": 100, "desc": "Strong, always hits."},
-            {"name": "Parasite Wave", "power": 17, "accuracy": 85, "desc": "Can drain HP."}
-        ]
-    },
-    {
-        "num": 45, "name": "Polterwatt", "type": "Énergie", "rarity": "Rare", "evolution": None,
-        "description": "Ghost of an old electric generator.",
-        "stats": {"hp": 44, "atk": 17, "def": 10, "spd": 16},
-        "moves": [
-            {"name": "Spirit Spark", "power": 16, "accuracy": 95, "desc": "May paralyze."},
-            {"name": "Generator Shock", "power": 14, "accuracy": 100, "desc": "High damage."},
-            {"name": "Watt Veil", "power": 0, "accuracy": 100, "desc": "Boosts defense and speed."},
-            {"name": "Ghost Current", "power": 19, "accuracy": 80, "desc": "Huge, low accuracy."}
-        ]
-    },
-    {
-        "num": 46, "name": "Betonghost", "type": "Structure", "rarity": "Uncommon", "evolution": None,
-        "description": "Concrete spirit, impossible to exorcise.",
-        "stats": {"hp": 43, "atk": 14, "def": 14, "spd": 9},
-        "moves": [
-            {"name": "Cement Slam", "power": 14, "accuracy": 95, "desc": "Powerful physical hit."},
-            {"name": "Haunt Block", "power": 0, "accuracy": 100, "desc": "Boosts defense for 2 turns."},
-            {"name": "Spirit Brick", "power": 13, "accuracy": 100, "desc": "May stun foe."},
-            {"name": "Dust Veil", "power": 12, "accuracy": 90, "desc": "Reduces foe's accuracy."}
-        ]
-    },
-    {
-        "num": 47, "name": "Sootveil", "type": "Climat", "rarity": "Uncommon", "evolution": None,
-        "description": "Makes windows gray overnight.",
-        "stats": {"hp": 40, "atk": 12, "def": 11, "spd": 14},
-        "moves": [
-            {"name": "Soot Swipe", "power": 12, "accuracy": 95, "desc": "Covers foe in soot."},
-            {"name": "Gray Out", "power": 13, "accuracy": 100, "desc": "Blinds foe for 1 turn."},
-            {"name": "Veil of Ash", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Nightfall", "power": 14, "accuracy": 85, "desc": "Strong, low accuracy."}
-        ]
-    },
-    {
-        "num": 48, "name": "Filtrix", "type": "Structure", "rarity": "Rare", "evolution": None,
-        "description": "Hides in ventilation, clogs air filters.",
-        "stats": {"hp": 48, "atk": 13, "def": 16, "spd": 12},
-        "moves": [
-            {"name": "Filter Block", "power": 15, "accuracy": 95, "desc": "Reduces foe's speed."},
-            {"name": "Air Clog", "power": 14, "accuracy": 100, "desc": "May poison foe."},
-            {"name": "Dust Armor", "power": 0, "accuracy": 100, "desc": "Greatly raises defense."},
-            {"name": "Smother", "power": 16, "accuracy": 85, "desc": "High damage, low accuracy."}
-        ]
-    },
-    {
-        "num": 49, "name": "Netrust", "type": "Numérique", "rarity": "Uncommon", "evolution": None,
-        "description": "Disables all smart locks.",
-        "stats": {"hp": 39, "atk": 13, "def": 10, "spd": 14},
-        "moves": [
-            {"name": "Lock Break", "power": 13, "accuracy": 95, "desc": "Breaks through defense."},
-            {"name": "Hack Pulse", "power": 13, "accuracy": 100, "desc": "May confuse foe."},
-            {"name": "Lockdown", "power": 0, "accuracy": 100, "desc": "Prevents foe switching."},
-            {"name": "Jam Signal", "power": 15, "accuracy": 85, "desc": "Reduces enemy accuracy."}
-        ]
-    },
-    {
-        "num": 50, "name": "Chillume", "type": "Climat", "rarity": "Common", "evolution": "Chillumeon",
-        "description": "Frosty, likes to freeze pipes.",
-        "stats": {"hp": 38, "atk": 10, "def": 10, "spd": 12},
-        "moves": [
-            {"name": "Pipe Freeze", "power": 11, "accuracy": 100, "desc": "Can freeze foe."},
-            {"name": "Snow Spray", "power": 12, "accuracy": 95, "desc": "Reduces enemy speed."},
-            {"name": "Frost Armor", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Winter Blast", "power": 13, "accuracy": 90, "desc": "Chilling, high power."}
-        ]
-    },
-    {
-        "num": 51, "name": "Chillumeon", "type": "Climat", "rarity": "Rare", "evolution": None,
-        "description": "Can burst an entire plumbing system.",
-        "stats": {"hp": 48, "atk": 15, "def": 11, "spd": 14},
-        "moves": [
-            {"name": "Burst Pipe", "power": 15, "accuracy": 95, "desc": "Massive freezing blow."},
-            {"name": "Frost Storm", "power": 13, "accuracy": 100, "desc": "May freeze foe."},
-            {"name": "Glacier Wall", "power": 0, "accuracy": 100, "desc": "Huge defense boost."},
-            {"name": "Ice Age", "power": 17, "accuracy": 85, "desc": "Hits all enemies."}
-        ]
-    },
-    {
-        "num": 52, "name": "Thermold", "type": "Climat", "rarity": "Common", "evolution": "Thermoldra",
-        "description": "Feeds on steam and hot showers.",
-        "stats": {"hp": 38, "atk": 10, "def": 10, "spd": 12},
-        "moves": [
-            {"name": "Steam Shot", "power": 12, "accuracy": 95, "desc": "Burns foe a bit."},
-            {"name": "Hot Wash", "power": 11, "accuracy": 100, "desc": "Boosts attack slightly."},
-            {"name": "Mildew Shield", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Sauna Surge", "power": 13, "accuracy": 90, "desc": "Scalding attack."}
-        ]
-    },
-    {
-        "num": 53, "name": "Thermoldra", "type": "Climat", "rarity": "Uncommon", "evolution": None,
-        "description": "Leaves mildew everywhere.",
-        "stats": {"hp": 43, "atk": 14, "def": 12, "spd": 13},
-        "moves": [
-            {"name": "Mildew Wave", "power": 14, "accuracy": 95, "desc": "Can paralyze foe."},
-            {"name": "Heat Armor", "power": 0, "accuracy": 100, "desc": "Raises own defense a lot."},
-            {"name": "Stale Air", "power": 12, "accuracy": 100, "desc": "Reduces foe's defense."},
-            {"name": "Steam Crash", "power": 16, "accuracy": 85, "desc": "Heavy, low accuracy."}
-        ]
-    },
-    {
-        "num": 54, "name": "Screamroot", "type": "Spectre", "rarity": "Common", "evolution": "Screamora",
-        "description": "Screams when floors creak.",
-        "stats": {"hp": 35, "atk": 10, "def": 8, "spd": 14},
-        "moves": [
-            {"name": "Haunt Cry", "power": 9, "accuracy": 100, "desc": "Screeches to scare foe."},
-            {"name": "Floor Creak", "power": 11, "accuracy": 95, "desc": "Can lower foe's defense."},
-            {"name": "Shadow Shroud", "power": 0, "accuracy": 100, "desc": "Boosts evasion."},
-            {"name": "Root Wail", "power": 13, "accuracy": 90, "desc": "Hits all enemies a bit."}
-        ]
-    },
-    {
-        "num": 55, "name": "Screamora", "type": "Spectre", "rarity": "Rare", "evolution": None,
-        "description": "Turns creaks into ghostly howls.",
-        "stats": {"hp": 44, "atk": 14, "def": 10, "spd": 15},
-        "moves": [
-            {"name": "Howl Storm", "power": 15, "accuracy": 95, "desc": "Loud, damages all."},
-            {"name": "Wraith Scream", "power": 13, "accuracy": 100, "desc": "Reduces foe's speed."},
-            {"name": "Banshee Veil", "power": 0, "accuracy": 100, "desc": "Boosts defense."},
-            {"name": "Phantom Fury", "power": 17, "accuracy": 85, "desc": "Heavy ghostly blow."}
-        ]
-    },
-    {
-        "num": 56, "name": "Gutteron", "type": "Structure", "rarity": "Common", "evolution": "Guttergeist",
-        "description": "Hides in gutters, blocks water flow.",
-        "stats": {"hp": 37, "atk": 11, "def": 9, "spd": 11},
-        "moves": [
-            {"name": "Block Flow", "power": 10, "accuracy": 100, "desc": "Reduces foe's speed."},
-            {"name": "Gutter Bite", "power": 12, "accuracy": 95, "desc": "Strong hit."},
-            {"name": "Splash Guard", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Flood Burst", "power": 14, "accuracy": 90, "desc": "May confuse enemy."}
-        ]
-    },
-    {
-        "num": 57, "name": "Guttergeist", "type": "Structure", "rarity": "Rare", "evolution": None,
-        "description": "Causes sudden floods during storms.",
-        "stats": {"hp": 46, "atk": 14, "def": 12, "spd": 13},
-        "moves": [
-            {"name": "Flood Wave", "power": 15, "accuracy": 95, "desc": "Hits all enemies."},
-            {"name": "Drainage Crash", "power": 13, "accuracy": 100, "desc": "Reduces foe's defense."},
-            {"name": "Overflow", "power": 0, "accuracy": 100, "desc": "Raises attack for 2 turns."},
-            {"name": "Storm Surge", "power": 17, "accuracy": 85, "desc": "High power, low accuracy."}
-        ]
-    },
-    {
-        "num": 58, "name": "Virugrime", "type": "Bio-Parasite", "rarity": "Common", "evolution": "Virulurk",
-        "description": "Infects every nook and cranny.",
-        "stats": {"hp": 36, "atk": 11, "def": 8, "spd": 12},
-        "moves": [
-            {"name": "Germ Burst", "power": 10, "accuracy": 100, "desc": "May poison foe."},
-            {"name": "Infect", "power": 12, "accuracy": 95, "desc": "Saps foe's HP."},
-            {"name": "Pathogen Guard", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Sickly Wave", "power": 14, "accuracy": 90, "desc": "High chance to poison."}
-        ]
-    },
-    {
-        "num": 59, "name": "Virulurk", "type": "Bio-Parasite", "rarity": "Uncommon", "evolution": None,
-        "description": "Turns rooms into biohazards.",
-        "stats": {"hp": 43, "atk": 13, "def": 11, "spd": 13},
-        "moves": [
-            {"name": "Biohazard Bash", "power": 13, "accuracy": 95, "desc": "Strong, may poison."},
-            {"name": "Toxic Cloud", "power": 14, "accuracy": 100, "desc": "Hits all foes."},
-            {"name": "Hazmat Armor", "power": 0, "accuracy": 100, "desc": "Greatly raises defense."},
-            {"name": "Spore Storm", "power": 16, "accuracy": 85, "desc": "High risk, high reward."}
-        ]
-    },
-    {
-        "num": 60, "name": "Insulight", "type": "Énergie", "rarity": "Common", "evolution": "Insulash",
-        "description": "Grows strong inside faulty insulation.",
-        "stats": {"hp": 36, "atk": 10, "def": 9, "spd": 14},
-        "moves": [
-            {"name": "Insulate", "power": 0, "accuracy": 100, "desc": "Raises own defense a lot."},
-            {"name": "Wire Shock", "power": 11, "accuracy": 100, "desc": "Can paralyze enemy."},
-            {"name": "Foam Bash", "power": 12, "accuracy": 95, "desc": "Fast, bouncy hit."},
-            {"name": "Current Jump", "power": 14, "accuracy": 90, "desc": "Electric leap attack."}
-        ]
-    },
-    {
-        "num": 61, "name": "Insulash", "type": "Énergie", "rarity": "Rare", "evolution": None,
-        "description": "Releases sparks when cornered.",
-        "stats": {"hp": 44, "atk": 15, "def": 12, "spd": 14},
-        "moves": [
-            {"name": "Spark Lash", "power": 16, "accuracy": 95, "desc": "Strong shock, may paralyze."},
-            {"name": "Insulation Burst", "power": 14, "accuracy": 100, "desc": "High damage."},
-            {"name": "Protective Layer", "power": 0, "accuracy": 100, "desc": "Raises defense by 2."},
-            {"name": "Jolt Crash", "power": 18, "accuracy": 85, "desc": "Massive hit, low accuracy."}
-        ]
-    },
-    {
-        "num": 62, "name": "Drainox", "type": "Climat", "rarity": "Common", "evolution": "Drainshade",
-        "description": "Loves to clog pipes and drains.",
-        "stats": {"hp": 36, "atk": 11, "def": 10, "spd": 11},
-        "moves": [
-            {"name": "Clog Strike", "power": 10, "accuracy": 100, "desc": "Can lower enemy speed."},
-            {"name": "Pipe Sludge", "power": 12, "accuracy": 95, "desc": "May poison foe."},
-            {"name": "Drain Guard", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Overflow", "power": 14, "accuracy": 90, "desc": "Hits all enemies a little."}
-        ]
-    },
-    {
-        "num": 63, "name": "Drainshade", "type": "Climat", "rarity": "Uncommon", "evolution": None,
-        "description": "Causes mysterious foul odors.",
-        "stats": {"hp": 44, "atk": 13, "def": 13, "spd": 12},
-        "moves": [
-            {"name": "Odor Wave", "power": 13, "accuracy": 95, "desc": "May lower foe's defense."},
-            {"name": "Toxic Drain", "power": 14, "accuracy": 100, "desc": "May poison."},
-            {"name": "Pipe Shield", "power": 0, "accuracy": 100, "desc": "Greatly boosts defense."},
-            {"name": "Gutter Flood", "power": 16, "accuracy": 85, "desc": "Massive water strike."}
-        ]
-    },
-    {
-        "num": 64, "name": "Shadowdust", "type": "Spectre", "rarity": "Uncommon", "evolution": None,
-        "description": "Darkens lightbulbs, chills air.",
-        "stats": {"hp": 38, "atk": 13, "def": 11, "spd": 15},
-        "moves": [
-            {"name": "Dust Swirl", "power": 12, "accuracy": 95, "desc": "May blind foe."},
-            {"name": "Night Haze", "power": 13, "accuracy": 100, "desc": "Reduces accuracy of enemy."},
-            {"name": "Shadow Veil", "power": 0, "accuracy": 100, "desc": "Raises own evasion."},
-            {"name": "Ghost Pulse", "power": 16, "accuracy": 85, "desc": "Strong, spectral hit."}
-        ]
-    },
-    {
-        "num": 65, "name": "Glimmette", "type": "Numérique", "rarity": "Common", "evolution": "Glimmark",
-        "description": "Makes lights flicker on and off.",
-        "stats": {"hp": 35, "atk": 10, "def": 9, "spd": 14},
-        "moves": [
-            {"name": "Flicker", "power": 10, "accuracy": 100, "desc": "May confuse foe."},
-            {"name": "Blink Shot", "power": 12, "accuracy": 95, "desc": "Hits fast."},
-            {"name": "Light Screen", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Flash Burst", "power": 14, "accuracy": 90, "desc": "Bright, hard to dodge."}
-        ]
-    },
-    {
-        "num": 66, "name": "Glimmark", "type": "Numérique", "rarity": "Uncommon", "evolution": None,
-        "description": "Causes total blackouts.",
-        "stats": {"hp": 42, "atk": 14, "def": 11, "spd": 15},
-        "moves": [
-            {"name": "Blackout", "power": 13, "accuracy": 95, "desc": "May stun foe."},
-            {"name": "Dark Flash", "power": 13, "accuracy": 100, "desc": "Powerful light attack."},
-            {"name": "Glow Guard", "power": 0, "accuracy": 100, "desc": "Boosts defense."},
-            {"name": "Laser Crash", "power": 16, "accuracy": 85, "desc": "High damage, low accuracy."}
-        ]
-    },
-    {
-        "num": 67, "name": "Frigilix", "type": "Climat", "rarity": "Common", "evolution": "Frigilune",
-        "description": "Grows on cold windowsills.",
-        "stats": {"hp": 36, "atk": 10, "def": 10, "spd": 12},
-        "moves": [
-            {"name": "Frost Bite", "power": 11, "accuracy": 100, "desc": "Can freeze foe."},
-            {"name": "Chill Wave", "power": 12, "accuracy": 95, "desc": "May reduce speed."},
-            {"name": "Ice Coat", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Winter Beam", "power": 14, "accuracy": 90, "desc": "Icy strike, high power."}
-        ]
-    },
-    {
-        "num": 68, "name": "Frigilune", "type": "Climat", "rarity": "Rare", "evolution": None,
-        "description": "Invites frost indoors.",
-        "stats": {"hp": 46, "atk": 14, "def": 12, "spd": 14},
-        "moves": [
-            {"name": "Frost Nova", "power": 15, "accuracy": 95, "desc": "Hits all enemies."},
-            {"name": "Snowstorm", "power": 13, "accuracy": 100, "desc": "May freeze foe."},
-            {"name": "Polar Wall", "power": 0, "accuracy": 100, "desc": "Raises own defense a lot."},
-            {"name": "Crystal Hail", "power": 17, "accuracy": 85, "desc": "Heavy, low accuracy."}
-        ]
-    },
-    {
-        "num": 69, "name": "Termitix", "type": "Bio-Parasite", "rarity": "Rare", "evolution": None,
-        "description": "Eats through wooden beams.",
-        "stats": {"hp": 44, "atk": 16, "def": 10, "spd": 14},
-        "moves": [
-            {"name": "Wood Gnaw", "power": 15, "accuracy": 95, "desc": "Can lower defense."},
-            {"name": "Rot Swarm", "power": 13, "accuracy": 100, "desc": "Multi-hit bug attack."},
-            {"name": "Infest Armor", "power": 0, "accuracy": 100, "desc": "Raises defense by 2."},
-            {"name": "Decay Bite", "power": 18, "accuracy": 85, "desc": "Huge, but risky."}
-        ]
-    },
-    {
-        "num": 70, "name": "Wispulse", "type": "Spectre", "rarity": "Common", "evolution": "Wisphere",
-        "description": "Appears when lights fail.",
-        "stats": {"hp": 34, "atk": 10, "def": 8, "spd": 15},
-        "moves": [
-            {"name": "Pulse Ray", "power": 9, "accuracy": 100, "desc": "May paralyze foe."},
-            {"name": "Ghost Flicker", "power": 11, "accuracy": 95, "desc": "Reduces foe's accuracy."},
-            {"name": "Specter Shield", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Light Drain", "power": 13, "accuracy": 90, "desc": "Drains foe's HP."}
-        ]
-    },
-    {
-        "num": 71, "name": "Wisphere", "type": "Spectre", "rarity": "Rare", "evolution": None,
-        "description": "Makes LED bulbs explode.",
-        "stats": {"hp": 44, "atk": 13, "def": 10, "spd": 16},
-        "moves": [
-            {"name": "LED Burst", "power": 15, "accuracy": 95, "desc": "High power light blast."},
-            {"name": "Ghostly Pop", "power": 13, "accuracy": 100, "desc": "Stuns foe sometimes."},
-            {"name": "Phantom Mist", "power": 0, "accuracy": 100, "desc": "Raises evasion."},
-            {"name": "Pulse Chain", "power": 16, "accuracy": 85, "desc": "Multi-hit energy."}
-        ]
-    },
-    {
-        "num": 72, "name": "Statibit", "type": "Numérique", "rarity": "Common", "evolution": "Statiburst",
-        "description": "Static shock on every touch.",
-        "stats": {"hp": 35, "atk": 10, "def": 9, "spd": 15},
-        "moves": [
-            {"name": "Shock Touch", "power": 10, "accuracy": 100, "desc": "May paralyze foe."},
-            {"name": "Static Jolt", "power": 12, "accuracy": 95, "desc": "Quick, reliable hit."},
-            {"name": "Jitter Shield", "power": 0, "accuracy": 100, "desc": "Boosts own speed."},
-            {"name": "Burst Byte", "power": 14, "accuracy": 90, "desc": "Electric digital attack."}
-        ]
-    },
-    {
-        "num": 73, "name": "Statiburst", "type": "Numérique", "rarity": "Rare", "evolution": None,
-        "description": "Can fry entire server rooms.",
-        "stats": {"hp": 43, "atk": 15, "def": 11, "spd": 15},
-        "moves": [
-            {"name": "Power Surge", "power": 16, "accuracy": 95, "desc": "Very strong attack."},
-            {"name": "Bit Bomb", "power": 14, "accuracy": 100, "desc": "Explosive data hit."},
-            {"name": "Electro Cloak", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Static Blast", "power": 17, "accuracy": 85, "desc": "Massive, but risky."}
-        ]
-    },
-    {
-        "num": 74, "name": "Leakroot", "type": "Climat", "rarity": "Common", "evolution": "Leakshade",
-        "description": "Leaks water into random spots.",
-        "stats": {"hp": 36, "atk": 10, "def": 10, "spd": 12},
-        "moves": [
-            {"name": "Leak Jet", "power": 11, "accuracy": 100, "desc": "May reduce foe's defense."},
-            {"name": "Puddle Trap", "power": 12, "accuracy": 95, "desc": "Can slow enemy."},
-            {"name": "Flood Guard", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Aqua Slam", "power": 14, "accuracy": 90, "desc": "Water-type smash."}
-        ]
-    },
-    {
-        "num": 75, "name": "Leakshade", "type": "Climat", "rarity": "Uncommon", "evolution": None,
-        "description": "Floods basements with gloom.",
-        "stats": {"hp": 44, "atk": 13, "def": 13, "spd": 12},
-        "moves": [
-            {"name": "Basement Flood", "power": 15, "accuracy": 95, "desc": "Hits all enemies."},
-            {"name": "Moist Grip", "power": 14, "accuracy": 100, "desc": "Reduces foe's attack."},
-            {"name": "Water Veil", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Gloom Strike", "power": 16, "accuracy": 85, "desc": "Dark water hit."}
-        ]
-    },
-    {
-        "num": 76, "name": "Creepad", "type": "Structure", "rarity": "Common", "evolution": "Creepath",
-        "description": "Makes floors squeak eerily.",
-        "stats": {"hp": 36, "atk": 11, "def": 9, "spd": 12},
-        "moves": [
-            {"name": "Squeak Hit", "power": 10, "accuracy": 100, "desc": "Quick, annoying strike."},
-            {"name": "Wood Rattle", "power": 12, "accuracy": 95, "desc": "May confuse foe."},
-            {"name": "Plank Shield", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Groan Attack", "power": 14, "accuracy": 90, "desc": "Creepy, strong blow."}
-        ]
-    },
-    {
-        "num": 77, "name": "Creepath", "type": "Structure", "rarity": "Rare", "evolution": None,
-        "description": "Warps floorboards like a wave.",
-        "stats": {"hp": 44, "atk": 14, "def": 12, "spd": 13},
-        "moves": [
-            {"name": "Warp Smash", "power": 15, "accuracy": 95, "desc": "Distorts enemy defense."},
-            {"name": "Floor Wave", "power": 13, "accuracy": 100, "desc": "Strong, reliable."},
-            {"name": "Bend Barrier", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Collapse", "power": 17, "accuracy": 85, "desc": "Heavy, low accuracy."}
-        ]
-    },
-    {
-        "num": 78, "name": "Radonis", "type": "Climat", "rarity": "Rare", "evolution": None,
-        "description": "Emits mysterious energies.",
-        "stats": {"hp": 44, "atk": 15, "def": 13, "spd": 14},
-        "moves": [
-            {"name": "Radon Burst", "power": 15, "accuracy": 95, "desc": "May poison foe."},
-            {"name": "Mysterious Ray", "power": 14, "accuracy": 100, "desc": "Strange effects."},
-            {"name": "Energy Veil", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Radiate", "power": 18, "accuracy": 85, "desc": "Huge, unpredictable hit."}
-        ]
-    },
-    {
-        "num": 79, "name": "Crackrune", "type": "Structure", "rarity": "Common", "evolution": "Crackryst",
-        "description": "Carves runes into concrete.",
-        "stats": {"hp": 38, "atk": 10, "def": 12, "spd": 10},
-        "moves": [
-            {"name": "Rune Hit", "power": 11, "accuracy": 100, "desc": "Hits with energy."},
-            {"name": "Etch Strike", "power": 12, "accuracy": 95, "desc": "May lower foe's defense."},
-            {"name": "Concrete Shield", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Crack Pulse", "power": 14, "accuracy": 90, "desc": "Strong, causes confusion."}
-        ]
-    },
-    {
-        "num": 80, "name": "Crackryst", "type": "Structure", "rarity": "Uncommon", "evolution": None,
-        "description": "Runes glow in the dark.",
-        "stats": {"hp": 46, "atk": 13, "def": 15, "spd": 11},
-        "moves": [
-            {"name": "Crystal Beam", "power": 14, "accuracy": 95, "desc": "Blinding attack."},
-            {"name": "Shine Guard", "power": 0, "accuracy": 100, "desc": "Boosts defense a lot."},
-            {"name": "Energy Engrave", "power": 13, "accuracy": 100, "desc": "Strong energy strike."},
-            {"name": "Dark Shatter", "power": 17, "accuracy": 85, "desc": "Heavy, can lower defense."}
-        ]
-    },
-    {
-        "num": 81, "name": "Spoorine", "type": "Bio-Parasite", "rarity": "Common", "evolution": "Spoorage",
-        "description": "Spreads via contaminated dust.",
-        "stats": {"hp": 37, "atk": 11, "def": 10, "spd": 12},
-        "moves": [
-            {"name": "Spore Shot", "power": 11, "accuracy": 100, "desc": "May paralyze."},
-            {"name": "Fungal Growth", "power": 12, "accuracy": 95, "desc": "Boosts own attack."},
-            {"name": "Dust Guard", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Contaminate", "power": 14, "accuracy": 90, "desc": "May poison enemy."}
-        ]
-    },
-    {
-        "num": 82, "name": "Spoorage", "type": "Bio-Parasite", "rarity": "Rare", "evolution": None,
-        "description": "Colonizes ventilation systems.",
-        "stats": {"hp": 46, "atk": 14, "def": 13, "spd": 13},
-        "moves": [
-            {"name": "Spore Swarm", "power": 15, "accuracy": 95, "desc": "Hits all enemies."},
-            {"name": "Fungus Strike", "power": 14, "accuracy": 100, "desc": "Strong, reliable."},
-            {"name": "Vent Shield", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Toxic Haze", "power": 17, "accuracy": 85, "desc": "Poisons all foes."}
-        ]
-    },
-    {
-        "num": 83, "name": "Pestflare", "type": "Bio-Parasite", "rarity": "Uncommon", "evolution": None,
-        "description": "Attracts swarms of bugs.",
-        "stats": {"hp": 41, "atk": 13, "def": 10, "spd": 15},
-        "moves": [
-            {"name": "Bug Swarm", "power": 13, "accuracy": 95, "desc": "Hits multiple times."},
-            {"name": "Bite Strike", "power": 14, "accuracy": 100, "desc": "Strong attack."},
-            {"name": "Insect Shell", "power": 0, "accuracy": 100, "desc": "Boosts defense."},
-            {"name": "Plague", "power": 17, "accuracy": 85, "desc": "May poison all foes."}
-        ]
-    },
-    {
-        "num": 84, "name": "Magnetide", "type": "Énergie", "rarity": "Rare", "evolution": None,
-        "description": "Interferes with all appliances.",
-        "stats": {"hp": 45, "atk": 16, "def": 13, "spd": 12},
-        "moves": [
-            {"name": "Magnetic Pull", "power": 15, "accuracy": 95, "desc": "Draws enemy close."},
-            {"name": "Field Crash", "power": 14, "accuracy": 100, "desc": "Damages all electronics."},
-            {"name": "Polarity Shift", "power": 0, "accuracy": 100, "desc": "Switches attack/defense."},
-            {"name": "Appliance Zap", "power": 18, "accuracy": 85, "desc": "Overloads circuits."}
-        ]
-    },
-    {
-        "num": 85, "name": "Shiverun", "type": "Climat", "rarity": "Common", "evolution": "Shiveroll",
-        "description": "Creates sudden chills.",
-        "stats": {"hp": 36, "atk": 10, "def": 10, "spd": 13},
-        "moves": [
-            {"name": "Cold Snap", "power": 11, "accuracy": 100, "desc": "May freeze foe."},
-            {"name": "Shiver Strike", "power": 12, "accuracy": 95, "desc": "Chilling attack."},
-            {"name": "Ice Veil", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Winter Grasp", "power": 14, "accuracy": 90, "desc": "Strong cold hit."}
-        ]
-    },
-    {
-        "num": 86, "name": "Shiveroll", "type": "Climat", "rarity": "Uncommon", "evolution": None,
-        "description": "Ices up windows instantly.",
-        "stats": {"hp": 44, "atk": 14, "def": 12, "spd": 14},
-        "moves": [
-            {"name": "Frost Rush", "power": 14, "accuracy": 95, "desc": "Fast, chilling attack."},
-            {"name": "Snow Blanket", "power": 0, "accuracy": 100, "desc": "Raises defense a lot."},
-            {"name": "Blizzard", "power": 15, "accuracy": 100, "desc": "May freeze all enemies."},
-            {"name": "Freeze Ray", "power": 17, "accuracy": 85, "desc": "Massive ice attack."}
-        ]
-    },
-    {
-        "num": 87, "name": "Luminoir", "type": "Numérique", "rarity": "Rare", "evolution": None,
-        "description": "Overloads smart lighting.",
-        "stats": {"hp": 45, "atk": 16, "def": 13, "spd": 15},
-        "moves": [
-            {"name": "Light Surge", "power": 16, "accuracy": 95, "desc": "Blinding, may stun."},
-            {"name": "Lumen Crash", "power": 15, "accuracy": 100, "desc": "Bright, high damage."},
-            {"name": "Photon Veil", "power": 0, "accuracy": 100, "desc": "Raises evasion."},
-            {"name": "Strobe Burst", "power": 18, "accuracy": 85, "desc": "Massive light attack."}
-        ]
-    },
-    {
-        "num": 88, "name": "Smogshade", "type": "Climat", "rarity": "Uncommon", "evolution": None,
-        "description": "Smothers rooms with gray fog.",
-        "stats": {"hp": 39, "atk": 12, "def": 13, "spd": 13},
-        "moves": [
-            {"name": "Smog Wave", "power": 13, "accuracy": 95, "desc": "May poison foe."},
-            {"name": "Haze Cloak", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Gray Mist", "power": 14, "accuracy": 100, "desc": "Blinds enemies."},
-            {"name": "Chokehold", "power": 16, "accuracy": 85, "desc": "Damages all, may stun."}
-        ]
-    },
-    {
-        "num": 89, "name": "Plumbgeist", "type": "Spectre", "rarity": "Uncommon", "evolution": None,
-        "description": "Possesses old plumbing pipes.",
-        "stats": {"hp": 41, "atk": 13, "def": 14, "spd": 12},
-        "moves": [
-            {"name": "Pipe Haunt", "power": 13, "accuracy": 95, "desc": "May cause confusion."},
-            {"name": "Water Wail", "power": 12, "accuracy": 100, "desc": "Spectral water hit."},
-            {"name": "Haunt Armor", "power": 0, "accuracy": 100, "desc": "Raises defense a lot."},
-            {"name": "Ghost Flow", "power": 16, "accuracy": 85, "desc": "Damages all, high power."}
-        ]
-    },
-    {
-        "num": 90, "name": "Brixis", "type": "Structure", "rarity": "Common", "evolution": "Brixiant",
-        "description": "Brick dust forms its body.",
-        "stats": {"hp": 38, "atk": 11, "def": 12, "spd": 11},
-        "moves": [
-            {"name": "Brick Bash", "power": 11, "accuracy": 100, "desc": "Solid, reliable hit."},
-            {"name": "Dust Crash", "power": 12, "accuracy": 95, "desc": "May blind foe."},
-            {"name": "Mortar Wall", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Brick Toss", "power": 14, "accuracy": 90, "desc": "Heavy, can stun."}
-        ]
-    },
-        {
-        "num": 91, "name": "Brixiant", "type": "Structure", "rarity": "Uncommon", "evolution": None,
-        "description": "Can strengthen weak walls.",
-        "stats": {"hp": 46, "atk": 13, "def": 16, "spd": 11},
-        "moves": [
-            {"name": "Wall Crush", "power": 14, "accuracy": 95, "desc": "Strong, can lower defense."},
-            {"name": "Dust Guard", "power": 0, "accuracy": 100, "desc": "Boosts own defense sharply."},
-            {"name": "Reinforce", "power": 13, "accuracy": 100, "desc": "Raises both defense and HP a little."},
-            {"name": "Brick Quake", "power": 17, "accuracy": 85, "desc": "Heavy, shakes the field."}
-        ]
-    },
-    {
-        "num": 92, "name": "Sporalux", "type": "Bio-Parasite", "rarity": "Rare", "evolution": None,
-        "description": "Glows in the dark, feeds on paint.",
-        "stats": {"hp": 45, "atk": 16, "def": 11, "spd": 14},
-        "moves": [
-            {"name": "Lumen Spores", "power": 16, "accuracy": 95, "desc": "May paralyze all foes."},
-            {"name": "Paint Drain", "power": 14, "accuracy": 100, "desc": "Absorbs HP."},
-            {"name": "Glow Up", "power": 0, "accuracy": 100, "desc": "Boosts own attack."},
-            {"name": "Dark Bloom", "power": 18, "accuracy": 85, "desc": "Massive, risky attack."}
-        ]
-    },
-    {
-        "num": 93, "name": "Datashade", "type": "Numérique", "rarity": "Uncommon", "evolution": None,
-        "description": "Hides in data cables, erases files.",
-        "stats": {"hp": 39, "atk": 14, "def": 12, "spd": 14},
-        "moves": [
-            {"name": "Data Siphon", "power": 14, "accuracy": 95, "desc": "Steals enemy energy."},
-            {"name": "Erase", "power": 13, "accuracy": 100, "desc": "Can lower enemy attack."},
-            {"name": "File Guard", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Digital Smog", "power": 16, "accuracy": 85, "desc": "Confuses all enemies."}
-        ]
-    },
-    {
-        "num": 94, "name": "Gasphex", "type": "Climat", "rarity": "Uncommon", "evolution": None,
-        "description": "Fills rooms with untraceable gas.",
-        "stats": {"hp": 40, "atk": 13, "def": 13, "spd": 14},
-        "moves": [
-            {"name": "Toxic Mist", "power": 14, "accuracy": 95, "desc": "May poison all."},
-            {"name": "Invisible Veil", "power": 0, "accuracy": 100, "desc": "Boosts evasion."},
-            {"name": "Fume Crash", "power": 13, "accuracy": 100, "desc": "Can confuse foe."},
-            {"name": "Gas Blast", "power": 17, "accuracy": 85, "desc": "Powerful, risky attack."}
-        ]
-    },
-    {
-        "num": 95, "name": "Cracklin", "type": "Structure", "rarity": "Common", "evolution": "Cracklash",
-        "description": "Jumps from crack to crack.",
-        "stats": {"hp": 36, "atk": 11, "def": 10, "spd": 15},
-        "moves": [
-            {"name": "Crackle Hit", "power": 11, "accuracy": 100, "desc": "Fast, can lower defense."},
-            {"name": "Quick Dash", "power": 12, "accuracy": 95, "desc": "Raises own speed."},
-            {"name": "Brick Chip", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Crack Jump", "power": 14, "accuracy": 90, "desc": "Can cause confusion."}
-        ]
-    },
-    {
-        "num": 96, "name": "Cracklash", "type": "Structure", "rarity": "Rare", "evolution": None,
-        "description": "Causes structural chain reactions.",
-        "stats": {"hp": 44, "atk": 15, "def": 13, "spd": 14},
-        "moves": [
-            {"name": "Chain Quake", "power": 16, "accuracy": 95, "desc": "May lower all foes' defense."},
-            {"name": "Fracture", "power": 14, "accuracy": 100, "desc": "Strong, reliable attack."},
-            {"name": "Wall Up", "power": 0, "accuracy": 100, "desc": "Greatly boosts own defense."},
-            {"name": "Crack Bomb", "power": 18, "accuracy": 85, "desc": "Huge, but risky."}
-        ]
-    },
-    {
-        "num": 97, "name": "Damphex", "type": "Climat", "rarity": "Common", "evolution": "Damptide",
-        "description": "Dampens the air with cold mist.",
-        "stats": {"hp": 35, "atk": 10, "def": 11, "spd": 12},
-        "moves": [
-            {"name": "Mist Shot", "power": 10, "accuracy": 100, "desc": "May blind foe."},
-            {"name": "Chill Pulse", "power": 12, "accuracy": 95, "desc": "Slows enemy."},
-            {"name": "Moist Shield", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Damp Strike", "power": 14, "accuracy": 90, "desc": "Strong, cold hit."}
-        ]
-    },
-    {
-        "num": 98, "name": "Damptide", "type": "Climat", "rarity": "Uncommon", "evolution": None,
-        "description": "Swells wood, ruins parquet floors.",
-        "stats": {"hp": 43, "atk": 13, "def": 14, "spd": 12},
-        "moves": [
-            {"name": "Flood Bash", "power": 15, "accuracy": 95, "desc": "Can lower foe's speed."},
-            {"name": "Wood Swell", "power": 14, "accuracy": 100, "desc": "Reduces enemy defense."},
-            {"name": "Moisture Veil", "power": 0, "accuracy": 100, "desc": "Greatly boosts own defense."},
-            {"name": "Parquet Slam", "power": 17, "accuracy": 85, "desc": "Heavy, floor-damaging hit."}
-        ]
-    },
-    {
-        "num": 99, "name": "Buggbyte", "type": "Numérique", "rarity": "Common", "evolution": "BuggbyteX",
-        "description": "Causes error pop-ups everywhere.",
-        "stats": {"hp": 36, "atk": 11, "def": 10, "spd": 15},
-        "moves": [
-            {"name": "Pop-up Spam", "power": 11, "accuracy": 100, "desc": "Confuses foe."},
-            {"name": "Bit Hit", "power": 12, "accuracy": 95, "desc": "Digital strike."},
-            {"name": "Crash Guard", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Error Glitch", "power": 14, "accuracy": 90, "desc": "May stun enemy."}
-        ]
-    },
-    {
-        "num": 100, "name": "BuggbyteX", "type": "Numérique", "rarity": "Rare", "evolution": None,
-        "description": "Triggers system-wide meltdowns.",
-        "stats": {"hp": 44, "atk": 15, "def": 12, "spd": 15},
-        "moves": [
-            {"name": "System Crash", "power": 16, "accuracy": 95, "desc": "Can paralyze enemy."},
-            {"name": "Bit Explosion", "power": 14, "accuracy": 100, "desc": "Huge digital hit."},
-            {"name": "Blue Screen", "power": 0, "accuracy": 100, "desc": "Boosts own evasion."},
-            {"name": "Fatal Error", "power": 18, "accuracy": 85, "desc": "Ultimate, risky."}
-        ]
-    },
-    {
-        "num": 101, "name": "Creepflow", "type": "Structure", "rarity": "Uncommon", "evolution": None,
-        "description": "Walls seem to 'breathe' when it's near.",
-        "stats": {"hp": 42, "atk": 13, "def": 15, "spd": 12},
-        "moves": [
-            {"name": "Wall Squeeze", "power": 14, "accuracy": 95, "desc": "May paralyze."},
-            {"name": "Breath Strike", "power": 13, "accuracy": 100, "desc": "Odd, may confuse."},
-            {"name": "Warp Barrier", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Pressure Wave", "power": 17, "accuracy": 85, "desc": "Strong, defense down."}
-        ]
-    },
-    {
-        "num": 102, "name": "Dustshade", "type": "Climat", "rarity": "Common", "evolution": "Dustloom",
-        "description": "Covers every surface in fine dust.",
-        "stats": {"hp": 37, "atk": 11, "def": 11, "spd": 13},
-        "moves": [
-            {"name": "Dust Swirl", "power": 11, "accuracy": 100, "desc": "Blinds foe."},
-            {"name": "Powder Hit", "power": 12, "accuracy": 95, "desc": "Soft, reliable attack."},
-            {"name": "Fine Shield", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Silt Blast", "power": 14, "accuracy": 90, "desc": "Earthy, can lower speed."}
-        ]
-    },
-    {
-        "num": 103, "name": "Dustloom", "type": "Climat", "rarity": "Rare", "evolution": None,
-        "description": "Turns rooms pitch black.",
-        "stats": {"hp": 45, "atk": 14, "def": 13, "spd": 13},
-        "moves": [
-            {"name": "Pitch Veil", "power": 16, "accuracy": 95, "desc": "May blind all enemies."},
-            {"name": "Dark Dust", "power": 14, "accuracy": 100, "desc": "Heavy, slow attack."},
-            {"name": "Veil Guard", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Blackout Slam", "power": 17, "accuracy": 85, "desc": "Huge, rare miss."}
-        ]
-    },
-    {
-        "num": 104, "name": "Coblite", "type": "Structure", "rarity": "Common", "evolution": "Coblumine",
-        "description": "Masonry dust forms its cloak.",
-        "stats": {"hp": 36, "atk": 12, "def": 12, "spd": 11},
-        "moves": [
-            {"name": "Stone Throw", "power": 11, "accuracy": 100, "desc": "Simple rock hit."},
-            {"name": "Masonry Bash", "power": 12, "accuracy": 95, "desc": "Hits hard."},
-            {"name": "Brick Guard", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Dust Pulse", "power": 14, "accuracy": 90, "desc": "Cloud of dust blinds foe."}
-        ]
-    },
-    {
-        "num": 105, "name": "Coblumine", "type": "Structure", "rarity": "Uncommon", "evolution": None,
-        "description": "Glows in ruins at night.",
-        "stats": {"hp": 44, "atk": 13, "def": 15, "spd": 12},
-        "moves": [
-            {"name": "Glow Strike", "power": 14, "accuracy": 95, "desc": "Blinding blow."},
-            {"name": "Ruins Veil", "power": 0, "accuracy": 100, "desc": "Boosts defense sharply."},
-            {"name": "Night Slam", "power": 13, "accuracy": 100, "desc": "Strong at night."},
-            {"name": "Lumino Blast", "power": 17, "accuracy": 85, "desc": "High power, risky."}
-        ]
-    },
-    {
-        "num": 106, "name": "Sputterix", "type": "Énergie", "rarity": "Common", "evolution": "Sputterox",
-        "description": "Makes outlets spark for fun.",
-        "stats": {"hp": 35, "atk": 11, "def": 10, "spd": 15},
-        "moves": [
-            {"name": "Outlet Zap", "power": 12, "accuracy": 100, "desc": "May paralyze foe."},
-            {"name": "Sputter Jolt", "power": 11, "accuracy": 95, "desc": "Annoying shock."},
-            {"name": "Plug Guard", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Short Circuit", "power": 14, "accuracy": 90, "desc": "Low accuracy, strong hit."}
-        ]
-    },
-    {
-        "num": 107, "name": "Sputterox", "type": "Énergie", "rarity": "Rare", "evolution": None,
-        "description": "Can short out an entire grid.",
-        "stats": {"hp": 43, "atk": 15, "def": 12, "spd": 15},
-        "moves": [
-            {"name": "Grid Shock", "power": 16, "accuracy": 95, "desc": "Paralyzes all foes."},
-            {"name": "Ox Surge", "power": 15, "accuracy": 100, "desc": "Very strong shock."},
-            {"name": "Ground Guard", "power": 0, "accuracy": 100, "desc": "Reduces damage next turn."},
-            {"name": "Power Out", "power": 18, "accuracy": 85, "desc": "Biggest attack."}
-        ]
-    },
-    {
-        "num": 108, "name": "Vaporgale", "type": "Climat", "rarity": "Uncommon", "evolution": None,
-        "description": "Hot breath fogs up every mirror.",
-        "stats": {"hp": 40, "atk": 13, "def": 12, "spd": 14},
-        "moves": [
-            {"name": "Steam Blast", "power": 14, "accuracy": 95, "desc": "Hot, may burn foe."},
-            {"name": "Mirror Mist", "power": 13, "accuracy": 100, "desc": "Can blind."},
-            {"name": "Fog Screen", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Gale Strike", "power": 17, "accuracy": 85, "desc": "Hits hard, low accuracy."}
-        ]
-    },
-    {
-        "num": 109, "name": "Nocrypt", "type": "Spectre", "rarity": "Rare", "evolution": None,
-        "description": "Guards ancient blueprints.",
-        "stats": {"hp": 44, "atk": 14, "def": 14, "spd": 14},
-        "moves": [
-            {"name": "Crypt Guard", "power": 16, "accuracy": 95, "desc": "Protects team, may boost defense."},
-            {"name": "Ancient Curse", "power": 15, "accuracy": 100, "desc": "Haunted strike."},
-            {"name": "Blueprint Veil", "power": 0, "accuracy": 100, "desc": "Boosts defense a lot."},
-            {"name": "Lost Scream", "power": 18, "accuracy": 85, "desc": "Huge spectral attack."}
-        ]
-    },
-    {
-        "num": 110, "name": "Fibergeist", "type": "Numérique", "rarity": "Rare", "evolution": None,
-        "description": "Corrupts fiber optic cables.",
-        "stats": {"hp": 45, "atk": 15, "def": 14, "spd": 16},
-        "moves": [
-            {"name": "Fiber Lash", "power": 17, "accuracy": 95, "desc": "Fast, damaging strike."},
-            {"name": "Corrupt Data", "power": 14, "accuracy": 100, "desc": "May paralyze foe."},
-            {"name": "Light Guard", "power": 0, "accuracy": 100, "desc": "Boosts own evasion."},
-            {"name": "Data Ruin", "power": 19, "accuracy": 85, "desc": "Ultimate, low accuracy."}
-        ]
-    },
-    {
-        "num": 111, "name": "Mosslash", "type": "Bio-Parasite", "rarity": "Common", "evolution": "Mosslurk",
-        "description": "Green and invasive.",
-        "stats": {"hp": 35, "atk": 10, "def": 11, "spd": 13},
-        "moves": [
-            {"name": "Moss Bite", "power": 11, "accuracy": 100, "desc": "May lower defense."},
-            {"name": "Spore Spray", "power": 12, "accuracy": 95, "desc": "Fungal attack."},
-            {"name": "Root Guard", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Creep Growth", "power": 14, "accuracy": 90, "desc": "Boosts own attack."}
-        ]
-    },
-    {
-        "num": 112, "name": "Mosslurk", "type": "Bio-Parasite", "rarity": "Rare", "evolution": None,
-        "description": "Grows behind wallpaper silently.",
-        "stats": {"hp": 44, "atk": 14, "def": 13, "spd": 13},
-        "moves": [
-            {"name": "Wall Creep", "power": 15, "accuracy": 95, "desc": "Strong, may poison."},
-            {"name": "Lurk Strike", "power": 13, "accuracy": 100, "desc": "Sneaky attack."},
-            {"name": "Wallpaper Veil", "power": 0, "accuracy": 100, "desc": "Raises defense and evasion."},
-            {"name": "Silent Spread", "power": 17, "accuracy": 85, "desc": "Slow, very strong."}
-        ]
-    },
-    {
-        "num": 113, "name": "Fractorn", "type": "Structure", "rarity": "Rare", "evolution": None,
-        "description": "Shatters glass with ultrasonic screams.",
-        "stats": {"hp": 46, "atk": 16, "def": 12, "spd": 14},
-        "moves": [
-            {"name": "Glass Break", "power": 17, "accuracy": 95, "desc": "Destroys barriers."},
-            {"name": "Ultrasonic Scream", "power": 15, "accuracy": 100, "desc": "Can stun foes."},
-            {"name": "Fracture Guard", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Mirror Burst", "power": 19, "accuracy": 85, "desc": "Powerful but rare."}
-        ]
-    },
-    {
-        "num": 114, "name": "Chitterra", "type": "Bio-Parasite", "rarity": "Common", "evolution": "Chitterrusk",
-        "description": "Scratches at insulation.",
-        "stats": {"hp": 36, "atk": 11, "def": 10, "spd": 13},
-        "moves": [
-            {"name": "Scratch", "power": 11, "accuracy": 100, "desc": "Basic, reliable hit."},
-            {"name": "Bite", "power": 12, "accuracy": 95, "desc": "May lower defense."},
-            {"name": "Insulate", "power": 0, "accuracy": 100, "desc": "Raises defense."},
-            {"name": "Quick Chew", "power": 14, "accuracy": 90, "desc": "May stun foe."}
-        ]
-    },
-    {
-        "num": 115, "name": "Chitterrusk", "type": "Bio-Parasite", "rarity": "Uncommon", "evolution": None,
-        "description": "Invites real bugs inside.",
-        "stats": {"hp": 42, "atk": 13, "def": 13, "spd": 13},
-        "moves": [
-            {"name": "Bug Call", "power": 15, "accuracy": 95, "desc": "Summons help."},
-            {"name": "Insulate Strike", "power": 13, "accuracy": 100, "desc": "Boosted if hit after."},
-            {"name": "Guard Swarm", "power": 0, "accuracy": 100, "desc": "Raises defense and attack."},
-            {"name": "Frenzy Chomp", "power": 16, "accuracy": 85, "desc": "Very strong bite."}
-        ]
-    },
-    {
-        "num": 116, "name": "Luminel", "type": "Numérique", "rarity": "Common", "evolution": "Luminisk",
-        "description": "Makes LEDs flash patterns.",
-        "stats": {"hp": 37, "atk": 11, "def": 10, "spd": 14},
-        "moves": [
-            {"name": "Flash", "power": 11, "accuracy": 100, "desc": "May stun enemy."},
-            {"name": "Light Trick", "power": 12, "accuracy": 95, "desc": "Confuses foe."},
-            {"name": "Glow Guard", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Flicker Hit", "power": 14, "accuracy": 90, "desc": "May lower enemy speed."}
-        ]
-    },
-    {
-        "num": 117, "name": "Luminisk", "type": "Numérique", "rarity": "Uncommon", "evolution": None,
-        "description": "Hypnotizes building occupants.",
-        "stats": {"hp": 44, "atk": 13, "def": 13, "spd": 15},
-        "moves": [
-            {"name": "Hypno Beam", "power": 15, "accuracy": 95, "desc": "Can confuse foe."},
-            {"name": "Light Wave", "power": 13, "accuracy": 100, "desc": "Solid digital hit."},
-            {"name": "Guard Light", "power": 0, "accuracy": 100, "desc": "Greatly boosts defense."},
-            {"name": "Lumin Crash", "power": 17, "accuracy": 85, "desc": "Big, risky."}
-        ]
-    },
-    {
-        "num": 118, "name": "Venturoar", "type": "Structure", "rarity": "Common", "evolution": "VenturoarX",
-        "description": "Hides in ventilation shafts.",
-        "stats": {"hp": 37, "atk": 11, "def": 11, "spd": 14},
-        "moves": [
-            {"name": "Vent Whirl", "power": 12, "accuracy": 100, "desc": "Can blind foe."},
-            {"name": "Echo Strike", "power": 11, "accuracy": 95, "desc": "Quick hit."},
-            {"name": "Air Guard", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Roar Blast", "power": 15, "accuracy": 90, "desc": "Loud, may stun."}
-        ]
-    },
-    {
-        "num": 119, "name": "VenturoarX", "type": "Structure", "rarity": "Rare", "evolution": None,
-        "description": "Roars like a beast in ducts.",
-        "stats": {"hp": 45, "atk": 15, "def": 13, "spd": 13},
-        "moves": [
-            {"name": "Mega Roar", "power": 17, "accuracy": 95, "desc": "Can stun all enemies."},
-            {"name": "Steel Bash", "power": 14, "accuracy": 100, "desc": "Strong metallic hit."},
-            {"name": "Guard Shell", "power": 0, "accuracy": 100, "desc": "Greatly boosts defense."},
-            {"name": "Duct Quake", "power": 18, "accuracy": 85, "desc": "Field shaking."}
-        ]
-    },
-    {
-        "num": 120, "name": "Infestine", "type": "Bio-Parasite", "rarity": "Uncommon", "evolution": None,
-        "description": "Grows only in hidden spaces.",
-        "stats": {"hp": 40, "atk": 13, "def": 12, "spd": 14},
-        "moves": [
-            {"name": "Hidden Growth", "power": 14, "accuracy": 95, "desc": "Sneaky, may poison."},
-            {"name": "Secret Strike", "power": 13, "accuracy": 100, "desc": "Fast, undetectable."},
-            {"name": "Stealth Guard", "power": 0, "accuracy": 100, "desc": "Boosts defense and evasion."},
-            {"name": "Infest Wave", "power": 17, "accuracy": 85, "desc": "Strong, random effect."}
-        ]
-    },
-    {
-        "num": 121, "name": "Flickshade", "type": "Spectre", "rarity": "Common", "evolution": "Flickphant",
-        "description": "Flickers the lights just before storms.",
-        "stats": {"hp": 38, "atk": 12, "def": 11, "spd": 13},
-        "moves": [
-            {"name": "Flicker Hit", "power": 12, "accuracy": 100, "desc": "May blind foe."},
-            {"name": "Phantom Jab", "power": 13, "accuracy": 95, "desc": "Quick spectral strike."},
-            {"name": "Shade Guard", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Lightning Scream", "power": 15, "accuracy": 90, "desc": "May paralyze."}
-        ]
-    },
-    {
-        "num": 122, "name": "Flickphant", "type": "Spectre", "rarity": "Uncommon", "evolution": None,
-        "description": "Appears in thunderstorms.",
-        "stats": {"hp": 45, "atk": 14, "def": 13, "spd": 14},
-        "moves": [
-            {"name": "Phantom Crash", "power": 16, "accuracy": 95, "desc": "Strong, may confuse."},
-            {"name": "Thunder Shade", "power": 15, "accuracy": 100, "desc": "Shock and fear."},
-            {"name": "Veil Guard", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Flicker Doom", "power": 18, "accuracy": 85, "desc": "Huge attack, rare miss."}
-        ]
-    },
-    {
-        "num": 123, "name": "Brickurn", "type": "Structure", "rarity": "Rare", "evolution": None,
-        "description": "Turns broken bricks to dust.",
-        "stats": {"hp": 46, "atk": 15, "def": 15, "spd": 12},
-        "moves": [
-            {"name": "Dust Eruption", "power": 17, "accuracy": 95, "desc": "Clouds all enemies."},
-            {"name": "Brick Bash", "power": 15, "accuracy": 100, "desc": "Heavy structural hit."},
-            {"name": "Fortify", "power": 0, "accuracy": 100, "desc": "Greatly boosts defense."},
-            {"name": "Wall Break", "power": 19, "accuracy": 85, "desc": "Very strong, risky."}
-        ]
-    },
-    {
-        "num": 124, "name": "Cryptmoss", "type": "Bio-Parasite", "rarity": "Uncommon", "evolution": None,
-        "description": "Hides under loose floorboards.",
-        "stats": {"hp": 39, "atk": 13, "def": 12, "spd": 14},
-        "moves": [
-            {"name": "Hidden Spread", "power": 13, "accuracy": 95, "desc": "May poison."},
-            {"name": "Moss Ambush", "power": 14, "accuracy": 100, "desc": "Sneaky, undetectable."},
-            {"name": "Rot Guard", "power": 0, "accuracy": 100, "desc": "Boosts defense."},
-            {"name": "Creep Swarm", "power": 16, "accuracy": 85, "desc": "Many little attacks."}
-        ]
-    },
-    {
-        "num": 125, "name": "Toxiburst", "type": "Climat", "rarity": "Rare", "evolution": None,
-        "description": "Releases poisonous air in old basements.",
-        "stats": {"hp": 43, "atk": 16, "def": 12, "spd": 13},
-        "moves": [
-            {"name": "Toxic Wave", "power": 17, "accuracy": 95, "desc": "Can poison all."},
-            {"name": "Basement Cloud", "power": 15, "accuracy": 100, "desc": "Lingering poison."},
-            {"name": "Aero Shield", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Poison Blast", "power": 19, "accuracy": 85, "desc": "Extremely risky, huge."}
-        ]
-    },
-    {
-        "num": 126, "name": "Siltgeist", "type": "Spectre", "rarity": "Rare", "evolution": None,
-        "description": "Makes concrete vibrate with fear.",
-        "stats": {"hp": 45, "atk": 15, "def": 13, "spd": 15},
-        "moves": [
-            {"name": "Silt Shock", "power": 16, "accuracy": 95, "desc": "May paralyze."},
-            {"name": "Vibration", "power": 15, "accuracy": 100, "desc": "Can lower foe defense."},
-            {"name": "Ghost Guard", "power": 0, "accuracy": 100, "desc": "Boosts defense sharply."},
-            {"name": "Hauntquake", "power": 18, "accuracy": 85, "desc": "Massive attack."}
-        ]
-    },
-    {
-        "num": 127, "name": "Paraspore", "type": "Bio-Parasite", "rarity": "Rare", "evolution": None,
-        "description": "Fills vents with hallucinogenic spores.",
-        "stats": {"hp": 41, "atk": 15, "def": 12, "spd": 15},
-        "moves": [
-            {"name": "Spore Dream", "power": 16, "accuracy": 95, "desc": "May confuse."},
-            {"name": "Mushroom Fog", "power": 14, "accuracy": 100, "desc": "Reduces enemy defense."},
-            {"name": "Psyche Shield", "power": 0, "accuracy": 100, "desc": "Boosts evasion."},
-            {"name": "Hallucinate", "power": 18, "accuracy": 85, "desc": "Random powerful effect."}
-        ]
-    },
-    {
-        "num": 128, "name": "Pylonix", "type": "Structure", "rarity": "Uncommon", "evolution": None,
-        "description": "Merges with metal beams.",
-        "stats": {"hp": 44, "atk": 13, "def": 15, "spd": 12},
-        "moves": [
-            {"name": "Metal Bash", "power": 14, "accuracy": 95, "desc": "Solid metal hit."},
-            {"name": "Fusion Slam", "power": 13, "accuracy": 100, "desc": "Strong, reliable."},
-            {"name": "Pylon Guard", "power": 0, "accuracy": 100, "desc": "Greatly boosts defense."},
-            {"name": "Steel Shout", "power": 17, "accuracy": 85, "desc": "Loud, stuns enemy."}
-        ]
-    },
-    {
-        "num": 129, "name": "Rotoglyph", "type": "Structure", "rarity": "Rare", "evolution": None,
-        "description": "Etches warning symbols in steel.",
-        "stats": {"hp": 45, "atk": 16, "def": 13, "spd": 12},
-        "moves": [
-            {"name": "Glyph Etch", "power": 17, "accuracy": 95, "desc": "May paralyze."},
-            {"name": "Warning Slam", "power": 15, "accuracy": 100, "desc": "Solid, heavy hit."},
-            {"name": "Steel Guard", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Iron Burst", "power": 19, "accuracy": 85, "desc": "Massive, risky."}
-        ]
-    },
-    {
-        "num": 130, "name": "Neoncrypt", "type": "Numérique", "rarity": "Rare", "evolution": None,
-        "description": "Hides in neon signs, corrupts their glow.",
-        "stats": {"hp": 44, "atk": 15, "def": 14, "spd": 16},
-        "moves": [
-            {"name": "Neon Strike", "power": 17, "accuracy": 95, "desc": "May confuse."},
-            {"name": "Glow Hack", "power": 15, "accuracy": 100, "desc": "Digital glow hit."},
-            {"name": "Flash Guard", "power": 0, "accuracy": 100, "desc": "Boosts evasion."},
-            {"name": "Sign Burst", "power": 19, "accuracy": 85, "desc": "Loud and risky."}
-        ]
-    },
-    {
-        "num": 131, "name": "Glitchara", "type": "Numérique", "rarity": "Rare", "evolution": None,
-        "description": "Generates endless error messages.",
-        "stats": {"hp": 45, "atk": 16, "def": 13, "spd": 15},
-        "moves": [
-            {"name": "Error Spam", "power": 16, "accuracy": 95, "desc": "Can paralyze."},
-            {"name": "Crash Flood", "power": 15, "accuracy": 100, "desc": "Big digital hit."},
-            {"name": "Glitch Guard", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Infinite Loop", "power": 18, "accuracy": 85, "desc": "Devastating, rare hit."}
-        ]
-    },
-    {
-        "num": 132, "name": "Dampraze", "type": "Climat", "rarity": "Rare", "evolution": None,
-        "description": "Causes steam explosions.",
-        "stats": {"hp": 45, "atk": 16, "def": 13, "spd": 13},
-        "moves": [
-            {"name": "Steam Burst", "power": 17, "accuracy": 95, "desc": "May burn all foes."},
-            {"name": "Pressure Shock", "power": 15, "accuracy": 100, "desc": "Strong hit."},
-            {"name": "Boil Guard", "power": 0, "accuracy": 100, "desc": "Reduces next attack's power."},
-            {"name": "Explosion", "power": 20, "accuracy": 80, "desc": "Ultimate, very risky."}
-        ]
-    },
-    {
-        "num": 133, "name": "Fraywatt", "type": "Énergie", "rarity": "Uncommon", "evolution": None,
-        "description": "Can unravel whole circuits.",
-        "stats": {"hp": 44, "atk": 13, "def": 15, "spd": 13},
-        "moves": [
-            {"name": "Unravel Hit", "power": 14, "accuracy": 95, "desc": "Can lower defense."},
-            {"name": "Circuit Bite", "power": 13, "accuracy": 100, "desc": "Sharp attack."},
-            {"name": "Spark Guard", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Fry Surge", "power": 17, "accuracy": 85, "desc": "Strong, may paralyze."}
-        ]
-    },
-    {
-        "num": 134, "name": "Patchmoss", "type": "Bio-Parasite", "rarity": "Common", "evolution": "Patchmourn",
-        "description": "Patches cracks with living moss.",
-        "stats": {"hp": 36, "atk": 11, "def": 12, "spd": 13},
-        "moves": [
-            {"name": "Patch Up", "power": 11, "accuracy": 100, "desc": "Heals self slightly."},
-            {"name": "Moss Wrap", "power": 12, "accuracy": 95, "desc": "May poison foe."},
-            {"name": "Green Guard", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Crack Trap", "power": 14, "accuracy": 90, "desc": "Can trap enemy."}
-        ]
-    },
-    {
-        "num": 135, "name": "Patchmourn", "type": "Bio-Parasite", "rarity": "Uncommon", "evolution": None,
-        "description": "Haunts patched walls.",
-        "stats": {"hp": 44, "atk": 13, "def": 13, "spd": 13},
-        "moves": [
-            {"name": "Mourn Lash", "power": 15, "accuracy": 95, "desc": "Sad, but strong."},
-            {"name": "Haunt Guard", "power": 0, "accuracy": 100, "desc": "Raises defense and attack."},
-            {"name": "Patch Slam", "power": 13, "accuracy": 100, "desc": "Reliable."},
-            {"name": "Revenant Bite", "power": 17, "accuracy": 85, "desc": "Risky, huge damage."}
-        ]
-    },
-    {
-        "num": 136, "name": "Thermiwisp", "type": "Climat", "rarity": "Uncommon", "evolution": None,
-        "description": "Swirls of warm and cold air.",
-        "stats": {"hp": 41, "atk": 13, "def": 13, "spd": 14},
-        "moves": [
-            {"name": "Thermal Wave", "power": 14, "accuracy": 95, "desc": "May burn or chill foe."},
-            {"name": "Swirl Strike", "power": 13, "accuracy": 100, "desc": "Fast, reliable."},
-            {"name": "Wisp Guard", "power": 0, "accuracy": 100, "desc": "Boosts evasion."},
-            {"name": "Mix Blast", "power": 16, "accuracy": 85, "desc": "Random effect."}
-        ]
-    },
-    {
-        "num": 137, "name": "Hackgeist", "type": "Numérique", "rarity": "Rare", "evolution": None,
-        "description": "Haunts smart home systems.",
-        "stats": {"hp": 45, "atk": 15, "def": 14, "spd": 15},
-        "moves": [
-            {"name": "Hack Pulse", "power": 16, "accuracy": 95, "desc": "Can paralyze."},
-            {"name": "Ghost Data", "power": 15, "accuracy": 100, "desc": "May confuse."},
-            {"name": "Firewall Guard", "power": 0, "accuracy": 100, "desc": "Boosts own defense."},
-            {"name": "Crash Storm", "power": 18, "accuracy": 85, "desc": "Major damage, rare hit."}
-        ]
-    },
-    {
-        "num": 138, "name": "Moldwraith", "type": "Bio-Parasite", "rarity": "Rare", "evolution": None,
-        "description": "Possesses abandoned apartments.",
-        "stats": {"hp": 45, "atk": 16, "def": 13, "spd": 14},
-        "moves": [
-            {"name": "Wraith Lash", "power": 17, "accuracy": 95, "desc": "Haunted, strong."},
-            {"name": "Mold Mist", "power": 15, "accuracy": 100, "desc": "Poisonous."},
-            {"name": "Spoil Guard", "power": 0, "accuracy": 100, "desc": "Raises own defense."},
-            {"name": "Haunt Rage", "power": 19, "accuracy": 85, "desc": "Huge, may stun."}
-        ]
-    },
-    {
-        "num": 139, "name": "Vitralisk", "type": "Structure", "rarity": "Rare", "evolution": None,
-        "description": "Controls colored glass windows.",
-        "stats": {"hp": 45, "atk": 16, "def": 14, "spd": 13},
-        "moves": [
-            {"name": "Glass Crash", "power": 16, "accuracy": 95, "desc": "Cuts foe's defense."},
-            {"name": "Prism Slash", "power": 15, "accuracy": 100, "desc": "Colorful, powerful."},
-            {"name": "Light Guard", "power": 0, "accuracy": 100, "desc": "Boosts own evasion."},
-            {"name": "Crystal Burst", "power": 18, "accuracy": 85, "desc": "Very risky, huge."}
-        ]
-    },
-    {
-        "num": 140, "name": "Furnaceek", "type": "Climat", "rarity": "Rare", "evolution": None,
-        "description": "Appears only during winter storms.",
-        "stats": {"hp": 46, "atk": 16, "def": 13, "spd": 13},
-        "moves": [
-            {"name": "Blizzard Breath", "power": 16, "accuracy": 95, "desc": "May freeze."},
-            {"name": "Storm Strike", "power": 15, "accuracy": 100, "desc": "Strong, relentless."},
-            {"name": "Fire Guard", "power": 0, "accuracy": 100, "desc": "Greatly raises defense."},
-            {"name": "Inferno", "power": 19, "accuracy": 85, "desc": "Burns all."}
-        ]
-    },
-    {
-        "num": 141, "name": "Basalgon", "type": "Structure", "rarity": "Legendary", "evolution": None,
-        "description": "Ancient and nearly indestructible.",
-        "stats": {"hp": 62, "atk": 20, "def": 22, "spd": 12},
-        "moves": [
-            {"name": "Basalt Smash", "power": 22, "accuracy": 95, "desc": "Colossal hit."},
-            {"name": "Titan Guard", "power": 0, "accuracy": 100, "desc": "Raises defense sharply."},
-            {"name": "Seismic Quake", "power": 20, "accuracy": 90, "desc": "May stun."},
-            {"name": "Eternal Wall", "power": 0, "accuracy": 100, "desc": "Negates one attack."}
-        ]
-    },
-    {
-        "num": 142, "name": "Miasmax", "type": "Climat", "rarity": "Legendary", "evolution": None,
-        "description": "Its breath is pure toxicity.",
-        "stats": {"hp": 58, "atk": 21, "def": 18, "spd": 17},
-        "moves": [
-            {"name": "Toxic Tempest", "power": 22, "accuracy": 95, "desc": "Poisons all foes."},
-            {"name": "Poison Shield", "power": 0, "accuracy": 100, "desc": "Heals and raises defense."},
-            {"name": "Gas Wave", "power": 19, "accuracy": 100, "desc": "May confuse."},
-            {"name": "Final Breath", "power": 25, "accuracy": 80, "desc": "Ultimate, low accuracy."}
-        ]
-    },
-    {
-        "num": 143, "name": "Overlordis", "type": "Énergie", "rarity": "Legendary", "evolution": None,
-        "description": "Can power or destroy entire buildings.",
-        "stats": {"hp": 60, "atk": 22, "def": 20, "spd": 18},
-        "moves": [
-            {"name": "Power Surge", "power": 23, "accuracy": 95, "desc": "Major damage."},
-            {"name": "Overdrive", "power": 0, "accuracy": 100, "desc": "Boosts all stats."},
-            {"name": "Shockquake", "power": 21, "accuracy": 100, "desc": "Stuns all enemies."},
-            {"name": "Absolute Strike", "power": 26, "accuracy": 75, "desc": "Can KO in one hit."}
-        ]
-    },
-    {
-        "num": 144, "name": "Holohex", "type": "Numérique", "rarity": "Legendary", "evolution": None,
-        "description": "Glitch so rare it exists in two places at once.",
-        "stats": {"hp": 57, "atk": 18, "def": 19, "spd": 23},
-        "moves": [
-            {"name": "Duality Glitch", "power": 21, "accuracy": 90, "desc": "Hits twice, may confuse."},
-            {"name": "Data Wrap", "power": 0, "accuracy": 100, "desc": "Boosts defense and speed."},
-            {"name": "Holo Beam", "power": 20, "accuracy": 100, "desc": "Blinding light."},
-            {"name": "Reality Split", "power": 25, "accuracy": 80, "desc": "May stun, may miss."}
-        ]
-    },
-    {
-        "num": 145, "name": "Necrocrypt", "type": "Spectre", "rarity": "Legendary", "evolution": None,
-        "description": "Brings old blueprints back to life.",
-        "stats": {"hp": 59, "atk": 21, "def": 19, "spd": 19},
-        "moves": [
-            {"name": "Blueprint Bind", "power": 20, "accuracy": 95, "desc": "Can trap enemy."},
-            {"name": "Soul Rise", "power": 0, "accuracy": 100, "desc": "Heals and boosts own stats."},
-            {"name": "Crypt Wail", "power": 22, "accuracy": 100, "desc": "Ghostly damage."},
-            {"name": "Afterlife Pulse", "power": 24, "accuracy": 85, "desc": "Might KO."}
-        ]
-    },
-    {
-        "num": 146, "name": "Rotolyth", "type": "Structure", "rarity": "Legendary", "evolution": None,
-        "description": "Rewrites the rules of gravity in ruins.",
-        "stats": {"hp": 62, "atk": 20, "def": 22, "spd": 14},
-        "moves": [
-            {"name": "Gravity Flip", "power": 23, "accuracy": 90, "desc": "May confuse."},
-            {"name": "Ruins Guard", "power": 0, "accuracy": 100, "desc": "Negates next attack."},
-            {"name": "Collapse", "power": 21, "accuracy": 100, "desc": "All foes hit."},
-            {"name": "Endless Fall", "power": 25, "accuracy": 80, "desc": "Ultimate risk."}
-        ]
-    },
-    {
-        "num": 147, "name": "Paradoxul", "type": "Bio-Parasite", "rarity": "Legendary", "evolution": None,
-        "description": "Can both heal and corrupt a building.",
-        "stats": {"hp": 58, "atk": 19, "def": 20, "spd": 20},
-        "moves": [
-            {"name": "Heal/Corrupt", "power": 0, "accuracy": 100, "desc": "Heals self, hurts foe."},
-            {"name": "Paradox Bite", "power": 23, "accuracy": 95, "desc": "Wild effect each use."},
-            {"name": "Dual Spore", "power": 20, "accuracy": 100, "desc": "May poison or heal enemy."},
-            {"name": "Time Loop", "power": 24, "accuracy": 85, "desc": "Can attack twice."}
-        ]
-    },
-    {
-        "num": 148, "name": "Etherwatt", "type": "Énergie", "rarity": "Legendary", "evolution": None,
-        "description": "Pure energy, impossible to trap.",
-        "stats": {"hp": 56, "atk": 23, "def": 18, "spd": 22},
-        "moves": [
-            {"name": "Ether Shock", "power": 25, "accuracy": 90, "desc": "Massive power, rare miss."},
-            {"name": "Light Shield", "power": 0, "accuracy": 100, "desc": "Immune one turn."},
-            {"name": "Energy Burst", "power": 22, "accuracy": 100, "desc": "Speed-based."},
-            {"name": "Endless Current", "power": 26, "accuracy": 75, "desc": "Ultimate, huge risk."}
-        ]
-    },
-    {
-        "num": 149, "name": "Binalis", "type": "Numérique", "rarity": "Legendary", "evolution": None,
-        "description": "Exists only in code, but affects the real world.",
-        "stats": {"hp": 58, "atk": 19, "def": 21, "spd": 21},
-        "moves": [
-            {"name": "Code Crash", "power": 23, "accuracy": 95, "desc": "May stun foe."},
-            {"name": "Digital Guard", "power": 0, "accuracy": 100, "desc": "Raises all stats."},
-            {"name": "Reality Warp", "power": 21, "accuracy": 100, "desc": "Hits all enemies."},
-            {"name": "Binary Storm", "power": 25, "accuracy": 80, "desc": "Risky, multi-hit."}
-        ]
-    },
-    {
-        "num": 150, "name": "Spectrion", "type": "Spectre", "rarity": "Legendary", "evolution": None,
-        "description": "The king of all hauntings.",
-        "stats": {"hp": 59, "atk": 21, "def": 19, "spd": 19},
-        "moves": [
-            {"name": "Haunt King", "power": 23, "accuracy": 95, "desc": "Can terrify."},
-            {"name": "Specter Guard", "power": 0, "accuracy": 100, "desc": "Negates one attack."},
-            {"name": "Nightmare Pulse", "power": 21, "accuracy": 100, "desc": "May put foe to sleep."},
-            {"name": "Eternal Gloom", "power": 27, "accuracy": 70, "desc": "Ultimate, very risky."}
-        ]
-    },
-    {
-        "num": 151, "name": "MYİKKİMONE", "type": "Climat", "rarity": "Legendary", "evolution": None,
-        "description": "Legendary spirit, protects homes forever.",
-        "stats": {"hp": 64, "atk": 20, "def": 22, "spd": 20},
-        "moves": [
-            {"name": "Sanctuary", "power": 0, "accuracy": 100, "desc": "Heals all allies, boosts defense."},
-            {"name": "MYİKKİ Wrath", "power": 26, "accuracy": 90, "desc": "Signature move, massive power."},
-            {"name": "Memory Storm", "power": 23, "accuracy": 100, "desc": "May stun and confuse."},
-            {"name": "Infinity Shield", "power": 0, "accuracy": 100, "desc": "Invincible for one turn."}
-        ]
-    }
-]
+    reindex_spawn_channels()
+    if STORAGE_BACKEND == "sqlite":
+        persistence.set_kv("config", cfg)
+        return
+    json_files.write(CONFIG_FILE, cfg)
+
+# --------- Salons de spawn ----------
+# config["spawn_channels"] = {"<channel_id>": guild_id} (guild_id None tant que
+# le bot ne l'a pas résolu). Remplace l'ancien spawn_channel_id unique.
+def migrate_spawn_config(cfg):
+    chans = cfg.setdefault("spawn_channels", {})
+    legacy = cfg.pop("spawn_channel_id", None)
+    if legacy and str(legacy) not in chans:
+        chans[str(legacy)] = None
+    return cfg
+
+def remap_legacy_state():
+    # ancien spawn global → salon de spawn historique
+    st = game_state.spawns.pop(LEGACY_SPAWN_KEY, None)
+    chans = list(config["spawn_channels"])
+    if st is not None and chans:
+        game_state.spawns[chans[0]] = st
+        save_state()
+
+def resolve_spawn_guilds():
+    # au on_ready : guildes des salons hérités + BIMNet global → guilde du salon historique
+    changed = False
+    for key, gid in list(config["spawn_channels"].items()):
+        if gid is None:
+            ch = bot.get_channel(int(key))
+            if ch is not None and getattr(ch, "guild", None):
+                config["spawn_channels"][key] = ch.guild.id
+                changed = True
+    if changed:
+        save_config(config)
+    until = game_state.bimnet.pop(LEGACY_SPAWN_KEY, None)
+    if until is not None:
+        gid = next((g for g in config["spawn_channels"].values() if g), None)
+        TIMERS.cancel("bimnet", LEGACY_SPAWN_KEY)
+        if gid is not None:
+            game_state.bimnet[str(gid)] = until
+            TIMERS.arm("bimnet", str(gid), until.timestamp())
+        save_state()
+
+def spawn_guild_id(key):
+    gid = config["spawn_channels"].get(key)
+    if gid is None:
+        ch = bot.get_channel(int(key))
+        gid = ch.guild.id if ch is not None and getattr(ch, "guild", None) else None
+    return gid
+
+# Index guilde → salons de spawn, reconstruit à chaque changement de config
+# (save_config) : pas de parcours de tous les salons à chaque commande. Les
+# salons dont la guilde n'est pas encore connue restent à part.
+spawn_channels_by_guild = {}  # {guild_id: [clé salon, ...]} dans l'ordre de config
+unresolved_spawn_channels = []
+
+def reindex_spawn_channels():
+    global spawn_channels_by_guild, unresolved_spawn_channels
+    by_guild, unresolved = {}, []
+    for key, gid in config["spawn_channels"].items():
+        if gid is None:
+            unresolved.append(key)
+        else:
+            by_guild.setdefault(gid, []).append(key)
+    spawn_channels_by_guild, unresolved_spawn_channels = by_guild, unresolved
+
+def guild_spawn_keys(guild_id):
+    keys = list(spawn_channels_by_guild.get(guild_id, ()))
+    return keys + [k for k in unresolved_spawn_channels if spawn_guild_id(k) == guild_id]
+
+def spawn_key_for(ctx):
+    # salon courant s'il spawne, sinon le premier salon de spawn de la guilde
+    key = str(ctx.channel.id)
+    if key in config["spawn_channels"]:
+        return key
+    if ctx.guild:
+        return next(iter(guild_spawn_keys(ctx.guild.id)), None)
+    return None
+
+# ------- Catalogue des 151 DOMON (domons.json) -------
+# Chargé depuis le fichier data (cache compilé domons.cache) ; fiches figées.
+# !reloaddomons applique une nouvelle version sans redémarrer le bot.
+CATALOG_FILE = os.getenv("CATALOG_FILE", "domons.json")
+CATALOG = None
+REGISTRY = None  # DomonRegistry : index num / nom normalisé / rareté / type / évolutions
+
+def apply_catalog(catalog):
+    # registre construit avant d'être publié d'un coup : les lecteurs voient l'ancien OU le nouveau
+    global CATALOG, REGISTRY
+    registry = DomonRegistry(catalog)
+    CATALOG, REGISTRY = catalog, registry
+
+apply_catalog(load_catalog(CATALOG_FILE))
+print(f"✅ CATALOG: v{CATALOG.version} — {len(CATALOG)} DOMON ({CATALOG.source}, {CATALOG.load_ms:.1f} ms)")
 
 # --- Game Constants ---
 RARITY_PROBA = {"Common": 55, "Uncommon": 24, "Rare": 14, "Legendary": 7}
@@ -1974,8 +613,24 @@ DAILY_REWARDS = {
         "SpectraSeal", "BIMNet", "PerfectDomoball"
     ]
 }
-BASE_SPAWN_CHANCE = 0.60
-BIMNET_SPAWN_CHANCE = 1.00
+# Intervalle (s) entre deux spawns d'un salon, tiré uniformément ; config["spawn_interval"]
+# = {"base": [min, max], "bimnet": [min, max]} remplace ces valeurs
+SPAWN_INTERVAL = (240, 760)         # ≈ ancien rythme : tick 5 min × 60 %
+BIMNET_SPAWN_INTERVAL = (180, 420)  # ≈ tick 5 min × 100 %
+SPAWN_TZ = pytz.timezone("Europe/Paris")  # fenêtres "hours" des tables de spawn
+
+# Tables de spawn compilées (alias) : base RARITY_PROBA + couches de config["spawn_tables"]
+SPAWN_TABLES = SpawnTables(REGISTRY, RARITY_PROBA)
+
+def pick_spawn_domon(key):
+    SPAWN_TABLES.configure(config.get("spawn_tables"))  # no-op tant que la config n'a pas changé
+    guild_id = spawn_guild_id(key)
+    return SPAWN_TABLES.sample(
+        guild_id=guild_id,
+        channel_id=key,
+        now=datetime.now(SPAWN_TZ),
+        bimnet=is_bimnet_active(guild_id),
+    )
 
 # =========================
 # --- Helper / UI bits  ---
@@ -1998,73 +653,380 @@ def domon_intro_message(domon):
         "Legendary": intro_legendary
     }.get(rare, intro_common)
 
+# --------- Cache de rendu (catalogue statique) ----------
+# Embeds domodex / info / spawn / scan construits une fois par DOMON et par
+# version de catalogue. Les embeds en cache sont partagés : ne pas les modifier
+# (embed.copy() si un appelant doit ajouter quelque chose).
+class RenderCache:
+    def __init__(self):
+        self.version = None
+        self._items = {}
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "build_ms": 0.0}
+
+    def get(self, kind, key, build):
+        if self.version != CATALOG.fingerprint:
+            self.invalidate()
+        item = self._items.get((kind, key))
+        if item is not None:
+            self.stats["hits"] += 1
+            return item
+        self.stats["misses"] += 1
+        item = self._items[(kind, key)] = build()
+        return item
+
+    def invalidate(self):
+        if self._items:
+            self.stats["invalidations"] += 1
+        self._items.clear()
+        self.version = CATALOG.fingerprint
+
+    def warm(self):
+        # tout le catalogue d'avance (au boot et après !reloaddomons)
+        t0 = time.perf_counter()
+        self.invalidate()
+        domodex_pages()
+        for d in REGISTRY:
+            info_embed(d)
+            spawn_embed(d)
+            spawn_embed(d, forced=True)
+            scan_embed(d)
+        self.stats["build_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+
+    def metrics(self):
+        return dict(self.stats, version=self.version, entries=len(self._items))
+
+RENDER_CACHE = RenderCache()
+
+def _add_domon_fields(embed, domon):
+    embed.add_field(name="Type", value=domon['type'])
+    embed.add_field(name="Rarity", value=domon['rarity'])
+    embed.add_field(name="Description", value=domon['description'], inline=False)
+    return embed
+
+def domodex_pages():
+    def build():
+        lines = [f"#{d['num']:03d} {d['name']} ({d['type']}, {d['rarity']})" for d in REGISTRY]
+        chunks, block = [], ""
+        for line in lines:
+            if len(block) + len(line) + 1 > 3800:
+                chunks.append(block); block = ""
+            block += line + "\n"
+        if block:
+            chunks.append(block)
+        return tuple(
+            discord.Embed(title=f"DOMODEX – Complete List (page {i}/{len(chunks)})", description=chunk, color=0x6e34ff)
+            for i, chunk in enumerate(chunks, 1)
+        )
+    return RENDER_CACHE.get("domodex", None, build)
+
+def info_embed(domon):
+    def build():
+        embed = discord.Embed(title=f"DOMODEX #{domon['num']:03d} — {domon['name']}", color=0x8effa2)
+        embed.add_field(name="Type", value=domon['type'])
+        embed.add_field(name="Rarity", value=domon['rarity'])
+        if domon.get("evolution"):
+            embed.add_field(name="Evolution", value=domon['evolution'])
+        embed.add_field(name="Description", value=domon['description'], inline=False)
+        return embed
+    return RENDER_CACHE.get("info", domon["num"], build)
+
+def spawn_embed(domon, forced=False):
+    def build():
+        if forced:
+            embed = discord.Embed(title="(Admin) Forced Spawn", description=domon_intro_message(domon), color=0xe67e22)
+            return _add_domon_fields(embed, domon)
+        embed = discord.Embed(title="DOMON Spawn", description=domon_intro_message(domon), color=0x9b59b6)
+        _add_domon_fields(embed, domon)
+        embed.set_footer(text="Use !scan to be the first and unlock !capture!")
+        return embed
+    return RENDER_CACHE.get("spawn_forced" if forced else "spawn", domon["num"], build)
+
+def scan_embed(domon):
+    def build():
+        embed = discord.Embed(
+            title=f"🔍 Scan success — {domon['name']}",
+            description=f"You are now the **only** one able to use **!capture** for this DOMON.\n⏰ You have **{SCAN_WINDOW_SECONDS//60} minutes**!",
+            color=0x00c3ff
+        )
+        return _add_domon_fields(embed, domon)
+    return RENDER_CACHE.get("scan", domon["num"], build)
+
 def hp_bar(hp, max_hp, width=20):
     n = max(0, int(width * max(0, hp) / max_hp))
     return "█"*n + "░"*(width-n)
 
+# ==========================================
+# --- Envois sortants (file par salon)    ---
+# ==========================================
+# Chaque salon a sa file (outbox.py) : budget de 5 messages / 5 s (seau à jetons),
+# messages critiques (spawn, scan, capture) servis en premier, et les
+# notices informatives en attente fusionnées en un seul message.
+CHANNEL_SEND_BURST = int(os.getenv("CHANNEL_SEND_BURST", "5"))
+CHANNEL_SEND_PER_SECOND = float(os.getenv("CHANNEL_SEND_PER_SECOND", "1.0"))
+outboxes = {}  # {channel_id: ChannelOutbox}
+
+def post(channel, content=None, *, embed=None, view=None, priority=PRIORITY_NORMAL, who=None):
+    # met en file ; renvoie un Future résolu avec le Message envoyé (None si échec)
+    box = outboxes.get(channel.id)
+    if box is None:
+        box = outboxes[channel.id] = ChannelOutbox(channel, CHANNEL_SEND_PER_SECOND, CHANNEL_SEND_BURST)
+    future = asyncio.get_running_loop().create_future()
+    box.push(priority, {"content": content, "embed": embed, "view": view, "who": who,
+                        "t": time.monotonic(), "future": future})
+    return future
+
+def reply(ctx, content=None, *, embed=None, view=None, priority=PRIORITY_NORMAL):
+    # réponse de commande : même file (et même budget) que le reste du salon
+    return post(ctx.channel, content, embed=embed, view=view, priority=priority, who=ctx.author.display_name)
+
+def notify(ctx, text):
+    # notice informative : fusionnable avec les autres notices en attente du salon
+    return post(ctx.channel, text, priority=PRIORITY_INFO, who=ctx.author.display_name)
+
+def outbox_metrics():
+    depths = [len(b.queue) for b in list(outboxes.values())]  # lu depuis le thread Flask
+    done = outbox_stats["queued"] - sum(depths)
+    return dict(
+        outbox_stats,
+        channels=len(depths),
+        depth=sum(depths),
+        max_depth=max(depths, default=0),
+        latency_ms_avg=round(outbox_stats["latency_ms_total"] / done, 1) if done else 0.0,
+    )
+
 # =========
 #  READY
 # =========
 bot_ready = False
 
-async def cancel_scan_timer():
-    global scan_timer_task
-    if scan_timer_task and not scan_timer_task.done():
-        try:
-            scan_timer_task.cancel()
-        except Exception:
-            pass
-    scan_timer_task = None
-
 @bot.event
 async def on_ready():
-    global bot_ready
+    global bot_ready, bot_loop
     bot_ready = True
+    bot_loop = asyncio.get_running_loop()
     print(f"✅ Bot ready as {bot.user} (ID {bot.user.id})")
-    if not spawn_task.is_running():
+    resolve_spawn_guilds()
+    schedule_all_spawns()
+    TIMERS.start()
+    if not persist_task.is_running():
         try:
-            spawn_task.start()
+            persist_task.start()
         except RuntimeError:
             pass
 
+_close_bot = bot.close
+
+async def close_bot():
+    # à l'arrêt : les transferts suivants (flush atexit) repassent par le client
+    # synchrone, puis la session aiohttp est fermée sur sa propre boucle
+    global bot_loop
+    bot_loop = None
+    try:
+        await _close_bot()
+    finally:
+        await adropbox.close()
+
+bot.close = close_bot
+
+@tasks.loop(seconds=PERSIST_INTERVAL_SECONDS)
+async def persist_task():
+    try:
+        flush_state()
+        persistence.collect()
+    except Exception as e:
+        print("⚠️ persist_task error:", e)
+
+@persist_task.after_loop
+async def persist_task_stop():
+    flush_state()
+    persistence.collect(force=True)
+
 def not_ready(ctx):
     return not bot_ready or players is None or config is None
 
-async def timeout_scan(ctx):
-    try:
-        await asyncio.sleep(SCAN_WINDOW_SECONDS)
-        if is_scan_expired():
-            await scan_expired(ctx)
-    except asyncio.CancelledError:
-        return
+# --------- Échéances (handlers du TimerService) ----------
+async def on_scan_deadline(key, _payload):
+    async with LOCKS.spawn(key):
+        st = game_state.spawns.get(key)
+        if st is None or st.scan_timer_started is None:
+            return  # capture déjà résolue
+        channel = bot.get_channel(int(key)) if key.isdigit() else None
+        await scan_expired(channel, key)
+
+async def on_bimnet_end(guild_id, _payload):
+    if game_state.bimnet.pop(guild_id, None) is not None:
+        save_state()
+        print(f"🕸️ BIMNet terminé (guilde {guild_id})")
+
+async def on_battle_turn_deadline(_battle_id, view):
+    view.expire()
+
+TIMERS.on("scan", on_scan_deadline)
+TIMERS.on("bimnet", on_bimnet_end)
+TIMERS.on("battle_turn", on_battle_turn_deadline)
+
+# ===========================================
+# --- Collections compactes {num: count}  ---
+# ===========================================
+# Les collections ne stockent plus de copie du DOMON : seulement le numéro et
+# le nombre de captures, résolus contre le registre à la lecture.
+
+def collection_entries(player):
+    # [(domon, count)] dans l'ordre de première capture
+    out = []
+    for num, count in player.get("collection", {}).items():
+        domon = REGISTRY.get(num)
+        if domon and count > 0:
+            out.append((domon, count))
+    return out
+
+# ===========================================
+# --- Évolutions (incrémentales, en cascade) ---
+# ===========================================
+# Une capture ne change que le compteur d'UNE espèce : seule sa chaîne
+# d'évolution (REGISTRY.evolves_to) peut se déclencher. File de travail
+# depuis l'espèce modifiée ; chaque évolution ajoutée y est poussée à son tour,
+# donc une chaîne complète se résout en une passe, quelle que soit la collection.
+EVOLUTION_REQUIRED = 3
+EVOLUTION_XP = 2
+
+def pending_evolutions(counts, changed_nums):
+    # [(base, évolué)] dans l'ordre ; counts n'est pas modifié (surcouche locale)
+    added = {}
+    def count(num):
+        return counts.get(str(num), 0) + added.get(num, 0)
+    steps = []
+    work = list(changed_nums)
+    for num in work:  # la liste grandit pendant le parcours (cascade)
+        evolved = REGISTRY.evolves_to.get(num)
+        if evolved and count(num) >= EVOLUTION_REQUIRED and count(evolved["num"]) == 0:
+            added[evolved["num"]] = added.get(evolved["num"], 0) + 1
+            steps.append((REGISTRY.get(num), evolved))
+            work.append(evolved["num"])
+    return steps
+
+def check_evolution(user_id, domon):
+    steps = pending_evolutions(players[user_id]["collection"], (domon["num"],))
+    for _, evolved in steps:
+        add_to_collection(user_id, evolved)
+        add_xp(user_id, EVOLUTION_XP)
+    return "\n".join(f"✨ Your {base['name']} evolved into {evolved['name']}! (+{EVOLUTION_XP} XP)" for base, evolved in steps) or None
+
+# ===============================================
+# --- Migrations (schema_version + catalogue)  ---
+# ===============================================
+# Chaque migration tourne une seule fois (schema_version stocké avec les
+# données). Celles qui dépendent du catalogue sont rejouées uniquement si
+# l'empreinte du catalogue a changé ; sinon le boot ne parcourt rien.
+SCHEMA_VERSION = 2
+migration_report = {"players": 0, "bytes_before": 0, "bytes_after": 0, "parse_before_ms": 0.0, "parse_after_ms": 0.0}
+
+def _measure(obj):
+    raw = json.dumps(obj, ensure_ascii=False, indent=2)
+    t0 = time.perf_counter()
+    json.loads(raw)
+    return len(raw.encode("utf-8")), (time.perf_counter() - t0) * 1000
+
+def migrate_collection_v1(player):
+    # Ancien format (liste de copies complètes) → {num: count}
+    coll = player.get("collection", {})
+    if isinstance(coll, dict):
+        return False
+    size_b, parse_b = _measure(player)
+    counts = {}
+    for d in coll:
+        ref = REGISTRY.find(d.get("name", "")) or REGISTRY.get(d.get("num"))
+        if ref:
+            key = str(ref["num"])
+            counts[key] = counts.get(key, 0) + 1
+    player["collection"] = counts
+    size_a, parse_a = _measure(player)
+    migration_report["players"] += 1
+    migration_report["bytes_before"] += size_b
+    migration_report["bytes_after"] += size_a
+    migration_report["parse_before_ms"] += parse_b
+    migration_report["parse_after_ms"] += parse_a
+    return True
+
+def resolve_evolutions_v2(player):
+    # évolutions en attente laissées par l'ancien moteur (une seule par capture)
+    coll = player.get("collection", {})
+    steps = pending_evolutions(coll, [int(num) for num in coll])
+    for _, evolved in steps:
+        key = str(evolved["num"])
+        coll[key] = coll.get(key, 0) + 1
+        player["xp"] = player.get("xp", 0) + EVOLUTION_XP
+    return bool(steps)
+
+# (version, description, fonction(player) -> bool modifié, dépend du catalogue)
+MIGRATIONS = [
+    (1, "collections → {num: count}", migrate_collection_v1, True),
+    (2, "évolutions en attente", resolve_evolutions_v2, True),
+]
 
-# =========================================
-# --- Patch collections with fresh stats ---
-# =========================================
-def patch_collections_with_stats(players_obj, domon_list):
-    name2domon = {normalize_str(d['name']): d for d in domon_list}
-    updated = 0
-    for player in players_obj.values():
-        collection = player.get("collection", [])
-        for d in collection:
-            ref = name2domon.get(normalize_str(d.get("name", "")))
-            if ref:
-                for field in ["num", "type", "rarity", "evolution", "description", "stats", "moves"]:
-                    d[field] = ref[field]
-                updated += 1
-    return updated
+def run_migrations(players_obj):
+    current = persistence.get_meta("schema_version", 0)
+    fingerprint = CATALOG.fingerprint
+    catalog_changed = persistence.get_meta("catalog_fingerprint") != fingerprint
+    pending = [m for m in MIGRATIONS if m[0] > current or (m[3] and catalog_changed)]
+    if not pending:
+        print(f"✅ MIGRATIONS: schéma v{current}, catalogue {fingerprint} inchangé — rien à faire.")
+        return 0
+    t0 = time.perf_counter()
+    touched = 0
+    # un joueur à la fois, toutes les migrations en attente ; seuls les modifiés sont réécrits
+    for uid, player in players_obj.items():
+        changed = False
+        for _, _, migrate, _ in pending:
+            changed = migrate(player) or changed
+        if changed:
+            save_players(players_obj, uid)
+            touched += 1
+    # aucun joueur réécrit (premier boot, jeu vide) : la méta part avec le prochain vrai save,
+    # jamais un snapshot vide uploadé par-dessus les données distantes dès le boot
+    defer = touched == 0
+    persistence.set_meta("schema_version", SCHEMA_VERSION, defer=defer)
+    persistence.set_meta("catalog_fingerprint", fingerprint, defer=defer)
+    if touched:
+        persistence.flush_sync()
+    names = ", ".join(f"v{m[0]} {m[1]}" for m in pending)
+    print(f"✅ MIGRATIONS: {names} — {touched} joueur(s) modifié(s) en {(time.perf_counter() - t0) * 1000:.0f} ms.")
+    r = migration_report
+    if r["players"]:
+        print(
+            f"   collections: {r['players']} joueur(s), {r['bytes_before'] / 1024:.1f} KB → {r['bytes_after'] / 1024:.1f} KB, "
+            f"parse {r['parse_before_ms']:.1f} ms → {r['parse_after_ms']:.1f} ms"
+        )
+    return touched
 
 print("Downloading player data from Dropbox (startup)...")
-download_players_dropbox()
-players = load_players()
-config = load_config()
-
-nb = patch_collections_with_stats(players, DOMON_LIST)
-if nb > 0:
-    save_players(players)
-    print(f"✅ PATCH collections: {nb} DOMON(s) mis à jour avec stats/moves.")
+if STORAGE_BACKEND == "sqlite":
+    # la base locale est write-through : on ne la remplace que si elle est absente
+    if not os.path.exists(DB_FILE):
+        refuse_empty_boot(download_players_dropbox(DB_FILE, DROPBOX_DB_PATH), DB_FILE, bool(DROPBOX_REFRESH_TOKEN))
+    if not os.path.exists(DB_FILE):
+        refuse_empty_boot(download_players_dropbox(), SAVE_FILE, bool(DROPBOX_REFRESH_TOKEN))
+elif PLAYER_SHARDS > 0:
+    download_shards_dropbox(SHARDS_DIR, f"/{SHARDS_DIR}")
+    if not os.path.exists(os.path.join(SHARDS_DIR, MANIFEST_NAME)):
+        refuse_empty_boot(download_players_dropbox(), SAVE_FILE, bool(DROPBOX_REFRESH_TOKEN))
 else:
-    print("✅ PATCH collections: aucun DOMON à mettre à jour ou déjà au bon format.")
+    refuse_empty_boot(download_players_dropbox(), SAVE_FILE, bool(DROPBOX_REFRESH_TOKEN))
+players = load_players()
+config = migrate_spawn_config(load_config())
+reindex_spawn_channels()
+game_state = load_state()
+remap_legacy_state()
+for _key in orphan_spawn_keys():
+    reset_state(_key)  # catalogue modifié pendant l'arrêt
+restore_timers()
+
+run_migrations(players)
+SPAWN_TABLES.configure(config.get("spawn_tables"))
+_check = SPAWN_TABLES.self_check()
+print(f"{'✅' if _check['ok'] else '⚠️'} SPAWN: table de base χ²={_check['chi2']} (seuil {_check['critical']}, {_check['samples']} tirages)")
+RENDER_CACHE.warm()
+print(f"✅ RENDER: {RENDER_CACHE.metrics()['entries']} rendus en cache ({RENDER_CACHE.stats['build_ms']} ms)")
 print("Player and config data loaded.")
 
 # ===============
@@ -2073,7 +1035,7 @@ print("Player and config data loaded.")
 def owner_only():
     async def predicate(ctx):
         if str(ctx.author.id) != str(OWNER_ID):
-            await ctx.send("❌ Only the bot owner can use this command.")
+            await reply(ctx, "❌ Only the bot owner can use this command.")
             return False
         return True
     return commands.check(predicate)
@@ -2081,7 +1043,7 @@ def owner_only():
 @bot.command(name="commands")
 async def commands_cmd(ctx):
     if not_ready(ctx):
-        await ctx.send("Bot is still initializing. Try again in a few seconds!")
+        await reply(ctx, "Bot is still initializing. Try again in a few seconds!")
         return
     embed = discord.Embed(title="MYIKKI DOMON Commands", color=0x82eefd)
     embed.description = """
@@ -2095,45 +1057,74 @@ async def commands_cmd(ctx):
 **!scan** : Scan the DOMON (required before capture!)  
 **!capture** : Attempt to catch (only first scanner can capture)  
 **!battle @user** : Start a PvP DOMON battle  
-**!setspawn** : (Owner) Set current channel for DOMON spawns  
+**!setspawn** : (Owner) Add current channel as a DOMON spawn point  
+**!unsetspawn** : (Owner) Stop DOMON spawns in this channel  
 **!forcespawn** : (Owner) Force a DOMON to appear  
+**!battles** : (Owner) List active battles  
+**!reloaddomons** : (Owner) Reload the DOMON catalog file  
+**!spawntable** : (Owner) Show spawn odds here + self-check  
     """
-    await ctx.send(embed=embed)
+    await reply(ctx, embed=embed)
 
 @bot.command(name="setspawn")
 @owner_only()
 async def set_spawn_channel(ctx):
     if not_ready(ctx):
-        await ctx.send("Bot is still initializing. Try again in a few seconds!")
+        await reply(ctx, "Bot is still initializing. Try again in a few seconds!")
+        return
+    if not ctx.guild:
+        await reply(ctx, "Spawn channels must be server channels.")
         return
-    config["spawn_channel_id"] = ctx.channel.id
+    config["spawn_channels"][str(ctx.channel.id)] = ctx.guild.id
     save_config(config)
-    await ctx.send("✅ This channel is now the official DOMON spawn point!")
+    if bot_ready:
+        schedule_spawn(str(ctx.channel.id), earliest=True)
+    await reply(ctx, "✅ This channel is now an official DOMON spawn point for this server!")
+
+@bot.command(name="unsetspawn")
+@owner_only()
+async def unset_spawn_channel(ctx):
+    if not_ready(ctx):
+        await reply(ctx, "Bot is still initializing. Try again in a few seconds!")
+        return
+    key = str(ctx.channel.id)
+    if key not in config["spawn_channels"]:
+        await reply(ctx, "This channel is not a spawn point.")
+        return
+    del config["spawn_channels"][key]
+    save_config(config)
+    async with LOCKS.spawn(key):
+        TIMERS.cancel("scan", key)
+        TIMERS.cancel("spawn", key)
+        game_state.spawns.pop(key, None)
+        save_state()
+    await reply(ctx, "✅ DOMON will no longer spawn in this channel.")
 
 @bot.command(name="addballs")
 @owner_only()
+@player_locked
 async def addballs(ctx, amount: int):
     if not_ready(ctx):
-        await ctx.send("Bot is still initializing. Try again in a few seconds!")
+        await reply(ctx, "Bot is still initializing. Try again in a few seconds!")
         return
     user_id = str(ctx.author.id)
     if user_id not in players:
-        await ctx.send("Start the game first with !start")
+        await reply(ctx, "Start the game first with !start")
         return
-    players[user_id]["inventory"]["Domoball"] = players[user_id]["inventory"].get("Domoball", 0) + amount
-    save_players(players)
-    await ctx.send(f"✅ You received {amount} Domoballs.")
+    add_item(user_id, "Domoball", amount)
+    await reply(ctx, f"✅ You received {amount} Domoballs.")
 
 @bot.command(name="start")
+@player_locked
 async def start_game(ctx):
     if not_ready(ctx):
-        await ctx.send("Bot is still initializing. Try again in a few seconds!")
+        await reply(ctx, "Bot is still initializing. Try again in a few seconds!")
         return
     user_id = str(ctx.author.id)
     if user_id not in players:
-        players[user_id] = {
+        create_player(user_id, {
             "inventory": STARTER_PACK.copy(),
-            "collection": [],
+            "collection": {},
             "xp": 0,
             "captures": {},
             "daily": None,
@@ -2142,50 +1133,49 @@ async def start_game(ctx):
                 "double_xp_next_capture": False,
                 "spectraseal_reroll": False
             }
-        }
-        save_players(players)
-        await ctx.send(f"{ctx.author.mention} Welcome to **MYIKKI DOMON HUNT**!\nYou receive: 5 Domoballs and 1 Scan Tool! Type !inventory to see your items.")
+        })
+        await reply(ctx, f"{ctx.author.mention} Welcome to **MYIKKI DOMON HUNT**!\nYou receive: 5 Domoballs and 1 Scan Tool! Type !inventory to see your items.")
     else:
-        await ctx.send("You already have an account! Use !inventory.")
+        await reply(ctx, "You already have an account! Use !inventory.")
 
 @bot.command(name="daily")
 @commands.cooldown(1, 5, commands.BucketType.user)
+@player_locked
 async def daily(ctx):
     if not_ready(ctx):
-        await ctx.send("Bot is still initializing. Try again in a few seconds!")
+        await reply(ctx, "Bot is still initializing. Try again in a few seconds!")
         return
     tz = pytz.timezone("Europe/Paris")
     now = datetime.now(tz).date()
     user_id = str(ctx.author.id)
     player = players.get(user_id)
     if not player:
-        await ctx.send("Type !start to begin your hunt!")
+        await reply(ctx, "Type !start to begin your hunt!")
         return
     if player["daily"] == str(now):
-        await ctx.send(f"🕒 {ctx.author.mention} you already claimed your daily reward today!\n(6 Domoballs + 1 bonus item every 24h)")
+        await reply(ctx, f"🕒 {ctx.author.mention} you already claimed your daily reward today!\n(6 Domoballs + 1 bonus item every 24h)")
         return
-    player["daily"] = str(now)
-    player["inventory"]["Domoball"] = player["inventory"].get("Domoball", 0) + DAILY_REWARDS["Domoball"]
+    set_player_field(user_id, "daily", str(now))
+    add_item(user_id, "Domoball", DAILY_REWARDS["Domoball"])
     if random.randint(1, 100) == 1:
         bonus = "PerfectDomoball"
     else:
         bonus = random.choice([i for i in DAILY_REWARDS["bonus_items"] if i != "PerfectDomoball"])
-    player["inventory"][bonus] = player["inventory"].get(bonus, 0) + 1
-    save_players(players)
+    add_item(user_id, bonus)
     if bonus == "PerfectDomoball":
-        await ctx.send(f"{ctx.author.mention} received 6 Domoballs and... 🟣 **A PERFECTDOMOBALL!** Ultra-rare! (1% drop rate!)")
+        await reply(ctx, f"{ctx.author.mention} received 6 Domoballs and... 🟣 **A PERFECTDOMOBALL!** Ultra-rare! (1% drop rate!)")
     else:
-        await ctx.send(f"{ctx.author.mention} received 6 Domoballs and 1 bonus item: **{bonus}**! See you tomorrow!")
+        await reply(ctx, f"{ctx.author.mention} received 6 Domoballs and 1 bonus item: **{bonus}**! See you tomorrow!")
 
 @bot.command(name="inventory")
 async def inventory(ctx):
     if not_ready(ctx):
-        await ctx.send("Bot is still initializing. Try again in a few seconds!")
+        await reply(ctx, "Bot is still initializing. Try again in a few seconds!")
         return
     user_id = str(ctx.author.id)
     player = players.get(user_id)
     if not player:
-        await ctx.send("Type !start to begin your hunt!")
+        await reply(ctx, "Type !start to begin your hunt!")
         return
     embed = discord.Embed(title=f"{ctx.author.display_name}'s Inventory", color=0xFFD700)
     for k, v in player["inventory"].items():
@@ -2193,80 +1183,60 @@ async def inventory(ctx):
     flags = player.get("flags", {})
     if any(flags.values()):
         embed.add_field(name="Active Effects", value=", ".join([k for k, v in flags.items() if v]), inline=False)
-    await ctx.send(embed=embed)
+    await reply(ctx, embed=embed)
 
 @bot.command(name="collection")
 async def collection(ctx):
     if not_ready(ctx):
-        await ctx.send("Bot is still initializing. Try again in a few seconds!")
+        await reply(ctx, "Bot is still initializing. Try again in a few seconds!")
         return
     user_id = str(ctx.author.id)
     player = players.get(user_id)
     if not player:
-        await ctx.send("Type !start to begin your hunt!")
+        await reply(ctx, "Type !start to begin your hunt!")
         return
     if not player["collection"]:
-        await ctx.send("You haven't captured any DOMON yet!")
+        await reply(ctx, "You haven't captured any DOMON yet!")
         return
     embed = discord.Embed(title=f"{ctx.author.display_name}'s Domon Collection", color=0x7DF9FF)
     txt = ""
-    for d in player["collection"]:
-        txt += f"#{d['num']:03d} {d['name']} ({d['rarity']})\n"
+    for d, count in collection_entries(player):
+        txt += f"#{d['num']:03d} {d['name']} ({d['rarity']})" + (f" x{count}" if count > 1 else "") + "\n"
     embed.description = txt[:4000]
-    await ctx.send(embed=embed)
+    await reply(ctx, embed=embed)
 
 @bot.command(name="domodex")
 async def domodex(ctx):
     if not_ready(ctx):
-        await ctx.send("Bot is still initializing. Try again in a few seconds!")
+        await reply(ctx, "Bot is still initializing. Try again in a few seconds!")
         return
-    lines = [f"#{d['num']:03d} {d['name']} ({d['type']}, {d['rarity']})" for d in DOMON_LIST]
-    chunks, block = [], ""
-    for line in lines:
-        if len(block) + len(line) + 1 > 3800:
-            chunks.append(block); block = ""
-        block += line + "\n"
-    if block:
-        chunks.append(block)
-    for i, chunk in enumerate(chunks, 1):
-        embed = discord.Embed(title=f"DOMODEX – Complete List (page {i}/{len(chunks)})", color=0x6e34ff)
-        embed.description = chunk
-        await ctx.send(embed=embed)
+    for embed in domodex_pages():
+        await reply(ctx, embed=embed)
 
 @bot.command(name="info")
 async def domon_info(ctx, *, name_or_num: str):
     if not_ready(ctx):
-        await ctx.send("Bot is still initializing. Try again in a few seconds!")
+        await reply(ctx, "Bot is still initializing. Try again in a few seconds!")
         return
-    domon = None
-    if name_or_num.isdigit():
-        domon = next((d for d in DOMON_LIST if str(d["num"]) == name_or_num), None)
-    if not domon:
-        key = normalize_str(name_or_num)
-        domon = next((d for d in DOMON_LIST if normalize_str(d["name"]) == key), None)
+    domon = REGISTRY.lookup(name_or_num)
     if not domon:
-        await ctx.send("Unknown DOMON.")
+        await reply(ctx, "Unknown DOMON.")
         return
-    embed = discord.Embed(title=f"DOMODEX #{domon['num']:03d} — {domon['name']}", color=0x8effa2)
-    embed.add_field(name="Type", value=domon['type'])
-    embed.add_field(name="Rarity", value=domon['rarity'])
-    if domon.get("evolution"):
-        embed.add_field(name="Evolution", value=domon['evolution'])
-    embed.add_field(name="Description", value=domon['description'], inline=False)
-    await ctx.send(embed=embed)
+    await reply(ctx, embed=info_embed(domon))
 
 # ==========================
 # --- ITEMS: real effects ---
 # ==========================
 @bot.command(name="use")
+@player_locked
 async def use_item(ctx, *, item_name: str):
     if not_ready(ctx):
-        await ctx.send("Bot is still initializing. Try again in a few seconds!")
+        await reply(ctx, "Bot is still initializing. Try again in a few seconds!")
         return
     user_id = str(ctx.author.id)
     player = players.get(user_id)
     if not player:
-        await ctx.send("Type !start to begin your hunt!")
+        await reply(ctx, "Type !start to begin your hunt!")
         return
     inv = player["inventory"]
     normalized = item_name.strip().replace(" ", "").lower()
@@ -2288,7 +1258,7 @@ async def use_item(ctx, *, item_name: str):
             key = k
             break
     if key is None or inv.get(key, 0) <= 0:
-        await ctx.send(f"You don't have any **{canonical}**.")
+        await reply(ctx, f"You don't have any **{canonical}**.")
         return
 
     msg = None
@@ -2299,27 +1269,28 @@ async def use_item(ctx, *, item_name: str):
         consume = False
 
     elif normalize_str(key) == normalize_str("Small Repair Kit"):
-        player["xp"] += 1
+        add_xp(user_id, 1)
         msg = f"🔧 {ctx.author.mention} used a **Small Repair Kit** and gained **+1 XP**!"
 
     elif normalize_str(key) == normalize_str("CryptoStamp"):
         bonus = random.choice([i for i in DAILY_REWARDS["bonus_items"] if i != "PerfectDomoball"])
-        player["inventory"][bonus] = player["inventory"].get(bonus, 0) + 1
+        add_item(user_id, bonus)
         msg = f"📦 {ctx.author.mention} used a **CryptoStamp** and received 1 bonus item: **{bonus}**!"
 
     elif normalize_str(key) == normalize_str("Architectrap"):
-        player.setdefault("flags", {})
-        player["flags"]["double_xp_next_capture"] = True
+        set_flag(user_id, "double_xp_next_capture", True)
         msg = f"🪤 {ctx.author.mention} armed an **Architectrap**! **Your next successful capture will grant +2 XP**."
 
     elif normalize_str(key) == normalize_str("SpectraSeal"):
-        player.setdefault("flags", {})
-        player["flags"]["spectraseal_reroll"] = True
+        set_flag(user_id, "spectraseal_reroll", True)
         msg = f"🔒 {ctx.author.mention} applied a **SpectraSeal**! **Your next capture gets a free reroll if it fails.**"
 
     elif normalize_str(key) == normalize_str("BIMNet"):
-        activate_bimnet(minutes=30)
-        msg = f"🕸️ {ctx.author.mention} deployed **BIMNet**! **DOMON spawn chance boosted for 30 minutes.**"
+        if not ctx.guild:
+            await reply(ctx, "Deploy **BIMNet** from a server channel: the boost applies to that server's spawns.")
+            return
+        activate_bimnet(ctx.guild.id, minutes=30)
+        msg = f"🕸️ {ctx.author.mention} deployed **BIMNet**! **DOMON spawn chance boosted for 30 minutes in this server.**"
 
     elif normalize_str(key) == normalize_str("PerfectDomoball"):
         msg = "Use the **PerfectDomoball** during capture with **!capture** to guarantee success."
@@ -2330,173 +1301,183 @@ async def use_item(ctx, *, item_name: str):
         consume = False
 
     if consume:
-        inv[key] -= 1
-        if inv[key] <= 0:
-            del inv[key]
+        add_item(user_id, key, -1)
 
-    save_players(players)
-    await ctx.send(msg)
+    await reply(ctx, msg)
 
 # ==========================
-# --- Spawns (loop)      ---
+# --- Spawns (planifiés) ---
 # ==========================
-@tasks.loop(minutes=5)
-async def spawn_task():
-    try:
-        async with scan_lock:
-            s = load_state()
-            if not bot_ready or s["active_spawn"] or not config.get("spawn_channel_id"):
-                return
-
-            chance = BIMNET_SPAWN_CHANCE if is_bimnet_active() else BASE_SPAWN_CHANCE
-            if random.random() > chance:
-                return
-
-            await cancel_scan_timer()  # safety
-
-            domon = random.choices(DOMON_LIST, weights=[RARITY_PROBA.get(d["rarity"], 10) for d in DOMON_LIST], k=1)[0]
-            set_spawned_domon(domon)
-            channel = bot.get_channel(config["spawn_channel_id"])
-            if channel:
-                intro_msg = domon_intro_message(domon)
-                embed = discord.Embed(title="DOMON Spawn", description=intro_msg, color=0x9b59b6)
-                embed.add_field(name="Type", value=domon['type'])
-                embed.add_field(name="Rarity", value=domon['rarity'])
-                embed.add_field(name="Description", value=domon['description'], inline=False)
-                embed.set_footer(text="Use !scan to be the first and unlock !capture!")
-                await channel.send(embed=embed)
-    except Exception as e:
-        print("⚠️ spawn_task error:", e)
+# Une échéance "spawn" par salon dans TIMERS (tas unique) : pas de réveil tant
+# qu'aucun spawn n'est dû. Un salon avec un DOMON en cours n'est pas replanifié ;
+# la fin du spawn (capture, échec, temps écoulé) arme le suivant.
+def spawn_delay(key):
+    intervals = config.get("spawn_interval") or {}
+    if is_bimnet_active(spawn_guild_id(key)):
+        lo, hi = intervals.get("bimnet") or BIMNET_SPAWN_INTERVAL
+    else:
+        lo, hi = intervals.get("base") or SPAWN_INTERVAL
+    return random.uniform(lo, hi)
+
+def schedule_spawn(key, earliest=False):
+    # earliest : ne garde le nouveau tirage que s'il avance l'échéance actuelle
+    if key not in config["spawn_channels"] or game_state.spawn(key).active_spawn:
+        return
+    when = time.time() + spawn_delay(key)
+    current = TIMERS.deadline("spawn", key)
+    if earliest and current is not None and current <= when:
+        return
+    TIMERS.arm("spawn", key, when, persist=False)
+
+def schedule_all_spawns():
+    for key in config["spawn_channels"]:
+        if TIMERS.deadline("spawn", key) is None:
+            schedule_spawn(key)
+
+def reschedule_guild_spawns(guild_id):
+    # BIMNet : seuls les salons de cette guilde sont replanifiés
+    for key in guild_spawn_keys(guild_id):
+        schedule_spawn(key, earliest=True)
+
+async def spawn_tick(key, _payload=None):
+    # un salon de spawn : verrou, tirage et envoi indépendants des autres
+    async with LOCKS.spawn(key):
+        if key not in config["spawn_channels"] or game_state.spawn(key).active_spawn:
+            return
+
+        TIMERS.cancel("scan", key)  # safety
+
+        channel = bot.get_channel(int(key))
+        if channel is None:
+            schedule_spawn(key)
+            return
+        domon = pick_spawn_domon(key)
+        set_spawned_domon(key, domon)
+        post(channel, embed=spawn_embed(domon), priority=PRIORITY_CRITICAL)
+
+TIMERS.on("spawn", spawn_tick)
 
 @bot.command(name="scan")
 @commands.cooldown(1, 3, commands.BucketType.user)
 async def scan(ctx):
-    global scan_timer_task
-    async with scan_lock:
-        s = load_state()
-        if not s["active_spawn"] or not s["spawned_domon"]:
-            await ctx.send("No DOMON to scan right now.")
+    key = spawn_key_for(ctx)
+    if key is None:
+        notify(ctx, "No DOMON to scan right now.")
+        return
+    async with LOCKS.spawn(key, str(ctx.author.id)):
+        s = game_state.spawn(key)
+        if not s.active_spawn or not s.spawned_domon:
+            notify(ctx, "No DOMON to scan right now.")
             return
-        if s["scan_claimed"]:
-            await ctx.send("Someone already scanned this DOMON! Only the first scanner can attempt capture.")
+        if s.scan_claimed:
+            notify(ctx, "Someone already scanned this DOMON! Only the first scanner can attempt capture.")
             return
         if str(ctx.author.id) not in players:
-            await ctx.send("Type !start to begin your hunt!")
+            post(ctx.channel, "Type !start to begin your hunt!")
             return
-        claim_scan(str(ctx.author.id))
-        domon = get_current_domon()
-        embed = discord.Embed(
-            title=f"🔍 Scan success — {domon['name']}",
-            description=f"You are now the **only** one able to use **!capture** for this DOMON.\n⏰ You have **{SCAN_WINDOW_SECONDS//60} minutes**!",
-            color=0x00c3ff
-        )
-        embed.add_field(name="Type", value=domon['type'])
-        embed.add_field(name="Rarity", value=domon['rarity'])
-        embed.add_field(name="Description", value=domon['description'], inline=False)
-        await ctx.send(content=ctx.author.mention, embed=embed)
-        if scan_timer_task is None:
-            scan_timer_task = asyncio.create_task(timeout_scan(ctx))
+        claim_scan(key, str(ctx.author.id))
+        domon = get_current_domon(key)
+        post(ctx.channel, ctx.author.mention, embed=scan_embed(domon), priority=PRIORITY_CRITICAL)
+        TIMERS.arm("scan", key, time.time() + SCAN_WINDOW_SECONDS)
 
 @bot.command(name="capture")
 @commands.cooldown(1, 3, commands.BucketType.user)
 async def capture(ctx):
-    global scan_timer_task
-    async with scan_lock:
-        s = load_state()
+    key = spawn_key_for(ctx)
+    if key is None:
+        notify(ctx, "No DOMON to capture.")
+        return
+    async with LOCKS.spawn(key, str(ctx.author.id)):
+        s = game_state.spawn(key)
         user_id = str(ctx.author.id)
         player = players.get(user_id)
-        domon = get_current_domon()
+        domon = get_current_domon(key)
 
-        if is_scan_expired():
-            await scan_expired(ctx)
+        if is_scan_expired(key):
+            await scan_expired(ctx.channel, key)
             return
 
-        if not s["active_spawn"] or not domon:
-            await ctx.send("No DOMON to capture.")
+        if not s.active_spawn or not domon:
+            notify(ctx, "No DOMON to capture.")
             return
 
         if not player:
-            await ctx.send("Type !start to begin your hunt!")
+            post(ctx.channel, "Type !start to begin your hunt!")
             return
 
-        if s["scan_claimed"] != user_id:
-            await ctx.send("Only the **first** player who scanned this DOMON can try to capture it!")
+        if s.scan_claimed != user_id:
+            notify(ctx, "Only the **first** player who scanned this DOMON can try to capture it!")
             return
 
-        if s["capture_attempted"] == user_id:
-            await ctx.send("You already tried to capture this DOMON. Wait for another scan!")
+        if s.capture_attempted == user_id:
+            notify(ctx, "You already tried to capture this DOMON. Wait for another scan!")
             return
 
-        if s["capture_attempted"] is not None:
-            await ctx.send("A capture attempt has already been made for this DOMON. Wait for the next scan!")
+        if s.capture_attempted is not None:
+            notify(ctx, "A capture attempt has already been made for this DOMON. Wait for the next scan!")
             return
 
-        mark_attempt(user_id)
+        mark_attempt(key, user_id)
 
         has_perfect = player["inventory"].get("PerfectDomoball", 0) > 0
         has_regular = player["inventory"].get("Domoball", 0) > 0
         if not has_perfect and not has_regular:
-            await ctx.send(
+            post(
+                ctx.channel,
                 f"{ctx.author.mention} you have no Domoballs or PerfectDomoball left! "
-                "You lose the right to capture this DOMON. Someone else can now !scan and try!"
+                "You lose the right to capture this DOMON. Someone else can now !scan and try!",
+                priority=PRIORITY_CRITICAL,
             )
-            await fail_capture(ctx)
+            await fail_capture(ctx, key)
             return
 
         if has_perfect:
-            player["inventory"]["PerfectDomoball"] -= 1
-            if player["inventory"]["PerfectDomoball"] == 0:
-                del player["inventory"]["PerfectDomoball"]
-            player["collection"].append(domon)
+            add_item(user_id, "PerfectDomoball", -1)
+            add_to_collection(user_id, domon)
 
             gained_xp = 2 if player.get("flags", {}).get("double_xp_next_capture") else 1
             if player.get("flags", {}).get("double_xp_next_capture"):
-                player["flags"]["double_xp_next_capture"] = False
-            player["xp"] += gained_xp
+                set_flag(user_id, "double_xp_next_capture", False)
+            add_xp(user_id, gained_xp)
 
-            save_players(players)
             msg = (
                 f"✨ **CRITICAL SUCCESS!** {ctx.author.mention} used a **PerfectDomoball** and captured **{domon['name']}**!\n"
                 f"+{gained_xp} XP."
             )
-            evo_msg = check_evolution(user_id)
+            evo_msg = check_evolution(user_id, domon)
             if evo_msg:
                 msg += f"\n{evo_msg}"
-            await ctx.send(msg)
-            await success_capture(ctx)
+            post(ctx.channel, msg, priority=PRIORITY_CRITICAL)
+            await success_capture(ctx, key)
             return
 
         rates = {"Common": 0.90, "Uncommon": 0.65, "Rare": 0.30, "Legendary": 0.10}
         base_success = rates.get(domon["rarity"], 0.5)
 
-        player["inventory"]["Domoball"] -= 1
-        if player["inventory"]["Domoball"] == 0:
-            del player["inventory"]["Domoball"]
+        add_item(user_id, "Domoball", -1)
 
         success = random.random() < base_success
 
         if not success and player.get("flags", {}).get("spectraseal_reroll"):
             success = random.random() < base_success
-            player["flags"]["spectraseal_reroll"] = False
+            set_flag(user_id, "spectraseal_reroll", False)
 
         if success:
-            player["collection"].append(domon)
+            add_to_collection(user_id, domon)
             gained_xp = 2 if player.get("flags", {}).get("double_xp_next_capture") else 1
             if player.get("flags", {}).get("double_xp_next_capture"):
-                player["flags"]["double_xp_next_capture"] = False
-            player["xp"] += gained_xp
-            save_players(players)
+                set_flag(user_id, "double_xp_next_capture", False)
+            add_xp(user_id, gained_xp)
             msg = f"🎉 {ctx.author.mention} captured **{domon['name']}**! Added to your collection. +{gained_xp} XP."
-            evo_msg = check_evolution(user_id)
+            evo_msg = check_evolution(user_id, domon)
             if evo_msg:
                 msg += f"\n{evo_msg}"
             if player["xp"] % 10 == 0:
                 item = random.choice([i for i in DAILY_REWARDS["bonus_items"] if i != "PerfectDomoball"])
-                player["inventory"][item] = player["inventory"].get(item, 0) + 1
-                save_players(players)
+                add_item(user_id, item)
                 msg += f"\nMilestone: {player['xp']} XP → Bonus item: **{item}**!"
-            await ctx.send(msg)
-            await success_capture(ctx)
+            post(ctx.channel, msg, priority=PRIORITY_CRITICAL)
+            await success_capture(ctx, key)
             return
         else:
             fail_msgs = [
@@ -2505,59 +1486,113 @@ async def capture(ctx):
                 "So close... but it’s gone!",
                 "❌ The DOMON got away!"
             ]
-            await ctx.send(random.choice(fail_msgs))
-            await fail_capture(ctx)
+            post(ctx.channel, random.choice(fail_msgs), priority=PRIORITY_CRITICAL)
+            await fail_capture(ctx, key)
             return
 
 @bot.command(name="forcespawn")
 @owner_only()
 async def forcespawn(ctx):
-    async with scan_lock:
-        await cancel_scan_timer()
-        clear_spawn()
-        domon = random.choice(DOMON_LIST)
-        set_spawned_domon(domon)
-        intro_msg = domon_intro_message(domon)
-        channel = bot.get_channel(config.get("spawn_channel_id")) or ctx.channel
-        embed = discord.Embed(title="(Admin) Forced Spawn", description=intro_msg, color=0xe67e22)
-        embed.add_field(name="Type", value=domon['type'])
-        embed.add_field(name="Rarity", value=domon['rarity'])
-        embed.add_field(name="Description", value=domon['description'], inline=False)
-        await channel.send(embed=embed)
+    key = spawn_key_for(ctx)
+    channel = bot.get_channel(int(key)) if key else None
+    if channel is None:
+        await reply(ctx, "No spawn channel in this server. Use !setspawn first.")
+        return
+    async with LOCKS.spawn(key):
+        TIMERS.cancel("scan", key)
+        TIMERS.cancel("spawn", key)
+        clear_spawn(key)
+        domon = pick_spawn_domon(key)
+        set_spawned_domon(key, domon)
+        post(channel, embed=spawn_embed(domon, forced=True), priority=PRIORITY_CRITICAL)
+
+@bot.command(name="spawntable")
+@owner_only()
+async def spawn_table_cmd(ctx, samples: int = 20000):
+    SPAWN_TABLES.configure(config.get("spawn_tables"))
+    guild_id = ctx.guild.id if ctx.guild else None
+    layers = SPAWN_TABLES.active_layers(guild_id, ctx.channel.id, datetime.now(SPAWN_TZ), is_bimnet_active(guild_id))
+    table = SPAWN_TABLES.sampler(layers)  # compilation / cache sur la boucle, tirages dans un thread
+    check = await asyncio.to_thread(check_sampler, table, max(1000, min(samples, 200000)))
+    embed = discord.Embed(title="Spawn table (this channel)", color=0x9b59b6)
+    embed.description = "\n".join(
+        f"**{r}**: {check['expected'][r] * 100:.1f}% expected / {check['observed'][r] * 100:.1f}% drawn"
+        for r in check["expected"]
+    )
+    names = ", ".join(":".join(str(x) for x in part) for part in layers) or "base"
+    embed.add_field(name="Layers", value=names, inline=False)
+    embed.add_field(name="Self-check", value=f"{'OK' if check['ok'] else 'FAILED'} — χ²={check['chi2']} (limit {check['critical']}, {check['samples']} draws)", inline=False)
+    await reply(ctx, embed=embed)
 
-def check_evolution(user_id):
-    player = players[user_id]
-    collection = player["collection"]
-    evolved_names = {d["name"] for d in collection}
-    counts = {}
-    for domon in collection:
-        counts[domon["name"]] = counts.get(domon["name"], 0) + 1
-    for domon in DOMON_LIST:
-        if domon.get("evolution") and domon["evolution"] not in evolved_names:
-            base_name = domon["name"]
-            evo_name = domon["evolution"]
-            required = 3
-            if counts.get(base_name, 0) >= required:
-                evolved_domon = next((d for d in DOMON_LIST if d["name"] == evo_name), None)
-                if evolved_domon:
-                    collection.append(evolved_domon)
-                    player["xp"] += 2
-                    save_players(players)
-                    return f"✨ Your {base_name} evolved into {evo_name}! (+2 XP)"
-    return None
+@bot.command(name="reloaddomons")
+@owner_only()
+async def reload_domons(ctx):
+    try:
+        catalog = await asyncio.to_thread(load_catalog, CATALOG_FILE)
+    except (OSError, ValueError, KeyError) as e:
+        await reply(ctx, f"❌ Catalog reload failed: {e}")
+        return
+    if catalog.fingerprint == CATALOG.fingerprint:
+        await reply(ctx, f"Catalog v{catalog.version} unchanged ({len(catalog)} DOMON).")
+        return
+    old_version = CATALOG.version
+    apply_catalog(catalog)
+    SPAWN_TABLES.set_registry(REGISTRY)
+    RENDER_CACHE.warm()
+    for key in orphan_spawn_keys():
+        # DOMON retiré du catalogue : le spawn en cours disparaît, le suivant est replanifié
+        async with LOCKS.spawn(key):
+            if key in orphan_spawn_keys():
+                TIMERS.cancel("scan", key)
+                reset_state(key)
+                schedule_spawn(key)
+    # les migrations dépendantes du catalogue seront rejouées au prochain boot (empreinte changée)
+    print(f"♻️ CATALOG: v{old_version} → v{catalog.version} ({len(catalog)} DOMON, {catalog.source})")
+    await reply(ctx, f"✅ Catalog reloaded: v{old_version} → v{catalog.version} ({len(catalog)} DOMON).")
 
 # =========================
 # --- BATTLE SYSTEM UI  ---
 # =========================
 from discord.ui import View, Button, Select
 
-ACTIVE_BATTLE = {}  # {guild_id: (player1_id, player2_id)}
+# Combats indexés par id : autant de combats simultanés que voulu, un joueur
+# ne peut être que dans un seul (index BUSY_PLAYERS).
+@dataclass
+class BattleInfo:
+    id: int
+    guild_id: int
+    channel_id: int
+    p1: str
+    p2: str
+    started: float = field(default_factory=time.monotonic)
+    phase: str = "selection"  # selection | fight
+    turns: int = 0
+    seed: int | None = None  # graine du moteur (rejouable avec battle_engine.replay)
+
+ACTIVE_BATTLES = {}  # {battle_id: BattleInfo}
+BUSY_PLAYERS = {}    # {user_id: battle_id}
+_battle_ids = itertools.count(1)
+
+def open_battle(ctx, p1, p2):
+    # vérif + réservation sans await entre les deux : atomique sur la boucle asyncio
+    if p1 in BUSY_PLAYERS or p2 in BUSY_PLAYERS:
+        return None
+    info = BattleInfo(next(_battle_ids), ctx.guild.id, ctx.channel.id, p1, p2)
+    ACTIVE_BATTLES[info.id] = info
+    BUSY_PLAYERS[p1] = BUSY_PLAYERS[p2] = info.id
+    return info
+
+def close_battle(info):
+    ACTIVE_BATTLES.pop(info.id, None)
+    for uid in (info.p1, info.p2):
+        if BUSY_PLAYERS.get(uid) == info.id:
+            del BUSY_PLAYERS[uid]
 
 def get_player_domons(user_id):
     player = players.get(user_id)
     if not player or not player["collection"]:
         return []
-    return player["collection"]
+    return [d for d, _ in collection_entries(player)]
 
 class DomonSelectView(View):
     def __init__(self, domons):
@@ -2572,12 +1607,24 @@ class DomonSelectView(View):
             ) for i, d in enumerate(shown)
         ]
         self.domon = None
+        self.declined = False
         self.select = Select(placeholder="Choose your DOMON", options=options, min_values=1, max_values=1)
         self.select.callback = self.selected
         self.add_item(self.select)
+        decline = Button(label="Decline", style=discord.ButtonStyle.danger)
+        decline.callback = self.decline
+        self.add_item(decline)
         self.total = len(domons)
         self.shown = len(shown)
 
+    async def decline(self, interaction):
+        self.declined = True
+        self.stop()
+        try:
+            await interaction.response.edit_message(content="Battle declined.", view=None)
+        except Exception:
+            pass
+
     async def selected(self, interaction):
         self.domon = int(self.select.values[0])
         self.stop()
@@ -2595,9 +1642,10 @@ class DomonSelectView(View):
 
 class AttackView(View):
     def __init__(self, domon, allowed_user_id: int):
-        super().__init__(timeout=BATTLE_TIMEOUT)
+        super().__init__(timeout=None)  # échéance du tour portée par TIMERS (battle_turn)
         self.allowed_user_id = allowed_user_id
         self.chosen = None
+        self.interaction = None  # réponse laissée au combat : ack + édition du message en un seul appel
         for i, move in enumerate(domon["moves"]):
             btn = Button(label=move["name"], style=discord.ButtonStyle.primary, custom_id=str(i))
             async def attack_callback(interaction, i=i):
@@ -2608,24 +1656,143 @@ class AttackView(View):
                         pass
                     return
                 self.chosen = i
-                try:
-                    await interaction.response.defer()
-                except Exception:
-                    pass
+                self.interaction = interaction
                 self.stop()
             btn.callback = attack_callback
             self.add_item(btn)
 
     async def on_timeout(self):
-        self.chosen = None
-        self.stop()
+        self.expire()
+
+    def expire(self):
+        if not self.is_finished():
+            self.chosen = None
+            self.stop()
+
+# --------- Message de combat unique (édité en place) ----------
+# Un seul message par combat : PV, dernières actions et boutons du tour.
+# Un clic est acquitté en éditant le message (interaction.response.edit_message),
+# donc 1 appel API par tour ; les éditions hors interaction (tour passé) sont
+# espacées d'au moins BATTLE_EDIT_INTERVAL secondes.
+BATTLE_EDIT_INTERVAL = float(os.getenv("BATTLE_EDIT_INTERVAL", "1.0"))
+BATTLE_LOG_LINES = 4
+# legacy_calls : ce qu'aurait coûté l'ancienne UI (annonce + 3 appels par tour)
+battle_ui_stats = {"battles": 0, "turns": 0, "api_calls": 0, "legacy_calls": 0}
+
+class BattleMessage:
+    def __init__(self, channel):
+        self.channel = channel
+        self.message = None
+        self.calls = 0
+        self._last_edit = 0.0
+
+    async def show(self, content, view=None, interaction=None):
+        if self.message is None:
+            self.message = await post(self.channel, content, view=view, priority=PRIORITY_CRITICAL)
+            if self.message is None:
+                raise RuntimeError("battle message could not be sent")
+        else:
+            done = False
+            if interaction is not None:
+                try:
+                    await interaction.response.edit_message(content=content, view=view)
+                    done = True
+                except discord.HTTPException:
+                    pass  # interaction expirée : édition classique
+            if not done:
+                wait = self._last_edit + BATTLE_EDIT_INTERVAL - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                await self.message.edit(content=content, view=view)
+        self._last_edit = time.monotonic()
+        self.calls += 1
+
+def render_battle(info, state, users, log):
+    lines = [f"🔥 **DOMON BATTLE #{info.id}:** {users[0].mention} vs {users[1].mention}"]
+    for user, f in zip(users, state.fighters):
+        shield = " 🛡️" if f.shield > 0 else ""
+        lines.append(f"**{f.domon['name']}** ({user.display_name}) `{hp_bar(f.hp, f.max_hp)}` {max(0, f.hp)}/{f.max_hp}{shield}")
+    if log:
+        lines.append("")
+        lines.extend(log[-BATTLE_LOG_LINES:])
+    lines.append("")
+    if state.finished:
+        lines.append(f"🏆 **{users[state.winner].display_name}** wins!")
+    else:
+        lines.append(f"➡️ {users[state.turn].mention}'s turn! Click your attack ({BATTLE_TIMEOUT}s, or the turn is skipped).")
+    return "\n".join(lines)
+
+def describe_turn(res, active):
+    if res.kind == "skip":
+        return f"⏳ {active.display_name} didn't choose an attack in time! Turn skipped."
+    if res.kind == "shield":
+        return f"🛡️ {active.display_name}'s **{res.move['name']}** grants a shield: DEF ↑ 2 turns!"
+    if res.kind == "hit":
+        return f"💥 {active.display_name}'s **{res.move['name']}** hits for **{res.damage}** damage!{' **(CRIT!)**' if res.crit else ''}"
+    return f"😬 {active.display_name}'s **{res.move['name']}** missed!"
+
+# --------- Sélection simultanée des DOMON ----------
+battle_setup_times = deque(maxlen=200)  # secondes entre !battle et le 1er tour (sélections réussies)
+
+def _pick_prompt(domons):
+    return "Pick your DOMON for the battle:" + (
+        f" (showing first {min(len(domons), MAX_SELECT_OPTIONS)} of {len(domons)})" if len(domons) > MAX_SELECT_OPTIONS else ""
+    )
+
+async def select_battle_domons(ctx, users, rosters):
+    # [domon1, domon2], ou None si un joueur est injoignable, hors délai ou refuse
+    views = [DomonSelectView(r) for r in rosters]
+    msgs = [None, None]
+
+    async def pick(i):
+        try:
+            msgs[i] = await users[i].send(_pick_prompt(rosters[i]), view=views[i])
+        except discord.Forbidden:
+            return "dm"
+        await views[i].wait()
+        if views[i].declined:
+            return "declined"
+        return "timeout" if views[i].domon is None else "ok"
+
+    picks = [asyncio.create_task(pick(i)) for i in range(2)]
+    results = [None, None]
+    try:
+        pending = set(picks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                results[picks.index(t)] = t.result()
+            if any(r not in (None, "ok") for r in results):
+                break
+    finally:
+        for i, t in enumerate(picks):
+            if not t.done():
+                views[i].stop()
+                t.cancel()
+                if msgs[i] is not None:
+                    try:
+                        await msgs[i].edit(content="Battle canceled.", view=None)
+                    except Exception:
+                        pass
 
-def compute_damage(move, atk_stats, def_stats, crit=False):
-    base = move["power"] + atk_stats["atk"] // 2 - def_stats["def"] // 4
-    dmg = max(1, base)
-    if crit:
-        dmg = int(dmg * 1.5)
-    return dmg
+    failed = next((i for i, r in enumerate(results) if r not in (None, "ok")), None)
+    if failed is None:
+        return [rosters[i][views[i].domon] for i in range(2)]
+    user, reason = users[failed], results[failed]
+    if reason == "dm":
+        if failed == 0:
+            await reply(ctx, "I can't DM you. Please enable DMs from server members and retry.")
+        else:
+            await reply(ctx, "I can't DM your opponent. Battle canceled.")
+    elif reason == "declined":
+        await reply(ctx, f"{user.display_name} declined the battle.")
+    else:
+        try:
+            await user.send("Timeout! Battle canceled.")
+        except Exception:
+            pass
+        await reply(ctx, f"{user.display_name} didn't pick a DOMON in time. Battle canceled.")
+    return None
 
 # --- helper pour résoudre un membre depuis mention/ID/texte ---
 async def resolve_member(ctx, raw: str | None):
@@ -2665,171 +1832,127 @@ async def resolve_member(ctx, raw: str | None):
 @commands.cooldown(1, 5, commands.BucketType.user)
 async def battle(ctx, *, opponent_raw: str = None):
     if ctx.guild is None:
-        await ctx.send("Use this command in a server channel.")
+        await reply(ctx, "Use this command in a server channel.")
         return
 
     opponent = await resolve_member(ctx, opponent_raw)
     if opponent is None:
-        await ctx.send("Usage: `!battle @membre` (mentionne quelqu'un ou tape son pseudo).")
+        await reply(ctx, "Usage: `!battle @membre` (mentionne quelqu'un ou tape son pseudo).")
         return
 
     if ctx.author.id == opponent.id:
-        await ctx.send("You cannot battle yourself!")
+        await reply(ctx, "You cannot battle yourself!")
         return
 
     p1 = str(ctx.author.id)
     p2 = str(opponent.id)
     if p1 not in players or not get_player_domons(p1):
-        await ctx.send(f"{ctx.author.mention}, you need at least 1 DOMON to battle. Use !capture to catch one!")
+        await reply(ctx, f"{ctx.author.mention}, you need at least 1 DOMON to battle. Use !capture to catch one!")
         return
     if p2 not in players or not get_player_domons(p2):
-        await ctx.send(f"{opponent.mention} has no DOMON to battle.")
+        await reply(ctx, f"{opponent.mention} has no DOMON to battle.")
         return
 
-    if ctx.guild.id in ACTIVE_BATTLE:
-        await ctx.send("A battle is already ongoing in this server. Please wait for it to finish.")
+    info = open_battle(ctx, p1, p2)
+    if info is None:
+        busy = ctx.author if p1 in BUSY_PLAYERS else opponent
+        await reply(ctx, f"{busy.mention} is already in a battle. Please wait for it to finish.")
         return
 
-    ACTIVE_BATTLE[ctx.guild.id] = (p1, p2)
-
     try:
-        # Joueur 1
-        domons1 = get_player_domons(p1)
-        select1 = DomonSelectView(domons1)
-        try:
-            await ctx.author.send(
-                "Pick your DOMON for the battle:" + (f" (showing first {min(len(domons1), 25)} of {len(domons1)})" if len(domons1) > 25 else ""),
-                view=select1
-            )
-        except discord.Forbidden:
-            await ctx.send("I can't DM you. Please enable DMs from server members and retry.")
-            return
-        await select1.wait()
-        if select1.domon is None:
-            try:
-                await ctx.author.send("Timeout! Battle canceled.")
-            except Exception:
-                pass
+        # Sélection des deux joueurs en parallèle (annulée dès qu'un côté échoue)
+        t0 = time.monotonic()
+        picked = await select_battle_domons(ctx, (ctx.author, opponent), (get_player_domons(p1), get_player_domons(p2)))
+        if picked is None:
             return
-        my_domon = domons1[select1.domon]
+        my_domon, opp_domon = picked
+        battle_setup_times.append(time.monotonic() - t0)
+
+        spawn_key = spawn_key_for(ctx)
+        channel = (bot.get_channel(int(spawn_key)) if spawn_key else None) or ctx.channel
+        await reply(ctx, f"⚔️ {ctx.author.mention} has challenged {opponent.mention} to a DOMON battle!")
+
+        info.phase = "fight"
+        state = BattleState.new(my_domon, opp_domon)
+        info.seed = state.seed
+        print(f"⚔️ BATTLE #{info.id}: {my_domon['name']} vs {opp_domon['name']} seed={state.seed}")
+        users = (ctx.author, opponent)
+        live = BattleMessage(channel)
+        log = []
+        interaction = None
+
+        while True:
+            view = None if state.finished else AttackView(state.attacker.domon, allowed_user_id=users[state.turn].id)
+            await live.show(render_battle(info, state, users, log), view=view, interaction=interaction)
+            if state.finished:
+                break
+            info.turns = state.turns + 1
+            active = users[state.turn]
+            TIMERS.arm("battle_turn", str(info.id), time.time() + BATTLE_TIMEOUT, payload=view, persist=False)
+            await view.wait()
+            TIMERS.cancel("battle_turn", str(info.id))
+            interaction = view.interaction
+            res = state.step(None if view.chosen is None else int(view.chosen))
+            log.append(describe_turn(res, active))
+
+        winner, loser = users[state.winner], users[1 - state.winner]
+        post(channel, f"🏆 **{winner.display_name}** wins the DOMON battle against {loser.display_name}!")
+        live.calls += 1
+        battle_ui_stats["battles"] += 1
+        battle_ui_stats["turns"] += state.turns
+        battle_ui_stats["api_calls"] += live.calls
+        battle_ui_stats["legacy_calls"] += 2 + 3 * state.turns
+        print(f"⚔️ BATTLE #{info.id} terminé en {state.turns} tours, {live.calls} appels API (ancienne UI: {2 + 3 * state.turns}), coups={state.moves}")
+        async with LOCKS.player(winner.id):
+            add_xp(str(winner.id), 2)
 
-        # Joueur 2
-        domons2 = get_player_domons(p2)
-        select2 = DomonSelectView(domons2)
-        try:
-            await opponent.send(
-                "Pick your DOMON for the battle:" + (f" (showing first {min(len(domons2), 25)} of {len(domons2)})" if len(domons2) > 25 else ""),
-                view=select2
-            )
-        except discord.Forbidden:
-            await ctx.send("I can't DM your opponent. Battle canceled.")
-            return
-        await select2.wait()
-        if select2.domon is None:
-            try:
-                await opponent.send("Timeout! Battle canceled.")
-            except Exception:
-                pass
-            return
-        opp_domon = domons2[select2.domon]
+    finally:
+        close_battle(info)
 
-        channel = bot.get_channel(config.get("spawn_channel_id")) or ctx.channel
-        await ctx.send(f"⚔️ {ctx.author.mention} has challenged {opponent.mention} to a DOMON battle!")
-        await channel.send(
-            f"🔥 **DOMON BATTLE:** {ctx.author.mention} (**{my_domon['name']}**) vs {opponent.mention} (**{opp_domon['name']}**)\n"
-            f"Let the battle begin! Each turn, click your attack. You have {BATTLE_TIMEOUT}s to answer, or your turn is skipped."
+@bot.command(name="battles")
+@owner_only()
+async def list_battles(ctx):
+    if not ACTIVE_BATTLES:
+        await reply(ctx, "No active battles.")
+        return
+    now = time.monotonic()
+    lines = []
+    for info in sorted(ACTIVE_BATTLES.values(), key=lambda b: b.started):
+        elapsed = int(now - info.started)
+        guild = bot.get_guild(info.guild_id)
+        lines.append(
+            f"`#{info.id}` {guild.name if guild else info.guild_id} — <@{info.p1}> vs <@{info.p2}> · "
+            f"{info.phase}, turn {info.turns} · {elapsed // 60}m{elapsed % 60:02d}s"
         )
-
-        max_hp1 = my_domon["stats"]["hp"]; hp1 = max_hp1
-        max_hp2 = opp_domon["stats"]["hp"]; hp2 = max_hp2
-        buffs = {"p1_def_up": 0, "p2_def_up": 0}
-        turn = 0
-
-        while hp1 > 0 and hp2 > 0:
-            active, defending = (ctx.author, opponent) if turn == 0 else (opponent, ctx.author)
-            a_domon = my_domon if turn == 0 else opp_domon
-            d_domon = opp_domon if turn == 0 else my_domon
-            a_stats = a_domon["stats"].copy()
-            d_stats = d_domon["stats"].copy()
-            if turn == 0 and buffs["p2_def_up"] > 0: d_stats["def"] = int(d_stats["def"] * 1.5)
-            if turn == 1 and buffs["p1_def_up"] > 0: d_stats["def"] = int(d_stats["def"] * 1.5)
-
-            atk_view = AttackView(a_domon, allowed_user_id=active.id)
-            atk_msg = await channel.send(
-                f"{active.mention}'s turn! (**{a_domon['name']}**, {hp1 if turn==0 else hp2} HP)\n"
-                f"{defending.display_name}'s {d_domon['name']} HP: `{hp_bar(hp2 if turn==0 else hp1, max_hp2 if turn==0 else max_hp1)}`",
-                view=atk_view,
-            )
-            await atk_view.wait()
-            try:
-                await atk_msg.edit(view=None)
-            except Exception:
-                pass
-
-            if atk_view.chosen is None:
-                await channel.send(f"⏳ {active.display_name} didn't choose an attack in time! Turn skipped.")
-                if buffs["p1_def_up"] > 0: buffs["p1_def_up"] -= 1
-                if buffs["p2_def_up"] > 0: buffs["p2_def_up"] -= 1
-                turn = 1 - turn
-                await asyncio.sleep(1)
-                continue
-
-            move = a_domon["moves"][int(atk_view.chosen)]
-            dodge_bonus = max(0.0, (d_stats["spd"] - a_stats["spd"]) * 0.005)
-            hit_threshold = (move["accuracy"] / 100.0) * (1.0 - dodge_bonus)
-            hit_threshold = max(0.05, min(0.98, hit_threshold))
-            hit = random.random() < hit_threshold
-
-            if move["power"] == 0:
-                if turn == 0: buffs["p1_def_up"] = 2
-                else: buffs["p2_def_up"] = 2
-                await channel.send(f"🛡️ {active.display_name}'s **{move['name']}** grants a shield: DEF ↑ 2 turns!")
-            elif hit:
-                crit = random.random() < 0.10
-                dmg = compute_damage(move, a_stats, d_stats, crit=crit)
-                if turn == 0: hp2 -= dmg
-                else: hp1 -= dmg
-                await channel.send(
-                    f"💥 {active.display_name}'s **{move['name']}** hits for **{dmg}** damage!{' **(CRIT!)**' if crit else ''}\n"
-                    f"{defending.display_name}'s {d_domon['name']} HP: `{hp_bar(hp2 if turn==0 else hp1, max_hp2 if turn==0 else max_hp1)}` "
-                    f"({max(0, hp2 if turn==0 else hp1)}/{max_hp2 if turn==0 else max_hp1})"
-                )
-            else:
-                await channel.send(f"😬 {active.display_name}'s **{move['name']}** missed!")
-
-            if buffs["p1_def_up"] > 0: buffs["p1_def_up"] -= 1
-            if buffs["p2_def_up"] > 0: buffs["p2_def_up"] -= 1
-            turn = 1 - turn
-            await asyncio.sleep(1)
-
-        winner = ctx.author if hp2 <= 0 else opponent
-        loser = opponent if winner == ctx.author else ctx.author
-        await channel.send(f"🏆 **{winner.display_name}** wins the DOMON battle against {loser.display_name}!")
-        players[str(winner.id)]["xp"] += 2
-        save_players(players)
-
-    finally:
-        try:
-            if ctx.guild and ctx.guild.id in ACTIVE_BATTLE:
-                del ACTIVE_BATTLE[ctx.guild.id]
-        except Exception:
-            pass
+    embed = discord.Embed(title=f"Active battles ({len(ACTIVE_BATTLES)})", color=0xe74c3c)
+    text = ""
+    for i, line in enumerate(lines):
+        if len(text) + len(line) + 1 > 3900:
+            text += f"… +{len(lines) - i} more"
+            break
+        text += line + "\n"
+    embed.description = text
+    await reply(ctx, embed=embed)
 
 # ==========================
 # --- Scan state helpers ---
 # ==========================
-async def success_capture(ctx):
-    await cancel_scan_timer()
-    reset_state()
-
-async def fail_capture(ctx):
-    await cancel_scan_timer()
-    reset_state()
-
-async def scan_expired(ctx):
-    await cancel_scan_timer()
-    reset_state()
-    await ctx.send("⏰ Time's up! The DOMON was not captured. Anyone can !scan again.")
+async def success_capture(ctx, key):
+    TIMERS.cancel("scan", key)
+    reset_state(key)
+    schedule_spawn(key)
+
+async def fail_capture(ctx, key):
+    TIMERS.cancel("scan", key)
+    reset_state(key)
+    schedule_spawn(key)
+
+async def scan_expired(channel, key):
+    TIMERS.cancel("scan", key)
+    reset_state(key)
+    schedule_spawn(key)
+    if channel is not None:
+        post(channel, "⏰ Time's up! The DOMON was not captured. Anyone can !scan again.", priority=PRIORITY_CRITICAL)
 
 # ==========================
 # --- Error handling      ---
@@ -2837,16 +1960,16 @@ async def scan_expired(ctx):
 @bot.event
 async def on_command_error(ctx, error):
     if isinstance(error, commands.MissingRequiredArgument):
-        await ctx.send("Usage: `!battle @membre`")
+        await reply(ctx, "Usage: `!battle @membre`")
         return
     if isinstance(error, commands.BadArgument):
-        await ctx.send("Je n'ai pas trouvé ce membre. Mentionne-le: `!battle @pseudo`")
+        await reply(ctx, "Je n'ai pas trouvé ce membre. Mentionne-le: `!battle @pseudo`")
         return
     if isinstance(error, commands.CommandOnCooldown):
-        await ctx.send(f"⏳ Slow down! Try again in {error.retry_after:.1f}s.")
+        notify(ctx, f"⏳ Slow down! Try again in {error.retry_after:.1f}s.")
         return
     try:
-        await ctx.send("⚠️ An error occurred while processing that command.")
+        await reply(ctx, "⚠️ An error occurred while processing that command.")
     except Exception:
         pass
     print("Command error:", repr(error))
@@ -0,0 +1,90 @@
+import time
+import heapq
+import asyncio
+import itertools
+
+from locks import spawn_task
+
+# ==========================================
+# --- Envois sortants (file par salon)    ---
+# ==========================================
+# Chaque salon a sa file : budget de `burst` messages puis `per_second` par
+# seconde (seau à jetons), messages critiques (spawn, scan, capture) servis en
+# premier, et les notices informatives en attente fusionnées en un seul message.
+PRIORITY_CRITICAL, PRIORITY_NORMAL, PRIORITY_INFO = 0, 1, 2
+MAX_MESSAGE_LEN = 1900
+outbox_stats = {"queued": 0, "sent": 0, "coalesced": 0, "errors": 0, "budget_waits": 0,
+                "latency_ms_total": 0.0, "latency_ms_max": 0.0}
+_outbox_seq = itertools.count()
+
+class ChannelOutbox:
+    def __init__(self, channel, per_second=1.0, burst=5):
+        self.channel = channel
+        self.per_second = per_second
+        self.burst = burst
+        self.queue = []  # tas (priorité, ordre, item)
+        self.tokens = float(burst)
+        self.refilled = time.monotonic()
+        self.worker = None
+
+    def push(self, priority, item):
+        heapq.heappush(self.queue, (priority, next(_outbox_seq), item))
+        outbox_stats["queued"] += 1
+        if self.worker is None or self.worker.done():
+            self.worker = spawn_task(self._run())  # pas les verrous de l'appelant
+
+    async def _take_token(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.per_second)
+            self.refilled = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            outbox_stats["budget_waits"] += 1
+            await asyncio.sleep((1 - self.tokens) / self.per_second)
+
+    def _take_infos(self, first):
+        # toutes les notices en attente (elles sont en fin de tas) → un message ; la
+        # limite porte sur le texte final, suffixe « — noms » compris
+        batch, content = [first], first["content"]
+        while self.queue and self.queue[0][0] == PRIORITY_INFO:
+            rendered = self._render_infos(batch + [self.queue[0][2]])
+            if len(rendered) > MAX_MESSAGE_LEN:
+                break
+            batch.append(heapq.heappop(self.queue)[2])
+            content = rendered
+        outbox_stats["coalesced"] += len(batch) - 1
+        return batch, content
+
+    @staticmethod
+    def _render_infos(batch):
+        grouped = {}
+        for item in batch:
+            grouped.setdefault(item["content"], []).append(item["who"])
+        return "\n".join(f"{text} — {', '.join(n for n in dict.fromkeys(names) if n)}" if any(names) else text
+                         for text, names in grouped.items())
+
+    async def _run(self):
+        while self.queue:
+            await self._take_token()
+            if not self.queue:
+                return
+            priority, _, item = heapq.heappop(self.queue)
+            batch, content = [item], item.get("content")
+            if priority == PRIORITY_INFO:
+                batch, content = self._take_infos(item)
+            try:
+                msg = await self.channel.send(content, embed=item.get("embed"), view=item.get("view"))
+                outbox_stats["sent"] += 1
+            except Exception as e:
+                msg = None
+                outbox_stats["errors"] += 1
+                print(f"⚠️ OUTBOX {getattr(self.channel, 'id', '?')}: envoi échoué: {e}")
+            now = time.monotonic()
+            for it in batch:
+                latency = (now - it["t"]) * 1000
+                outbox_stats["latency_ms_total"] += latency
+                outbox_stats["latency_ms_max"] = max(outbox_stats["latency_ms_max"], latency)
+                if not it["future"].done():
+                    it["future"].set_result(msg)
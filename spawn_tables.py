@@ -0,0 +1,199 @@
+import math
+import time
+import random
+from datetime import datetime, timezone
+
+# ===========================================
+# --- Tables de spawn compilées (alias)   ---
+# ===========================================
+# Poids d'un DOMON = poids de sa rareté × multiplicateurs des couches actives
+# (guilde, salon, fenêtres horaires/événements, BIMNet). Chaque combinaison de
+# couches est compilée une fois en table d'alias (tirage O(1)) et gardée en
+# cache jusqu'à ce que la config ou le catalogue change.
+#
+# Spec (config["spawn_tables"]) :
+#   {"rarity": {"Common": 55, ...},                      # remplace la base
+#    "guilds":   {"<guild_id>":   LAYER},
+#    "channels": {"<channel_id>": LAYER},
+#    "windows":  [{"name", "start"?, "end"?, "hours"?: [h0, h1], "guild"?, "channel"?, **LAYER}],
+#    "bimnet": LAYER}
+# LAYER = {"rarity": {r: mult}, "type": {t: mult}, "domons": {num: mult}}
+
+
+class AliasSampler:
+    # Méthode d'alias de Vose : O(n) à la construction, O(1) par tirage
+    __slots__ = ("items", "prob", "alias", "weights", "total")
+
+    def __init__(self, items, weights):
+        items = [it for it, w in zip(items, weights) if w > 0]
+        weights = [w for w in weights if w > 0]
+        if not items:
+            raise ValueError("table de spawn vide (tous les poids sont nuls)")
+        n = len(items)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        prob, alias = [0.0] * n, [0] * n
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s], alias[s] = scaled[s], l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in large + small:
+            prob[i] = 1.0
+        self.items, self.prob, self.alias = tuple(items), prob, alias
+        self.weights, self.total = tuple(weights), total
+
+    def sample(self, rng=random):
+        i = int(rng.random() * len(self.items))
+        return self.items[i] if rng.random() < self.prob[i] else self.items[self.alias[i]]
+
+    def probability(self, item_index):
+        return self.weights[item_index] / self.total
+
+
+def _parse_dt(raw):
+    try:
+        dt = datetime.fromisoformat(raw) if raw else None
+    except (TypeError, ValueError):
+        return None
+    if dt and dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _window_active(win, now, guild_id, channel_id):
+    if win.get("guild") is not None and str(win["guild"]) != str(guild_id):
+        return False
+    if win.get("channel") is not None and str(win["channel"]) != str(channel_id):
+        return False
+    start, end = _parse_dt(win.get("start")), _parse_dt(win.get("end"))
+    if start and now < start or end and now >= end:
+        return False
+    hours = win.get("hours")
+    if hours:
+        h0, h1 = hours
+        h = now.hour
+        # [h0, h1[ avec passage de minuit si h0 > h1
+        if not (h0 <= h < h1 if h0 <= h1 else h >= h0 or h < h1):
+            return False
+    return True
+
+
+class SpawnTables:
+    def __init__(self, registry, base_rarity, default_weight=10):
+        self.registry = registry
+        self.base_rarity = dict(base_rarity)
+        self.default_weight = default_weight
+        self.spec = {}
+        self.revision = 0
+        self._compiled = {}
+        self.stats = {"compiles": 0, "cache_hits": 0, "samples": 0, "last_compile_ms": 0.0}
+
+    # --------- Configuration ----------
+    def configure(self, spec):
+        spec = spec or {}
+        if spec == self.spec:
+            return False
+        self.spec = spec
+        self._invalidate()
+        return True
+
+    def set_registry(self, registry):
+        if registry is not self.registry:
+            self.registry = registry
+            self._invalidate()
+
+    def _invalidate(self):
+        self.revision += 1
+        self._compiled.clear()
+
+    # --------- Compilation ----------
+    def active_layers(self, guild_id=None, channel_id=None, now=None, bimnet=False):
+        # clé de cache = couches actives (fenêtres par indice dans la spec)
+        key = []
+        if str(guild_id) in self.spec.get("guilds", {}):
+            key.append(("guild", str(guild_id)))
+        if str(channel_id) in self.spec.get("channels", {}):
+            key.append(("channel", str(channel_id)))
+        if now is not None:
+            for i, win in enumerate(self.spec.get("windows", ())):
+                if _window_active(win, now, guild_id, channel_id):
+                    key.append(("window", i))
+        if bimnet and self.spec.get("bimnet"):
+            key.append(("bimnet",))
+        return tuple(key)
+
+    def _layer(self, part):
+        if part[0] == "guild":
+            return self.spec["guilds"][part[1]]
+        if part[0] == "channel":
+            return self.spec["channels"][part[1]]
+        if part[0] == "window":
+            return self.spec["windows"][part[1]]
+        return self.spec["bimnet"]
+
+    def weights(self, layers=()):
+        rarity = dict(self.base_rarity)
+        rarity.update(self.spec.get("rarity", {}))
+        out = []
+        for d in self.registry.domons:
+            w = float(rarity.get(d["rarity"], self.default_weight))
+            for part in layers:
+                layer = self._layer(part)
+                w *= layer.get("rarity", {}).get(d["rarity"], 1.0)
+                w *= layer.get("type", {}).get(d["type"], 1.0)
+                w *= layer.get("domons", {}).get(str(d["num"]), 1.0)
+            out.append(w)
+        return out
+
+    def sampler(self, layers=()):
+        table = self._compiled.get(layers)
+        if table is not None:
+            self.stats["cache_hits"] += 1
+            return table
+        t0 = time.perf_counter()
+        table = AliasSampler(self.registry.domons, self.weights(layers))
+        self._compiled[layers] = table
+        self.stats["compiles"] += 1
+        self.stats["last_compile_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        return table
+
+    def sample(self, rng=random, guild_id=None, channel_id=None, now=None, bimnet=False):
+        self.stats["samples"] += 1
+        return self.sampler(self.active_layers(guild_id, channel_id, now, bimnet)).sample(rng)
+
+    # --------- Auto-contrôle statistique ----------
+    def self_check(self, n=20000, layers=(), seed=None):
+        return check_sampler(self.sampler(layers), n, seed)
+
+    def metrics(self):
+        return dict(self.stats, revision=self.revision, tables=len(self._compiled))
+
+
+def check_sampler(table, n=20000, seed=None):
+    # χ² par rareté (effectifs attendus suffisants) entre tirages et poids configurés.
+    # Ne lit que la table compilée (immuable) : exécutable dans un thread
+    rng = random.Random(seed)
+    expected, observed = {}, {}
+    for i, d in enumerate(table.items):
+        expected[d["rarity"]] = expected.get(d["rarity"], 0.0) + table.probability(i) * n
+    for _ in range(n):
+        r = table.sample(rng)["rarity"]
+        observed[r] = observed.get(r, 0) + 1
+    chi2 = sum((observed.get(r, 0) - e) ** 2 / e for r, e in expected.items() if e > 0)
+    dof = max(1, len(expected) - 1)
+    # quantile 99.9 % du χ² (approximation de Wilson–Hilferty)
+    z = 3.090
+    critical = dof * (1 - 2 / (9 * dof) + z * math.sqrt(2 / (9 * dof))) ** 3
+    return {
+        "samples": n,
+        "chi2": round(chi2, 2),
+        "dof": dof,
+        "critical": round(critical, 2),
+        "ok": chi2 <= critical,
+        "expected": {r: round(e / n, 4) for r, e in expected.items()},
+        "observed": {r: round(observed.get(r, 0) / n, 4) for r in expected},
+    }
+
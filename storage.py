@@ -0,0 +1,1071 @@
+import os
+import gzip
+import json
+import lzma
+import time
+import zlib
+import queue
+import hashlib
+import marshal
+import sqlite3
+import sys
+from threading import Thread, Lock
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# --- Persistence joueurs (write-behind)  ---
+# ==========================================
+# Les commandes ne font que marquer un joueur "dirty". Une boucle (côté bot)
+# appelle collect() à intervalle fixe : seuls les joueurs modifiés sont
+# ré-encodés, puis un thread writer réécrit le fichier et déclenche l'upload.
+# Toutes les marques reçues pendant un intervalle donnent UNE seule écriture.
+#
+# Avec un journal, chaque mutation est aussi ajoutée (append-only) au journal,
+# et le snapshot complet n'est réécrit qu'à la compaction (délai ou taille).
+
+META_KEY = "__meta__"
+
+def encode_player(player) -> str:
+    return json.dumps(player, ensure_ascii=False, separators=(",", ":"))
+
+def assemble_players(fragments, meta=None) -> str:
+    # fragments = {user_id: json déjà encodé} → document JSON complet
+    parts = [f"{json.dumps(uid)}:{frag}" for uid, frag in fragments.items()]
+    if meta:
+        parts.insert(0, f"{json.dumps(META_KEY)}:{json.dumps(meta)}")
+    body = ",\n".join(parts)
+    return "{\n" + body + "\n}" if body else "{}"
+
+# --------- Codecs du snapshot ----------
+# Le format est reconnu à la lecture par son en-tête : magic gzip, magic xz,
+# "DMNB" pour l'encodage binaire (marshal), sinon JSON texte.
+#
+# marshal ne garantit aucune compatibilité entre versions de Python : l'en-tête
+# porte la version (majeure, mineure) de l'interpréteur qui l'a écrit et un
+# autre interpréteur refuse de le relire (SnapshotCodecError).
+MARSHAL_MAGIC = b"DMNB\x01"
+PY_VERSION = bytes(sys.version_info[:2])
+GZIP_MAGIC = b"\x1f\x8b"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+
+def _json_bytes(fragments, meta):
+    return assemble_players(fragments, meta).encode("utf-8")
+
+def _marshal_bytes(fragments, meta):
+    # clés partagées (même objet str) → marshal les écrit une fois puis par référence
+    keys = {}
+    def share_keys(d):
+        return {keys.setdefault(k, k): v for k, v in d.items()}
+    obj = {META_KEY: meta} if meta else {}
+    obj.update((uid, json.loads(frag, object_hook=share_keys)) for uid, frag in fragments.items())
+    return MARSHAL_MAGIC + PY_VERSION + marshal.dumps(obj, 4)
+
+SNAPSHOT_CODECS = {
+    "json": _json_bytes,
+    "gzip": lambda fragments, meta: gzip.compress(_json_bytes(fragments, meta), compresslevel=6),
+    "lzma": lambda fragments, meta: lzma.compress(_json_bytes(fragments, meta), preset=6),
+    "marshal": _marshal_bytes,
+}
+
+class SnapshotCodecError(ValueError):
+    # snapshot illisible par cet interpréteur (à ne surtout pas remplacer par un jeu vide)
+    pass
+
+def encode_snapshot(fragments, meta=None, codec="json") -> bytes:
+    return SNAPSHOT_CODECS[codec](fragments, meta)
+
+def detect_codec(raw: bytes) -> str:
+    if raw.startswith(MARSHAL_MAGIC):
+        return "marshal"
+    if raw.startswith(GZIP_MAGIC):
+        return "gzip"
+    if raw.startswith(XZ_MAGIC):
+        return "lzma"
+    return "json"
+
+def decode_snapshot(raw: bytes):
+    codec = detect_codec(raw)
+    if codec == "marshal":
+        written = raw[len(MARSHAL_MAGIC):len(MARSHAL_MAGIC) + 2]
+        if written != PY_VERSION:
+            raise SnapshotCodecError(
+                f"snapshot marshal écrit par Python {'.'.join(map(str, written))}, "
+                f"interpréteur {'.'.join(map(str, PY_VERSION))} : relancer avec la même version "
+                f"ou le convertir (PLAYERS_CODEC=json) sous l'ancienne"
+            )
+        return marshal.loads(raw[len(MARSHAL_MAGIC) + 2:])
+    if codec == "gzip":
+        raw = gzip.decompress(raw)
+    elif codec == "lzma":
+        raw = lzma.decompress(raw)
+    return json.loads(raw.decode("utf-8")) if raw.strip() else {}
+
+def atomic_write(path, data: bytes):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+# --------- Journal des mutations ----------
+# Une ligne JSON par mutation : {"seq", "op", "uid", ...}
+#   item    : {"item", "delta"}   (supprime la clé si le total tombe à 0)
+#   xp      : {"delta"}
+#   collect : {"num", "count"}    (collection = {num: count})
+#   flag    : {"flag", "value"}
+#   set     : {"field", "value"}
+#   player  : {"data"}            (création / remplacement complet)
+def apply_op(players_obj, op):
+    kind = op["op"]
+    uid = op["uid"]
+    if kind == "player":
+        players_obj[uid] = op["data"]
+        return
+    player = players_obj.get(uid)
+    if player is None:
+        return
+    if kind == "item":
+        inv = player.setdefault("inventory", {})
+        total = inv.get(op["item"], 0) + op["delta"]
+        if total <= 0 and op["delta"] < 0:
+            inv.pop(op["item"], None)
+        else:
+            inv[op["item"]] = total
+    elif kind == "xp":
+        player["xp"] = player.get("xp", 0) + op["delta"]
+    elif kind == "collect":
+        num = collect_num(op)
+        coll = player.setdefault("collection", {})
+        if isinstance(coll, list):
+            # collection pas encore migrée (ancien journal) : migrate_collection_v1 s'en charge
+            coll.append(op.get("domon") or {"num": num})
+        else:
+            key = str(num)
+            coll[key] = coll.get(key, 0) + op.get("count", 1)
+    elif kind == "flag":
+        player.setdefault("flags", {})[op["flag"]] = op["value"]
+    elif kind == "set":
+        player[op["field"]] = op["value"]
+
+def collect_num(op):
+    # anciens journaux : {"domon": {...copie complète...}}
+    return op["num"] if "num" in op else op["domon"]["num"]
+
+def collection_counts(coll):
+    # {num: count} ; accepte encore l'ancien format (liste de copies de DOMON)
+    if isinstance(coll, dict):
+        return coll
+    counts = {}
+    for d in coll:
+        if d.get("num") is not None:
+            key = str(d["num"])
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+def read_journal(path):
+    ops = []
+    if not os.path.exists(path):
+        return ops
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                ops.append(json.loads(line))
+            except ValueError:
+                # dernière ligne tronquée (crash pendant l'append) → on s'arrête là
+                break
+    return ops
+
+def read_snapshot(path):
+    # Retourne (players, meta) ; meta = {"seq", ...métadonnées libres}
+    data = {}
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            data = decode_snapshot(f.read())
+    meta = data.pop(META_KEY, None) or {}
+    return data, meta
+
+def load_players_file(path, journal_path=None):
+    # Snapshot + rejeu de la queue du journal. Retourne (players, dernier seq).
+    data, meta = read_snapshot(path)
+    return replay_journal(data, meta.get("seq", 0), journal_path)
+
+def replay_journal(data, seq, journal_path=None):
+    # Le journal doit reprendre juste après le seq du snapshot : un trou (snapshot
+    # restauré plus ancien que le journal) rendrait les deltas item/xp faux. La queue
+    # est alors écartée dans <journal>.discarded et le journal réécrit sans elle.
+    replayed = []
+    if journal_path:
+        ops = read_journal(journal_path)
+        for i, op in enumerate(ops):
+            if op.get("seq", 0) <= seq:
+                continue
+            if op["seq"] != seq + 1:
+                print(f"⚠️ Journal: trou après seq {seq} (suivant: {op['seq']}), "
+                      f"{len(ops) - i} mutation(s) écartée(s) dans {journal_path}.discarded")
+                discard_journal_tail(journal_path, replayed, ops[i:])
+                break
+            apply_op(data, op)
+            seq = op["seq"]
+            replayed.append(op)
+    if replayed:
+        print(f"📒 Journal: {len(replayed)} mutation(s) rejouée(s) sur le snapshot.")
+    return data, seq
+
+def discard_journal_tail(journal_path, kept, discarded):
+    def lines(ops):
+        return "".join(json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n" for op in ops).encode("utf-8")
+    with open(f"{journal_path}.discarded", "ab") as f:
+        f.write(lines(discarded))
+    # sans réécriture, les prochains appends suivraient la queue écartée et seraient perdus au boot suivant
+    atomic_write(journal_path, lines(kept))
+
+class BackgroundWriter:
+    # Thread writer commun : la file reçoit des items (kind, t_enqueue, ...),
+    # tout ce qui est déjà en file est traité en un seul passage (_process).
+    def __init__(self, name):
+        self.name = name
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = Lock()
+        self.stats = {
+            "marks": 0,
+            "journal_ops": 0,
+            "flushes": 0,
+            "compactions": 0,
+            "uploads": 0,
+            "errors": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+            "last_flush_at": None,
+            "last_error": None,
+        }
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = Thread(target=self._run_writer, name=self.name, daemon=True)
+                self._writer.start()
+
+    def _put(self, item):
+        self._ensure_writer()
+        self._queue.put(item)
+
+    def _run_writer(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            items = [item]
+            # coalescence : tout ce qui est déjà en file part dans la même écriture
+            stop = False
+            while True:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                items.append(nxt)
+            self._process(items)
+            if stop:
+                return
+
+    def _process(self, items):
+        raise NotImplementedError
+
+    def _error(self, where, e):
+        self.stats["errors"] += 1
+        self.stats["last_error"] = repr(e)
+        print(f"⚠️ {where} error:", e)
+
+    def _flushed(self, queued_at):
+        elapsed = (time.perf_counter() - queued_at) * 1000
+        self.stats["flushes"] += 1
+        self.stats["last_flush_ms"] = round(elapsed, 2)
+        self.stats["max_flush_ms"] = round(max(self.stats["max_flush_ms"], elapsed), 2)
+        self.stats["total_flush_ms"] += elapsed
+        self.stats["last_flush_at"] = time.time()
+
+    def _upload(self, local_path, name):
+        # upload(local_path, name) → True si le fichier est bien côté Dropbox
+        if not self.upload:
+            return True
+        try:
+            ok = self.upload(local_path, name) is not False
+        except Exception as e:
+            self._error("Dropbox upload", e)
+            return False
+        if ok:
+            self.stats["uploads"] += 1
+        return ok
+
+    def _stop_writer(self, restart=False):
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._queue.put(None)
+            writer.join(timeout=60)
+        self._writer = None
+        if restart:
+            self._queue = queue.Queue()
+
+    def flush_sync(self):
+        # Hors event loop (boot, arrêt) : écrit tout et attend la fin.
+        self.close(restart=True)
+
+    def metrics(self):
+        s = dict(self.stats)
+        s["backend"] = self.backend
+        s["queue_depth"] = self.queue_depth()
+        s["avg_flush_ms"] = round(s.pop("total_flush_ms") / s["flushes"], 2) if s["flushes"] else 0.0
+        return s
+
+
+class PlayerPersistence(BackgroundWriter):
+    backend = "json"
+
+    def __init__(self, path, upload=None, journal_path=None,
+                 compact_interval=60.0, compact_max_bytes=256 * 1024, codec="json"):
+        super().__init__("players-writer")
+        if codec not in SNAPSHOT_CODECS:
+            raise ValueError(f"unknown snapshot codec {codec!r} (choices: {', '.join(SNAPSHOT_CODECS)})")
+        self.codec = codec
+        self.path = path
+        self.upload = upload
+        self.journal_path = journal_path
+        self.compact_interval = compact_interval
+        self.compact_max_bytes = compact_max_bytes
+        self._players = None
+        self._dirty = set()
+        self._all_dirty = False
+        self._seq = 0
+        self._meta = {}               # métadonnées libres (schema_version, catalogue…)
+        self._meta_dirty = False
+        self._journal_bytes = 0
+        self._last_compact = time.monotonic()
+        self._fragments = {}          # appartient au thread writer
+
+    # --- côté event loop ---
+    def load(self):
+        data, meta = read_snapshot(self.path)
+        data, seq = replay_journal(data, meta.pop("seq", 0), self.journal_path)
+        self._meta = meta
+        self._seq = seq
+        if self.journal_path and os.path.exists(self.journal_path):
+            self._journal_bytes = os.path.getsize(self.journal_path)
+        self.bind(data)
+        return data
+
+    def bind(self, players_obj):
+        self._players = players_obj
+        self._fragments = {uid: encode_player(p) for uid, p in players_obj.items()}
+
+    def mark_dirty(self, players_obj, user_ids=()):
+        if players_obj is not self._players:
+            self._players = players_obj
+            self._all_dirty = True
+        if user_ids:
+            self._dirty.update(str(uid) for uid in user_ids)
+        else:
+            self._all_dirty = True
+        self.stats["marks"] += 1
+
+    def record(self, players_obj, op):
+        # Applique une mutation en mémoire et la pousse au journal : O(taille du changement).
+        op = dict(op, uid=str(op["uid"]))
+        apply_op(players_obj, op)
+        self.mark_dirty(players_obj, (op["uid"],))
+        if not self.journal_path:
+            return
+        self._seq += 1
+        op["seq"] = self._seq
+        line = json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._journal_bytes += len(line)
+        self.stats["journal_ops"] += 1
+        self._put(("ops", time.perf_counter(), line))
+
+    def get_meta(self, key, default=None):
+        return self._meta.get(key, default)
+
+    def set_meta(self, key, value, defer=False):
+        # écrit avec le prochain snapshot (flush_sync pour forcer) ;
+        # defer : ne déclenche pas d'écriture à lui seul, attend un vrai changement joueur
+        self._meta[key] = value
+        if not defer:
+            self._meta_dirty = True
+
+    def has_pending(self):
+        return self._all_dirty or bool(self._dirty) or self._meta_dirty
+
+    def compaction_due(self):
+        if self._journal_bytes >= self.compact_max_bytes:
+            return True
+        return time.monotonic() - self._last_compact >= self.compact_interval
+
+    def collect(self, force=False):
+        # Encode uniquement les joueurs modifiés (O(joueurs dirty)) et passe
+        # le lot au writer. Doit tourner sur le thread qui mute `players`.
+        if not self.has_pending() or self._players is None:
+            return 0
+        if self.journal_path and not force and not self.compaction_due():
+            return 0
+        players_obj = self._players
+        if self._all_dirty:
+            batch = {"__all__": True}
+            batch.update({uid: encode_player(p) for uid, p in players_obj.items()})
+        else:
+            batch = {uid: (encode_player(players_obj[uid]) if uid in players_obj else None) for uid in self._dirty}
+        count = len(batch)
+        self._dirty.clear()
+        self._all_dirty = False
+        self._meta_dirty = False
+        self._journal_bytes = 0
+        self._last_compact = time.monotonic()
+        self._put(("snapshot", time.perf_counter(), batch, self._seq, dict(self._meta, seq=self._seq)))
+        return count
+
+    def queue_depth(self):
+        return len(self._dirty) + self._queue.qsize()
+
+    # --- thread writer ---
+    def _process(self, items):
+        # L'ordre de la file est respecté : les mutations journalisées avant un
+        # snapshot sont incluses dedans, celles d'après restent dans le journal.
+        lines, snapshots = [], []
+        for item in items:
+            if item[0] == "ops":
+                if snapshots:
+                    self._write_snapshot(snapshots)
+                    snapshots = []
+                lines.append(item[2])
+            else:
+                if lines:
+                    self._append_journal(lines)
+                    lines = []
+                snapshots.append(item)
+        if lines:
+            self._append_journal(lines)
+        if snapshots:
+            self._write_snapshot(snapshots)
+
+    def _append_journal(self, lines):
+        try:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            self._error(f"{self.journal_path} append", e)
+
+    def _write_snapshot(self, snapshots):
+        queued_at = snapshots[0][1]
+        meta = snapshots[-1][4]
+        for _, _, batch, _, _ in snapshots:
+            if batch.pop("__all__", False):
+                self._fragments = {}
+            for uid, frag in batch.items():
+                if frag is None:
+                    self._fragments.pop(uid, None)
+                else:
+                    self._fragments[uid] = frag
+        try:
+            atomic_write(self.path, encode_snapshot(self._fragments, meta, self.codec))
+            if self.journal_path:
+                # toutes les mutations écrites jusqu'ici sont dans le snapshot (seq <= meta.seq)
+                open(self.journal_path, "w").close()
+                self.stats["compactions"] += 1
+        except Exception as e:
+            self._error(f"{self.path} write", e)
+            return
+        self._upload(self.path, os.path.basename(self.path))
+        self._flushed(queued_at)
+
+    # --- arrêt ---
+    def close(self, restart=False):
+        self.collect(force=True)
+        self._stop_writer(restart)
+
+    def metrics(self):
+        s = super().metrics()
+        s["codec"] = self.codec
+        s["journal_bytes"] = self._journal_bytes
+        return s
+
+
+# ==========================================
+# --- Petits fichiers JSON (state/config) ---
+# ==========================================
+# Encodage sur l'appelant (objets minuscules), écriture atomique sur le thread
+# writer ; seules les dernières données de chaque fichier sont écrites.
+class JsonFileWriter(BackgroundWriter):
+    backend = "json-files"
+    upload = None
+
+    def __init__(self):
+        super().__init__("json-files-writer")
+
+    def write(self, path, obj):
+        raw = json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+        self._put(("file", time.perf_counter(), path, raw))
+
+    def _process(self, items):
+        latest = {}
+        for _, _, path, raw in items:
+            latest[path] = raw
+        for path, raw in latest.items():
+            try:
+                atomic_write(path, raw)
+            except Exception as e:
+                self._error(f"{path} write", e)
+        self._flushed(items[0][1])
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def close(self, restart=False):
+        self._stop_writer(restart)
+
+# ==========================================
+# --- Snapshots shardés (N fichiers)     ---
+# ==========================================
+# Les joueurs sont répartis par crc32(user_id) % N. Seuls les shards touchés
+# depuis la dernière compaction sont réécrits/uploadés. Chaque écriture crée
+# un nouveau fichier versionné (shard-07-v12), puis le manifeste est remplacé :
+# tant que le manifeste n'est pas publié, l'ancien jeu complet reste valide,
+# localement comme sur Dropbox.
+MANIFEST_NAME = "manifest.json"
+
+def shard_of(uid, shards):
+    return zlib.crc32(str(uid).encode("utf-8")) % shards
+
+def read_manifest(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _shard_ok(raw, entry):
+    # taille + sha256 du manifeste (absents dans les très vieux manifestes : on fait confiance)
+    if "size" in entry and len(raw) != entry["size"]:
+        return False
+    return "sha256" not in entry or hashlib.sha256(raw).hexdigest() == entry["sha256"]
+
+def shard_matches(directory, entry):
+    try:
+        with open(os.path.join(directory, entry["file"]), "rb") as f:
+            return _shard_ok(f.read(), entry)
+    except OSError:
+        return False
+
+def highest_shard_version(directory):
+    # plus haute version connue localement (fichiers shard-XX-vN, manifestes local et
+    # distant téléchargé) : un nouveau jeu repart au-dessus, sans réutiliser un nom vivant
+    best = 0
+    for name in os.listdir(directory) if os.path.isdir(directory) else ():
+        head, _, version = name.rpartition("-v")
+        if head.startswith("shard-") and version.isdigit():
+            best = max(best, int(version))
+    for name in (MANIFEST_NAME, f"{MANIFEST_NAME}.download"):
+        try:
+            manifest = read_manifest(os.path.join(directory, name)) or {}
+        except (OSError, ValueError):
+            continue
+        best = max([best] + [v.get("version", 0) for v in manifest.get("versions", {}).values()])
+    return best
+
+def load_sharded_players(directory, journal_path=None, workers=8):
+    manifest = read_manifest(os.path.join(directory, MANIFEST_NAME)) or {}
+    entries = list(manifest.get("versions", {}).values())
+
+    def read_shard(entry):
+        with open(os.path.join(directory, entry["file"]), "rb") as f:
+            raw = f.read()
+        if not _shard_ok(raw, entry):
+            raise ValueError(f"{entry['file']}: taille/sha256 différents du manifeste")
+        return decode_snapshot(raw)
+
+    data = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(read_shard, entries):
+            data.update(part)
+    data, seq = replay_journal(data, manifest.get("seq", 0), journal_path)
+    return data, seq, manifest
+
+
+class ShardedPlayerPersistence(PlayerPersistence):
+    backend = "json-sharded"
+
+    def __init__(self, directory, shards=16, legacy_path=None, remove=None, **kwargs):
+        super().__init__(os.path.join(directory, MANIFEST_NAME), **kwargs)
+        self.directory = directory
+        self.shards = shards
+        self.legacy_path = legacy_path
+        self.remove = remove
+        self._versions = {}           # {"07": {"file", "version", "sha256", "size"}}
+        self._base_version = 0        # après un re-sharding, les versions repartent au-dessus
+        self._members = {}            # {index: set(uid)}
+        self._pending_upload = set()  # fichiers écrits localement, pas encore sur Dropbox
+        self._stale_local = set()
+        self._stale_remote = set()
+        self.stats["shards_written"] = 0
+
+    def _remote_name(self, filename):
+        return f"{os.path.basename(self.directory)}/{filename}"
+
+    def load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = read_manifest(self.path)
+        if manifest:
+            data, seq, manifest = load_sharded_players(self.directory, self.journal_path)
+            self._versions = manifest.get("versions", {})
+            self._meta = manifest.get("meta", {})
+            resharded = manifest.get("shards") != self.shards
+        else:
+            # premier boot en mode shardé : on part de players.json
+            data, meta = read_snapshot(self.legacy_path or "")
+            data, seq = replay_journal(data, meta.pop("seq", 0), self.journal_path)
+            self._meta = meta
+            resharded = True
+        self._seq = seq
+        if self.journal_path and os.path.exists(self.journal_path):
+            self._journal_bytes = os.path.getsize(self.journal_path)
+        self.bind(data)
+        if resharded:
+            self._stale_local = {v["file"] for v in self._versions.values()}
+            self._stale_remote = set(self._stale_local)
+            self._base_version = max([highest_shard_version(self.directory)]
+                                     + [v["version"] for v in self._versions.values()])
+            self._versions = {}
+            self.mark_dirty(data)
+        return data
+
+    def bind(self, players_obj):
+        super().bind(players_obj)
+        self._members = {}
+        for uid in self._fragments:
+            self._members.setdefault(shard_of(uid, self.shards), set()).add(uid)
+
+    # --- thread writer ---
+    def _write_snapshot(self, snapshots):
+        queued_at = snapshots[0][1]
+        meta = dict(snapshots[-1][4])
+        seq = meta.pop("seq")
+        dirty = set()
+        for _, _, batch, _, _ in snapshots:
+            if batch.pop("__all__", False):
+                self._fragments = {}
+                self._members = {}
+                dirty.update(range(self.shards))
+            for uid, frag in batch.items():
+                idx = shard_of(uid, self.shards)
+                dirty.add(idx)
+                if frag is None:
+                    self._fragments.pop(uid, None)
+                    self._members.get(idx, set()).discard(uid)
+                else:
+                    self._fragments[uid] = frag
+                    self._members.setdefault(idx, set()).add(uid)
+        try:
+            for idx in sorted(dirty):
+                self._write_shard(idx)
+            manifest = {"shards": self.shards, "codec": self.codec, "seq": seq, "meta": meta, "versions": self._versions}
+            atomic_write(self.path, json.dumps(manifest, indent=2).encode("utf-8"))
+            if self.journal_path:
+                open(self.journal_path, "w").close()
+                self.stats["compactions"] += 1
+        except Exception as e:
+            self._error(f"{self.directory} shard write", e)
+            return
+        live = {v["file"] for v in self._versions.values()}
+        for filename in self._stale_local - live:
+            try:
+                os.remove(os.path.join(self.directory, filename))
+            except OSError:
+                pass
+        self._stale_local = set()
+        self._publish()
+        self._flushed(queued_at)
+
+    def _write_shard(self, idx):
+        key = f"{idx:02d}"
+        old = self._versions.get(key)
+        version = (old["version"] if old else self._base_version) + 1
+        filename = f"shard-{key}-v{version}"
+        members = self._members.get(idx, ())
+        raw = encode_snapshot({uid: self._fragments[uid] for uid in members}, None, self.codec)
+        atomic_write(os.path.join(self.directory, filename), raw)
+        self._versions[key] = {
+            "file": filename, "version": version, "size": len(raw),
+            "sha256": hashlib.sha256(raw).hexdigest(),
+        }
+        if old:
+            self._stale_local.add(old["file"])
+            self._stale_remote.add(old["file"])
+            self._pending_upload.discard(old["file"])
+        self._pending_upload.add(filename)
+        self.stats["shards_written"] += 1
+
+    def _publish(self):
+        # shards d'abord, manifeste en dernier, puis ménage des anciennes versions
+        if not self.upload:
+            self._pending_upload.clear()
+            return
+        for filename in sorted(self._pending_upload):
+            if not self._upload(os.path.join(self.directory, filename), self._remote_name(filename)):
+                return
+            self._pending_upload.discard(filename)
+        if not self._upload(self.path, self._remote_name(MANIFEST_NAME)):
+            return
+        if self.remove:
+            live = {v["file"] for v in self._versions.values()}
+            for filename in sorted(self._stale_remote - live):
+                try:
+                    self.remove(self._remote_name(filename))
+                except Exception as e:
+                    self._error("Dropbox delete", e)
+        self._stale_remote = set()
+
+    def metrics(self):
+        s = super().metrics()
+        s["shards"] = self.shards
+        s["shards_pending_upload"] = len(self._pending_upload)
+        return s
+
+# ==========================================
+# --- Backend SQLite (players/state/config) ---
+# ==========================================
+# Un seul fichier transactionnel (WAL) remplace players.json, state.json et
+# config.json. Chaque mutation journalisée devient une mise à jour de ligne ;
+# toutes les requêtes tournent sur le thread writer, jamais sur l'event loop.
+COLLECTION_DDL = """
+CREATE TABLE IF NOT EXISTS collection (
+    uid TEXT NOT NULL,
+    num INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (uid, num)
+)"""
+
+SQLITE_SCHEMA = COLLECTION_DDL + """;
+CREATE TABLE IF NOT EXISTS players (
+    uid TEXT PRIMARY KEY,
+    xp INTEGER NOT NULL DEFAULT 0,
+    daily TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS inventory (
+    uid TEXT NOT NULL,
+    item TEXT NOT NULL,
+    qty INTEGER NOT NULL,
+    PRIMARY KEY (uid, item)
+);
+CREATE TABLE IF NOT EXISTS flags (
+    uid TEXT NOT NULL,
+    flag TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (uid, flag)
+);
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+PLAYER_COLUMNS = ("inventory", "collection", "xp", "daily", "flags")
+
+def sqlite_connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _sqlite_migrate_collection(conn)
+    conn.executescript(SQLITE_SCHEMA)
+    return conn
+
+def _sqlite_migrate_collection(conn):
+    # Ancien schéma : une ligne par capture avec la copie JSON du DOMON → (uid, num, count)
+    cols = [row[1] for row in conn.execute("PRAGMA table_info(collection)")]
+    if "data" not in cols:
+        return
+    counts = {}
+    for uid, raw in conn.execute("SELECT uid, data FROM collection ORDER BY id"):
+        num = json.loads(raw).get("num")
+        if num is not None:
+            counts[(uid, num)] = counts.get((uid, num), 0) + 1
+    conn.execute("BEGIN")
+    conn.execute("DROP TABLE collection")
+    conn.execute(COLLECTION_DDL)
+    conn.executemany(
+        "INSERT INTO collection (uid, num, count) VALUES (?, ?, ?)",
+        [(uid, num, n) for (uid, num), n in counts.items()],
+    )
+    conn.execute("COMMIT")
+    print(f"✅ SQLite: table collection migrée ({len(counts)} ligne(s) uid/num).")
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+def sqlite_write_player(conn, uid, player):
+    conn.execute("DELETE FROM inventory WHERE uid = ?", (uid,))
+    conn.execute("DELETE FROM collection WHERE uid = ?", (uid,))
+    conn.execute("DELETE FROM flags WHERE uid = ?", (uid,))
+    extra = {k: v for k, v in player.items() if k not in PLAYER_COLUMNS}
+    conn.execute(
+        "INSERT OR REPLACE INTO players (uid, xp, daily, extra) VALUES (?, ?, ?, ?)",
+        (uid, player.get("xp", 0), player.get("daily"), _dumps(extra)),
+    )
+    conn.executemany(
+        "INSERT INTO inventory (uid, item, qty) VALUES (?, ?, ?)",
+        [(uid, item, qty) for item, qty in player.get("inventory", {}).items()],
+    )
+    conn.executemany(
+        "INSERT INTO collection (uid, num, count) VALUES (?, ?, ?)",
+        [(uid, int(num), n) for num, n in collection_counts(player.get("collection", {})).items()],
+    )
+    conn.executemany(
+        "INSERT INTO flags (uid, flag, value) VALUES (?, ?, ?)",
+        [(uid, flag, _dumps(v)) for flag, v in player.get("flags", {}).items()],
+    )
+
+def sqlite_apply_op(conn, op):
+    kind = op["op"]
+    uid = op["uid"]
+    if kind == "player":
+        sqlite_write_player(conn, uid, op["data"])
+    elif kind == "item":
+        conn.execute(
+            "INSERT INTO inventory (uid, item, qty) VALUES (?, ?, ?) "
+            "ON CONFLICT(uid, item) DO UPDATE SET qty = qty + excluded.qty",
+            (uid, op["item"], op["delta"]),
+        )
+        if op["delta"] < 0:
+            conn.execute("DELETE FROM inventory WHERE uid = ? AND item = ? AND qty <= 0", (uid, op["item"]))
+    elif kind == "xp":
+        conn.execute("UPDATE players SET xp = xp + ? WHERE uid = ?", (op["delta"], uid))
+    elif kind == "collect":
+        conn.execute(
+            "INSERT INTO collection (uid, num, count) VALUES (?, ?, ?) "
+            "ON CONFLICT(uid, num) DO UPDATE SET count = count + excluded.count",
+            (uid, collect_num(op), op.get("count", 1)),
+        )
+    elif kind == "flag":
+        conn.execute(
+            "INSERT OR REPLACE INTO flags (uid, flag, value) VALUES (?, ?, ?)",
+            (uid, op["flag"], _dumps(op["value"])),
+        )
+    elif kind == "set":
+        field = op["field"]
+        if field in ("xp", "daily"):
+            conn.execute(f"UPDATE players SET {field} = ? WHERE uid = ?", (op["value"], uid))
+        else:
+            row = conn.execute("SELECT extra FROM players WHERE uid = ?", (uid,)).fetchone()
+            if row:
+                extra = json.loads(row[0])
+                extra[field] = op["value"]
+                conn.execute("UPDATE players SET extra = ? WHERE uid = ?", (_dumps(extra), uid))
+
+def sqlite_read_players(conn):
+    data = {}
+    for uid, xp, daily, extra in conn.execute("SELECT uid, xp, daily, extra FROM players"):
+        player = {"inventory": {}, "collection": {}, "xp": xp}
+        player.update(json.loads(extra))
+        player["daily"] = daily
+        player["flags"] = {}
+        data[uid] = player
+    for uid, item, qty in conn.execute("SELECT uid, item, qty FROM inventory ORDER BY rowid"):
+        if uid in data:
+            data[uid]["inventory"][item] = qty
+    for uid, num, count in conn.execute("SELECT uid, num, count FROM collection ORDER BY rowid"):
+        if uid in data:
+            data[uid]["collection"][str(num)] = count
+    for uid, flag, value in conn.execute("SELECT uid, flag, value FROM flags ORDER BY rowid"):
+        if uid in data:
+            data[uid]["flags"][flag] = json.loads(value)
+    return data
+
+def import_players_json(db_path, json_path, kv_files=None):
+    # Import one-shot : players.json (snapshot + journal éventuel) et les
+    # fichiers clé/valeur (state.json, config.json) dans une seule transaction.
+    data, _ = load_players_file(json_path, f"{os.path.splitext(json_path)[0]}.journal")
+    conn = sqlite_connect(db_path)
+    try:
+        conn.execute("BEGIN")
+        for uid, player in data.items():
+            sqlite_write_player(conn, uid, player)
+        for key, path in (kv_files or {}).items():
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    conn.execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, _dumps(json.load(f))))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    print(f"✅ SQLite import: {len(data)} joueur(s) importé(s) depuis {json_path}.")
+    return len(data)
+
+
+class SqlitePlayerStore(BackgroundWriter):
+    backend = "sqlite"
+
+    def __init__(self, path, upload=None, import_from=None, kv_files=None, backup_interval=60.0):
+        super().__init__("sqlite-writer")
+        self.path = path
+        self.upload = upload
+        self.import_from = import_from
+        self.kv_files = kv_files or {}
+        self.backup_interval = backup_interval
+        self.backup_path = f"{path}.snapshot"
+        self._players = None
+        self._dirty = set()
+        self._all_dirty = False
+        self._kv = {}
+        self._changes = 0
+        self._last_backup = time.monotonic()
+        self._conn = None             # appartient au thread writer
+
+    # --- côté event loop ---
+    def load(self):
+        fresh = not os.path.exists(self.path)
+        if fresh and self.import_from and os.path.exists(self.import_from):
+            import_players_json(self.path, self.import_from, self.kv_files)
+        conn = sqlite_connect(self.path)
+        try:
+            data = sqlite_read_players(conn)
+            self._kv = dict(conn.execute("SELECT key, value FROM kv").fetchall())
+        finally:
+            conn.close()
+        self.bind(data)
+        return data
+
+    def bind(self, players_obj):
+        self._players = players_obj
+
+    def get_kv(self, key, default=None):
+        raw = self._kv.get(key)
+        return json.loads(raw) if raw is not None else default
+
+    def set_kv(self, key, value, defer=False):
+        # defer : écrit dans la base locale sans compter comme changement (pas de backup Dropbox)
+        raw = _dumps(value)
+        if self._kv.get(key) == raw:
+            return
+        self._kv[key] = raw
+        if not defer:
+            self._changes += 1
+        self._put(("kv", time.perf_counter(), key, raw))
+
+    def get_meta(self, key, default=None):
+        return self.get_kv(f"meta.{key}", default)
+
+    def set_meta(self, key, value, defer=False):
+        self.set_kv(f"meta.{key}", value, defer)
+
+    def mark_dirty(self, players_obj, user_ids=()):
+        # Réécriture complète des lignes d'un joueur (patchs en masse au boot).
+        if players_obj is not self._players:
+            self._players = players_obj
+            self._all_dirty = True
+        if user_ids:
+            self._dirty.update(str(uid) for uid in user_ids)
+        else:
+            self._all_dirty = True
+        self.stats["marks"] += 1
+
+    def record(self, players_obj, op):
+        op = dict(op, uid=str(op["uid"]))
+        apply_op(players_obj, op)
+        self._changes += 1
+        self.stats["journal_ops"] += 1
+        # copie figée : le writer lit l'op plus tard, le dict joueur aura pu changer entre-temps
+        self._put(("op", time.perf_counter(), json.loads(encode_player(op))))
+
+    def collect(self, force=False):
+        count = 0
+        if (self._all_dirty or self._dirty) and self._players is not None:
+            uids = list(self._players) if self._all_dirty else list(self._dirty)
+            for uid in uids:
+                player = self._players.get(uid)
+                data = json.loads(encode_player(player)) if player is not None else None
+                self._put(("replace", time.perf_counter(), uid, data))
+            count = len(uids)
+            self._changes += count
+            self._dirty.clear()
+            self._all_dirty = False
+        if self._changes and (force or time.monotonic() - self._last_backup >= self.backup_interval):
+            self._changes = 0
+            self._last_backup = time.monotonic()
+            self._put(("backup", time.perf_counter()))
+        return count
+
+    def queue_depth(self):
+        return len(self._dirty) + self._queue.qsize()
+
+    # --- thread writer ---
+    def _process(self, items):
+        if self._conn is None:
+            self._conn = sqlite_connect(self.path)
+        conn = self._conn
+        backup = False
+        try:
+            conn.execute("BEGIN")
+            for item in items:
+                kind = item[0]
+                if kind == "op":
+                    sqlite_apply_op(conn, item[2])
+                elif kind == "replace":
+                    uid, data = item[2], item[3]
+                    if data is None:
+                        for table in ("players", "inventory", "collection", "flags"):
+                            conn.execute(f"DELETE FROM {table} WHERE uid = ?", (uid,))
+                    else:
+                        sqlite_write_player(conn, uid, data)
+                elif kind == "kv":
+                    conn.execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (item[2], item[3]))
+                elif kind == "backup":
+                    backup = True
+            conn.execute("COMMIT")
+        except Exception as e:
+            try:
+                conn.execute("ROLLBACK")
+            except Exception:
+                pass
+            self._error(f"{self.path} transaction", e)
+            return
+        self._flushed(items[0][1])
+        if backup:
+            self._backup()
+
+    def _backup(self):
+        # Copie cohérente (API backup SQLite) pour l'upload Dropbox.
+        try:
+            dest = sqlite3.connect(f"{self.backup_path}.tmp")
+            with dest:
+                self._conn.backup(dest)
+            dest.close()
+            os.replace(f"{self.backup_path}.tmp", self.backup_path)
+            self.stats["compactions"] += 1
+        except Exception as e:
+            self._error(f"{self.backup_path} backup", e)
+            return
+        self._upload(self.backup_path, os.path.basename(self.path))
+
+    # --- arrêt ---
+    def close(self, restart=False):
+        self.collect(force=True)
+        self._stop_writer(restart)
+        if self._conn is not None and not restart:
+            self._conn.close()
+            self._conn = None
+
+
+if __name__ == "__main__":
+    # python storage.py import players.json players.db
+    if len(sys.argv) == 4 and sys.argv[1] == "import":
+        import_players_json(sys.argv[3], sys.argv[2], {"state": "state.json", "config": "config.json"})
+    else:
+        print("usage: python storage.py import <players.json> <players.db>")
@@ -0,0 +1,247 @@
+import os
+import sys
+import asyncio
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench import FakeDropbox
+from dropbox_sync import DropboxClient, AsyncDropboxClient, refuse_empty_boot, download_shard_set
+from storage import ShardedPlayerPersistence
+
+# Clients Dropbox contre le faux serveur local de bench.py (aucun accès réseau).
+
+
+class DropboxClientTest(unittest.TestCase):
+    def setUp(self):
+        self.srv = FakeDropbox().start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = DropboxClient(
+            "key", "secret", "refresh", api_url=self.srv.url, content_url=self.srv.url,
+            state_path=os.path.join(self.tmp.name, "sync.json"),
+        )
+
+    def tearDown(self):
+        self.srv.shutdown()
+        self.srv.server_close()
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_token_is_cached_across_requests(self):
+        for i in range(5):
+            self.assertEqual(self.client.upload(f"/f{i}", b"data").status_code, 200)
+        self.assertEqual(self.srv.requests, {"/oauth2/token": 1, "/2/files/upload": 5})
+
+    def test_retry_after_401_succeeds(self):
+        self.client.upload("/a", b"1")
+        self.srv.revoked.add(self.client._token)
+        resp = self.client.upload("/b", b"2")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.srv.requests["/oauth2/token"], 2)
+        self.assertEqual(self.client.stats["retries_401"], 1)
+        self.assertEqual(self.srv.files["/b"], b"2")
+
+    def test_401_storm_refreshes_once(self):
+        self.client.upload("/warmup", b"0")
+        self.srv.revoked.add(self.client._token)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            codes = list(pool.map(lambda i: self.client.upload(f"/f{i}", b"x").status_code, range(32)))
+        self.assertEqual(codes, [200] * 32)
+        self.assertEqual(self.srv.requests["/oauth2/token"], 2)
+
+    def test_client_survives_a_new_event_loop(self):
+        # bot.run ouvre une nouvelle boucle à chaque reconnexion
+        adropbox = AsyncDropboxClient(self.client)
+        first = asyncio.run(adropbox.upload("/a", b"x"))
+        second = asyncio.run(adropbox.upload("/b", b"y"))
+        asyncio.run(adropbox.close())
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+
+    def test_unchanged_upload_is_skipped(self):
+        path = self.write("players.json", b'{"1": {}}')
+        self.assertEqual(self.client.sync_upload(path, "/players.json")[0], "uploaded")
+        self.assertEqual(self.client.sync_upload(path, "/players.json")[0], "skipped")
+        self.assertEqual(self.srv.requests["/2/files/upload"], 1)
+        self.write("players.json", b'{"1": {}, "2": {}}')
+        self.assertEqual(self.client.sync_upload(path, "/players.json")[0], "uploaded")
+        self.assertEqual(self.srv.requests["/2/files/upload"], 2)
+
+    def test_only_a_missing_path_is_not_found(self):
+        path = os.path.join(self.tmp.name, "players.json")
+        self.assertEqual(self.client.sync_download(path, "/players.json")[0], "not_found")
+        self.srv.files["/players.json"] = b"{}"
+        for code in (429, 500, 503):
+            self.srv.download_status = code
+            self.assertEqual(self.client.sync_download(path, "/players.json")[0], "failed")
+        self.assertFalse(os.path.exists(path))
+
+    def test_identical_local_file_is_not_downloaded(self):
+        self.srv.files["/players.json"] = b'{"1": {}}'
+        path = self.write("players.json", b'{"1": {}}')
+        self.assertEqual(self.client.sync_download(path, "/players.json")[0], "skipped")
+        self.assertNotIn("/2/files/download", self.srv.requests)
+        self.write("players.json", b"{}")
+        self.assertEqual(self.client.sync_download(path, "/players.json")[0], "downloaded")
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b'{"1": {}}')
+
+
+class AsyncDropboxClientTest(unittest.TestCase):
+    def setUp(self):
+        self.srv = FakeDropbox().start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = DropboxClient(
+            "key", "secret", "refresh", api_url=self.srv.url, content_url=self.srv.url,
+            state_path=os.path.join(self.tmp.name, "sync.json"),
+        )
+
+    def tearDown(self):
+        self.srv.shutdown()
+        self.srv.server_close()
+        self.tmp.cleanup()
+
+    def run_async(self, factory, max_concurrency=4):
+        adropbox = AsyncDropboxClient(self.client, max_concurrency=max_concurrency)
+
+        async def main():
+            try:
+                return await factory(adropbox)
+            finally:
+                await adropbox.close()
+
+        return asyncio.run(main())
+
+    def test_token_is_shared_and_cached(self):
+        async def uploads(a):
+            return await asyncio.gather(*(a.upload(f"/f{i}", b"x") for i in range(10)))
+
+        codes = [r.status_code for r in self.run_async(uploads)]
+        self.assertEqual(codes, [200] * 10)
+        self.assertEqual(self.srv.requests, {"/oauth2/token": 1, "/2/files/upload": 10})
+
+    def test_401_storm_refreshes_once(self):
+        self.client.upload("/warmup", b"0")
+        self.srv.revoked.add(self.client._token)
+
+        async def uploads(a):
+            return await asyncio.gather(*(a.upload(f"/f{i}", b"x") for i in range(50)))
+
+        codes = [r.status_code for r in self.run_async(uploads, max_concurrency=50)]
+        self.assertEqual(codes, [200] * 50)
+        self.assertEqual(self.srv.requests["/oauth2/token"], 2)
+        self.assertEqual(self.client.stats["token_refreshes"], 2)
+
+    def test_periodic_token_rejection_loses_no_upload(self):
+        self.srv.reject_token_every = 7
+
+        async def uploads(a):
+            return await asyncio.gather(*(a.upload(f"/f{i}", b"x") for i in range(50)))
+
+        codes = [r.status_code for r in self.run_async(uploads)]
+        self.assertEqual(codes, [200] * 50)
+        self.assertEqual(len(self.srv.files), 50)
+        self.assertLess(self.srv.requests["/oauth2/token"], 25)
+
+    def test_server_error_is_not_reported_as_not_found(self):
+        path = os.path.join(self.tmp.name, "players.json")
+        self.srv.files["/players.json"] = b"{}"
+        self.srv.download_status = 503
+
+        async def download(a):
+            return (await a.sync_download(path, "/players.json"))[0]
+
+        self.assertEqual(self.run_async(download), "failed")
+
+    def test_unchanged_upload_is_skipped(self):
+        path = os.path.join(self.tmp.name, "players.json")
+        with open(path, "wb") as f:
+            f.write(b'{"1": {}}')
+
+        async def twice(a):
+            return [(await a.sync_upload(path, "/players.json"))[0] for _ in range(2)]
+
+        self.assertEqual(self.run_async(twice), ["uploaded", "skipped"])
+        self.assertEqual(self.srv.requests["/2/files/upload"], 1)
+
+
+class BootDownloadTest(unittest.TestCase):
+    # Une panne Dropbox au boot ne doit jamais mener à un démarrage vide.
+    def setUp(self):
+        self.srv = FakeDropbox().start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = DropboxClient(
+            "key", "secret", "refresh", api_url=self.srv.url, content_url=self.srv.url,
+            state_path=os.path.join(self.tmp.name, "sync.json"),
+        )
+
+    def tearDown(self):
+        self.srv.shutdown()
+        self.srv.server_close()
+        self.tmp.cleanup()
+
+    def path(self, *parts):
+        return os.path.join(self.tmp.name, *parts)
+
+    def download(self, local_path, remote_path):
+        return self.client.sync_download(local_path, remote_path)[0]
+
+    def publish_shards(self, count):
+        store = ShardedPlayerPersistence(
+            self.path("remote", "players_shards"), shards=4,
+            upload=lambda local, name: self.client.sync_upload(local, f"/{name}")[0] == "uploaded",
+        )
+        players = store.load()
+        players.update((str(uid), {"xp": uid}) for uid in range(count))
+        store.mark_dirty(players)
+        store.close()
+        return players
+
+    def boot_shards(self):
+        local_dir = self.path("players_shards")
+        download_shard_set(self.client, local_dir, "/players_shards", self.download)
+        return ShardedPlayerPersistence(local_dir, shards=4).load()
+
+    def test_failed_download_without_local_copy_aborts(self):
+        self.srv.files["/players.json"] = b'{"1": {}}'
+        self.srv.download_status = 503
+        status = self.download(self.path("players.json"), "/players.json")
+        self.assertEqual(status, "failed")
+        with self.assertRaises(SystemExit):
+            refuse_empty_boot(status, self.path("players.json"))
+
+    def test_failed_download_keeps_the_local_copy(self):
+        with open(self.path("players.json"), "w", encoding="utf-8") as f:
+            f.write('{"1": {}}')
+        refuse_empty_boot("failed", self.path("players.json"))
+
+    def test_missing_file_and_offline_mode_boot_empty(self):
+        status = self.download(self.path("players.json"), "/players.json")
+        self.assertEqual(status, "not_found")
+        refuse_empty_boot(status, self.path("players.json"))
+        refuse_empty_boot("no_token", self.path("players.json"), configured=False)
+        with self.assertRaises(SystemExit):
+            refuse_empty_boot("no_token", self.path("players.json"), configured=True)
+
+    def test_shard_set_is_downloaded_and_verified(self):
+        players = self.publish_shards(300)
+        self.assertEqual(self.boot_shards(), players)
+
+    def test_manifest_failure_aborts_instead_of_booting_empty(self):
+        self.publish_shards(300)
+        self.srv.download_status = 429
+        with self.assertRaises(SystemExit):
+            self.boot_shards()
+
+    def test_no_remote_manifest_is_a_first_sharded_boot(self):
+        self.assertEqual(self.boot_shards(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import sys
+import asyncio
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from locks import LockManager, spawn_task
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class LockManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.locks = LockManager()
+
+    def test_locks_are_taken_in_global_order(self):
+        async def main():
+            async with self.locks.player("1"):
+                async with self.locks.spawn("guild:1"):
+                    pass
+
+        with self.assertRaisesRegex(RuntimeError, "lock order violation"):
+            run(main())
+
+    def test_nested_lock_after_the_held_ones_is_allowed(self):
+        async def main():
+            async with self.locks.spawn("guild:1"):
+                async with self.locks.player("1", "2"):
+                    return self.locks.metrics()["locks"]
+
+        self.assertEqual(run(main()), 3)
+
+    def test_released_locks_are_dropped(self):
+        async def main():
+            for uid in range(100):
+                async with self.locks.player(uid):
+                    pass
+
+        run(main())
+        self.assertEqual(self.locks.metrics()["locks"], 0)
+
+    def test_same_key_is_mutually_exclusive(self):
+        inside = []
+
+        async def worker(i):
+            async with self.locks.spawn("guild:1", i):
+                inside.append(i)
+                await asyncio.sleep(0.01)
+                inside.append(-i)
+
+        async def main():
+            await asyncio.gather(*(worker(i) for i in range(1, 4)))
+
+        run(main())
+        self.assertTrue(all(inside[k] == -inside[k + 1] for k in range(0, len(inside), 2)))
+        self.assertEqual(self.locks.stats["spawn"]["contended"], 2)
+
+    def test_task_spawned_under_a_lock_does_not_inherit_it(self):
+        # ex. worker d'outbox lancé pendant un !scan : il doit pouvoir prendre ses propres verrous
+        async def background():
+            async with self.locks.spawn("guild:2"):
+                return "ok"
+
+        async def main():
+            async with self.locks.player("1"):
+                task = spawn_task(background())
+            return await task
+
+        self.assertEqual(run(main()), "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import asyncio
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from outbox import ChannelOutbox, MAX_MESSAGE_LEN, PRIORITY_CRITICAL, PRIORITY_INFO, PRIORITY_NORMAL
+
+
+class FakeChannel:
+    id = 1
+
+    def __init__(self, fail=False):
+        self.sent = []
+        self.fail = fail
+
+    async def send(self, content, embed=None, view=None):
+        if self.fail:
+            raise RuntimeError("HTTP 500")
+        self.sent.append(content)
+        return len(self.sent)
+
+
+class ChannelOutboxTest(unittest.TestCase):
+    def send_all(self, messages, channel=None, per_second=1000.0, burst=5):
+        # messages : [(priorité, texte, auteur)] mis en file d'un coup ; renvoie les résultats des futures
+        channel = channel or FakeChannel()
+
+        async def main():
+            box = ChannelOutbox(channel, per_second, burst)
+            loop = asyncio.get_running_loop()
+            futures = []
+            for priority, content, who in messages:
+                future = loop.create_future()
+                box.push(priority, {"content": content, "embed": None, "view": None, "who": who,
+                                    "t": time.monotonic(), "future": future})
+                futures.append(future)
+            return await asyncio.gather(*futures)
+
+        return channel, asyncio.run(main())
+
+    def test_critical_messages_jump_the_queue(self):
+        channel, _ = self.send_all([
+            (PRIORITY_INFO, "info", None),
+            (PRIORITY_NORMAL, "normal", None),
+            (PRIORITY_CRITICAL, "spawn", None),
+        ])
+        self.assertEqual(channel.sent, ["spawn", "normal", "info"])
+
+    def test_pending_notices_are_merged_with_their_authors(self):
+        channel, results = self.send_all([
+            (PRIORITY_INFO, "⏳ Slow down!", "ana"),
+            (PRIORITY_INFO, "⏳ Slow down!", "ben"),
+            (PRIORITY_INFO, "⏳ Slow down!", "ana"),
+            (PRIORITY_INFO, "No DOMON here.", None),
+        ])
+        self.assertEqual(channel.sent, ["⏳ Slow down! — ana, ben\nNo DOMON here."])
+        self.assertEqual(results, [1, 1, 1, 1])
+
+    def test_merged_notices_stay_under_the_message_limit(self):
+        notices = [(PRIORITY_INFO, f"notice {i % 3} " + "x" * 40, f"player_with_a_long_name_{i}") for i in range(300)]
+        channel, _ = self.send_all(notices)
+        self.assertGreater(len(channel.sent), 1)
+        self.assertTrue(all(len(msg) <= MAX_MESSAGE_LEN for msg in channel.sent))
+        self.assertEqual(sum(msg.count("player_with") for msg in channel.sent), 300)
+
+    def test_failed_send_resolves_with_none(self):
+        _, results = self.send_all([(PRIORITY_CRITICAL, "spawn", None)], channel=FakeChannel(fail=True))
+        self.assertEqual(results, [None])
+
+    def test_send_budget_is_respected(self):
+        start = time.monotonic()
+        channel, _ = self.send_all([(PRIORITY_NORMAL, str(i), None) for i in range(4)], per_second=20.0, burst=2)
+        self.assertEqual(channel.sent, ["0", "1", "2", "3"])
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+if __name__ == "__main__":
+    unittest.main()
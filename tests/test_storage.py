@@ -0,0 +1,312 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import (
+    MANIFEST_NAME, MARSHAL_MAGIC, SNAPSHOT_CODECS, PlayerPersistence, ShardedPlayerPersistence,
+    SnapshotCodecError, SqlitePlayerStore, decode_snapshot, detect_codec, encode_player,
+    encode_snapshot, import_players_json, read_journal, read_manifest, read_snapshot,
+    replay_journal, sqlite_connect, sqlite_read_players,
+)
+
+# Persistance des joueurs sur disque (aucun accès Dropbox).
+
+
+def player(xp=0):
+    return {"inventory": {}, "collection": {}, "xp": xp, "daily": None, "flags": {}}
+
+
+class WriteBehindTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "players.json")
+        self.uploads = []
+        self.store = PlayerPersistence(self.path, upload=lambda path, name: self.uploads.append(name))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_saves_are_coalesced_into_one_write(self):
+        players = self.store.load()
+        for uid in range(50):
+            players[str(uid)] = player(uid)
+            self.store.mark_dirty(players, (uid,))
+        self.assertEqual(self.store.collect(), 50)
+        self.assertEqual(self.store.collect(), 0)
+        self.store.flush_sync()
+        self.assertEqual(self.store.stats["flushes"], 1)
+        self.assertEqual(self.uploads, ["players.json"])
+        self.assertEqual(read_snapshot(self.path)[0], players)
+
+    def test_removed_player_leaves_the_snapshot(self):
+        players = self.store.load()
+        players.update({"1": player(), "2": player()})
+        self.store.mark_dirty(players)
+        self.store.flush_sync()
+        del players["1"]
+        self.store.mark_dirty(players, ("1",))
+        self.store.flush_sync()
+        self.assertEqual(set(read_snapshot(self.path)[0]), {"2"})
+
+    def test_deferred_meta_does_not_write_on_its_own(self):
+        self.store.load()
+        self.store.set_meta("schema_version", 2, defer=True)
+        self.assertFalse(self.store.has_pending())
+        self.store.flush_sync()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(self.uploads, [])
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.snapshot = os.path.join(self.tmp.name, "players.json")
+        self.journal = os.path.join(self.tmp.name, "players.journal")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_journal(self, *seqs, tail=""):
+        with open(self.journal, "w", encoding="utf-8") as f:
+            for seq in seqs:
+                f.write(json.dumps({"seq": seq, "op": "xp", "uid": "1", "delta": 10}) + "\n")
+            f.write(tail)
+
+    def open_store(self):
+        store = PlayerPersistence(self.snapshot, journal_path=self.journal, compact_interval=3600)
+        return store, store.load()
+
+    def test_replay_skips_ops_already_in_the_snapshot(self):
+        self.write_journal(3, 4, 5)
+        data, seq = replay_journal({"1": player(100)}, 4, self.journal)
+        self.assertEqual((data["1"]["xp"], seq), (110, 5))
+
+    def test_truncated_last_line_is_ignored(self):
+        self.write_journal(1, 2, tail='{"seq": 3, "op": "xp", "uid"')
+        data, seq = replay_journal({"1": player()}, 0, self.journal)
+        self.assertEqual((data["1"]["xp"], seq), (20, 2))
+
+    def test_gap_discards_the_tail_and_rewrites_the_journal(self):
+        self.write_journal(5, 6, 9, 10)
+        data, seq = replay_journal({"1": player()}, 5, self.journal)
+        self.assertEqual((data["1"]["xp"], seq), (10, 6))
+        self.assertEqual([op["seq"] for op in read_journal(self.journal)], [6])
+        self.assertEqual([op["seq"] for op in read_journal(f"{self.journal}.discarded")], [9, 10])
+
+    def test_ops_are_journaled_then_compacted(self):
+        store, players = self.open_store()
+        players["1"] = player()
+        store.mark_dirty(players, ("1",))
+        for _ in range(3):
+            store.record(players, {"op": "xp", "uid": "1", "delta": 5})
+        store.record(players, {"op": "item", "uid": "1", "item": "potion", "delta": 2})
+        store.flush_sync()
+
+        data, meta = read_snapshot(self.snapshot)
+        self.assertEqual(data["1"]["xp"], 15)
+        self.assertEqual(data["1"]["inventory"], {"potion": 2})
+        self.assertEqual(meta["seq"], 4)
+        self.assertEqual(read_journal(self.journal), [])
+        store.close()
+
+    def test_reload_replays_the_journal_after_the_snapshot(self):
+        store, players = self.open_store()
+        players["1"] = player()
+        store.mark_dirty(players, ("1",))
+        store.flush_sync()
+        store.record(players, {"op": "xp", "uid": "1", "delta": 7})
+        store._stop_writer()  # arrêt brutal : journal écrit, pas de compaction
+
+        _, players = self.open_store()
+        self.assertEqual(players["1"]["xp"], 7)
+
+
+class CodecTest(unittest.TestCase):
+    players = {"1": dict(player(12), collection={"7": 2}, inventory={"ball": 3}), "2": player()}
+    meta = {"seq": 4, "schema_version": 2}
+
+    def test_every_codec_round_trips(self):
+        fragments = {uid: encode_player(p) for uid, p in self.players.items()}
+        for codec in SNAPSHOT_CODECS:
+            with self.subTest(codec=codec):
+                raw = encode_snapshot(fragments, self.meta, codec)
+                self.assertEqual(detect_codec(raw), codec)
+                self.assertEqual(decode_snapshot(raw), dict(self.players, __meta__=self.meta))
+
+    def test_marshal_from_another_python_is_refused(self):
+        raw = encode_snapshot({"1": encode_player(player())}, None, "marshal")
+        foreign = MARSHAL_MAGIC + bytes((3, 0)) + raw[len(MARSHAL_MAGIC) + 2:]
+        with self.assertRaises(SnapshotCodecError):
+            decode_snapshot(foreign)
+
+    def test_store_reads_a_snapshot_written_with_another_codec(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "players.json")
+            store = PlayerPersistence(path, codec="lzma")
+            players = store.load()
+            players.update(self.players)
+            store.mark_dirty(players)
+            store.close()
+            self.assertEqual(PlayerPersistence(path, codec="json").load(), self.players)
+
+    def test_unknown_codec_is_rejected(self):
+        with self.assertRaises(ValueError):
+            PlayerPersistence("players.json", codec="zip")
+
+
+class SqliteStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "players.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def read_back(self):
+        conn = sqlite_connect(self.db)
+        try:
+            return sqlite_read_players(conn)
+        finally:
+            conn.close()
+
+    def test_import_applies_the_journal_and_kv_files(self):
+        with open(self.path("players.json"), "w", encoding="utf-8") as f:
+            json.dump({"__meta__": {"seq": 1}, "1": dict(player(5), collection={"7": 2})}, f)
+        with open(self.path("players.journal"), "w", encoding="utf-8") as f:
+            f.write(json.dumps({"seq": 2, "op": "collect", "uid": "1", "num": 7}) + "\n")
+        with open(self.path("state.json"), "w", encoding="utf-8") as f:
+            json.dump({"spawns": {}}, f)
+
+        count = import_players_json(self.db, self.path("players.json"), {"state": self.path("state.json")})
+        self.assertEqual(count, 1)
+        self.assertEqual(self.read_back()["1"]["collection"], {"7": 3})
+        store = SqlitePlayerStore(self.db)
+        store.load()
+        self.assertEqual(store.get_kv("state"), {"spawns": {}})
+
+    def test_ops_and_replacements_reach_the_database(self):
+        store = SqlitePlayerStore(self.db)
+        players = store.load()
+        players["1"] = player()
+        store.mark_dirty(players, ("1",))
+        store.collect()
+        store.record(players, {"op": "xp", "uid": "1", "delta": 30})
+        store.record(players, {"op": "item", "uid": "1", "item": "ball", "delta": 3})
+        store.record(players, {"op": "item", "uid": "1", "item": "ball", "delta": -3})
+        store.record(players, {"op": "flag", "uid": "1", "flag": "tutorial", "value": True})
+        store.set_kv("config", {"prefix": "!"})
+        store.close()
+
+        self.assertEqual(self.read_back(), players)
+        reopened = SqlitePlayerStore(self.db)
+        self.assertEqual(reopened.load(), players)
+        self.assertEqual(reopened.get_kv("config"), {"prefix": "!"})
+
+    def test_queued_op_is_not_changed_by_later_mutations(self):
+        store = SqlitePlayerStore(self.db)
+        players = store.load()
+        players["1"] = player()
+        store.mark_dirty(players, ("1",))
+        store.collect()
+        value = {"streak": 1}
+        store.record(players, {"op": "flag", "uid": "1", "flag": "daily", "value": value})
+        value["streak"] = 99  # muté avant que le writer n'ait traité l'op
+        store.close()
+        self.assertEqual(self.read_back()["1"]["flags"]["daily"], {"streak": 1})
+
+    def test_deferred_kv_does_not_trigger_a_backup(self):
+        uploads = []
+        store = SqlitePlayerStore(self.db, upload=lambda path, name: uploads.append(name))
+        store.load()
+        store.set_meta("schema_version", 3, defer=True)
+        store.close()
+        self.assertEqual(uploads, [])
+        reopened = SqlitePlayerStore(self.db)
+        reopened.load()
+        self.assertEqual(reopened.get_meta("schema_version"), 3)
+
+
+class ShardedStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, "players_shards")
+        self.legacy = os.path.join(self.tmp.name, "players.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open_store(self, shards=4):
+        store = ShardedPlayerPersistence(self.dir, shards=shards, legacy_path=self.legacy)
+        return store, store.load()
+
+    def manifest(self):
+        return read_manifest(os.path.join(self.dir, MANIFEST_NAME))
+
+    def seed(self, count=100, shards=4):
+        store, players = self.open_store(shards)
+        players.update((str(uid), player(uid)) for uid in range(count))
+        store.mark_dirty(players)
+        store.close()
+        return players
+
+    def test_first_boot_imports_the_legacy_snapshot(self):
+        with open(self.legacy, "w", encoding="utf-8") as f:
+            json.dump({"1": player(3), "2": player(4)}, f)
+        store, players = self.open_store()
+        store.close()
+        self.assertEqual(self.open_store()[1], players)
+        self.assertEqual(len(players), 2)
+
+    def test_only_dirty_shards_are_rewritten(self):
+        self.seed()
+        before = self.manifest()["versions"]
+        store, players = self.open_store()
+        store.record(players, {"op": "xp", "uid": "42", "delta": 1})
+        store.close()
+        after = self.manifest()["versions"]
+        changed = [key for key in after if after[key] != before[key]]
+        self.assertEqual(len(changed), 1)
+        self.assertEqual(after[changed[0]]["version"], before[changed[0]]["version"] + 1)
+        self.assertEqual(self.open_store()[1]["42"]["xp"], 43)
+        self.assertEqual(sorted(os.listdir(self.dir)), sorted([MANIFEST_NAME] + [v["file"] for v in after.values()]))
+
+    def test_resharding_keeps_every_player_and_moves_versions_up(self):
+        players = self.seed(shards=4)
+        old = self.manifest()["versions"]
+        store, reloaded = self.open_store(shards=8)
+        store.close()
+        manifest = self.manifest()
+        self.assertEqual(manifest["shards"], 8)
+        self.assertEqual(self.open_store(shards=8)[1], players)
+        self.assertGreater(min(v["version"] for v in manifest["versions"].values()),
+                           max(v["version"] for v in old.values()))
+        self.assertFalse({v["file"] for v in old.values()} & set(os.listdir(self.dir)))
+
+    def test_new_set_never_reuses_a_name_from_the_remote_manifest(self):
+        # manifeste distant téléchargé mais non validé : le nouveau jeu doit partir au-dessus
+        os.makedirs(self.dir)
+        with open(os.path.join(self.dir, f"{MANIFEST_NAME}.download"), "w", encoding="utf-8") as f:
+            json.dump({"shards": 4, "versions": {"00": {"file": "shard-00-v12", "version": 12}}}, f)
+        self.seed(count=10)
+        versions = [v["version"] for v in self.manifest()["versions"].values()]
+        self.assertEqual(min(versions), 13)
+
+    def test_corrupt_shard_refuses_to_load(self):
+        self.seed()
+        entry = next(iter(self.manifest()["versions"].values()))
+        with open(os.path.join(self.dir, entry["file"]), "ab") as f:
+            f.write(b" ")
+        with self.assertRaises(ValueError):
+            self.open_store()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import asyncio
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from locks import LockManager
+from timers import TimerService
+
+
+class TimerServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.timers = TimerService()
+        self.fired = []
+
+        async def handler(key, payload):
+            self.fired.append((key, payload))
+
+        self.timers.on("scan", handler)
+
+    def run_for(self, seconds, setup=None):
+        async def main():
+            self.timers.start()
+            if setup:
+                await setup()
+            await asyncio.sleep(seconds)
+            self.timers._task.cancel()
+
+        asyncio.run(main())
+
+    def test_timers_fire_in_deadline_order(self):
+        now = time.time()
+        self.timers.arm("scan", "b", now + 0.04, "second")
+        self.timers.arm("scan", "a", now + 0.02, "first")
+        self.run_for(0.1)
+        self.assertEqual(self.fired, [("a", "first"), ("b", "second")])
+        self.assertEqual(self.timers.armed(), 0)
+
+    def test_rearm_replaces_and_cancel_drops(self):
+        now = time.time()
+        self.timers.arm("scan", "a", now + 0.02, "old")
+        self.timers.arm("scan", "a", now + 0.03, "new")
+        self.timers.arm("scan", "b", now + 0.02)
+        self.assertTrue(self.timers.cancel("scan", "b"))
+        self.run_for(0.1)
+        self.assertEqual(self.fired, [("a", "new")])
+
+    def test_timer_armed_while_running_wakes_the_loop(self):
+        async def arm_later():
+            await asyncio.sleep(0.01)
+            self.timers.arm("scan", "late", time.time() + 0.01)
+
+        self.run_for(0.1, arm_later)
+        self.assertEqual(self.fired, [("late", None)])
+
+    def test_snapshot_restores_persistent_timers_only(self):
+        when = time.time() + 60
+        self.timers.arm("scan", "a", when, {"guild": 1})
+        self.timers.arm("scan", "b", when, persist=False)
+        restored = TimerService()
+        restored.restore(self.timers.snapshot())
+        self.assertEqual(restored.deadline("scan", "a"), when)
+        self.assertIsNone(restored.deadline("scan", "b"))
+
+    def test_timer_armed_under_a_lock_can_take_locks(self):
+        locks = LockManager()
+
+        async def handler(key, payload):
+            async with locks.spawn(key):
+                self.fired.append(key)
+
+        self.timers.on("bimnet", handler)
+
+        async def main():
+            # service démarré (et timer armé) depuis une commande qui tient un verrou
+            async with locks.player("1"):
+                self.timers.start()
+                self.timers.arm("bimnet", "guild:1", time.time())
+            await asyncio.sleep(0.05)
+            self.timers._task.cancel()
+
+        asyncio.run(main())
+        self.assertEqual((self.fired, self.timers.stats["errors"]), (["guild:1"], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import time
+import heapq
+import asyncio
+import itertools
+
+from locks import spawn_task
+
+# =====================================
+# --- Service de timers (tas unique) ---
+# =====================================
+# Une seule tâche asyncio dort jusqu'à la prochaine échéance, quel que soit le
+# nombre de timers armés. Armer = push dans un tas (O(log n)), annuler = O(1)
+# (entrée marquée morte, purgée quand elle remonte ou à la compaction).
+# Un timer est identifié par (kind, key) : réarmer remplace l'échéance.
+# Les timers "persist" sont exportés par snapshot() et rechargés par restore().
+# Boucle et handlers tournent dans un contexte vierge (spawn_task) : un timer armé
+# sous verrou ne se croit pas détenteur des verrous de la tâche qui l'a armé.
+
+
+class TimerEntry:
+    __slots__ = ("when", "kind", "key", "payload", "persist", "alive")
+
+    def __init__(self, when, kind, key, payload, persist):
+        self.when, self.kind, self.key = when, kind, key
+        self.payload, self.persist, self.alive = payload, persist, True
+
+
+class TimerService:
+    def __init__(self):
+        self._heap = []     # (when, seq, entry)
+        self._entries = {}  # (kind, key) → entrée vivante
+        self._handlers = {}
+        self._seq = itertools.count()
+        self._dead = 0
+        self._wakeup = None
+        self._task = None
+        self.on_change = None  # appelé quand l'ensemble des timers persistants change
+        self.stats = {"armed": 0, "fired": 0, "cancelled": 0, "errors": 0, "late_ms_max": 0.0}
+
+    def on(self, kind, handler):
+        # handler(key, payload) : coroutine exécutée dans sa propre tâche
+        self._handlers[kind] = handler
+
+    def arm(self, kind, key, when, payload=None, persist=True):
+        self.cancel(kind, key, notify=False)
+        entry = TimerEntry(float(when), kind, key, payload, persist)
+        self._entries[(kind, key)] = entry
+        heapq.heappush(self._heap, (entry.when, next(self._seq), entry))
+        self.stats["armed"] += 1
+        if self._wakeup is not None and self._heap[0][2] is entry:
+            self._wakeup.set()
+        if persist:
+            self._changed()
+        return entry
+
+    def cancel(self, kind, key, notify=True):
+        entry = self._entries.pop((kind, key), None)
+        if entry is None:
+            return False
+        entry.alive = False
+        self._dead += 1
+        self.stats["cancelled"] += 1
+        if self._dead > 64 and self._dead * 2 > len(self._heap):
+            self._heap = [item for item in self._heap if item[2].alive]
+            heapq.heapify(self._heap)
+            self._dead = 0
+        if notify and entry.persist:
+            self._changed()
+        return True
+
+    def deadline(self, kind, key):
+        entry = self._entries.get((kind, key))
+        return entry.when if entry else None
+
+    def armed(self, kind=None):
+        if kind is None:
+            return len(self._entries)
+        return sum(1 for k, _ in self._entries if k == kind)
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    # --------- Persistance ----------
+    def snapshot(self):
+        return [
+            {"kind": e.kind, "key": e.key, "when": e.when, "payload": e.payload}
+            for e in self._entries.values() if e.persist
+        ]
+
+    def restore(self, items):
+        # échéances passées pendant l'arrêt : déclenchées dès le démarrage
+        for it in items or ():
+            self.arm(it["kind"], it["key"], it["when"], it.get("payload"))
+
+    # --------- Boucle ----------
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = spawn_task(self._run())
+
+    async def _run(self):
+        self._wakeup = asyncio.Event()
+        while True:
+            while self._heap and not self._heap[0][2].alive:
+                heapq.heappop(self._heap)
+                self._dead -= 1
+            now = time.time()
+            if self._heap and self._heap[0][0] <= now:
+                _, _, entry = heapq.heappop(self._heap)
+                entry.alive = False
+                self._entries.pop((entry.kind, entry.key), None)
+                self.stats["fired"] += 1
+                self.stats["late_ms_max"] = max(self.stats["late_ms_max"], round((now - entry.when) * 1000, 1))
+                spawn_task(self._fire(entry))
+                if entry.persist:
+                    self._changed()
+                continue
+            timeout = self._heap[0][0] - now if self._heap else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, entry):
+        handler = self._handlers.get(entry.kind)
+        if handler is None:
+            return
+        try:
+            await handler(entry.key, entry.payload)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"⚠️ TIMER {entry.kind}:{entry.key} error:", e)
+
+    def metrics(self):
+        kinds = {}
+        for kind, _ in list(self._entries):
+            kinds[kind] = kinds.get(kind, 0) + 1
+        return dict(self.stats, pending=len(self._entries), heap=len(self._heap), by_kind=kinds)